@@ -0,0 +1,194 @@
+#!/usr/bin/env python3
+"""
+Benchmark document extraction on synthetic manifests.
+
+For each format and page count, generates a manifest (see
+synthetic_manifests.py) and times the stages /api/extract runs: reading the
+file (read_pdf for PDFs, which also builds the clean text), cleaning the
+text and parse_maritime_data, plus every field
+extractor on its own. Reports the fastest of --repeat runs of each stage,
+pages per second, peak traced memory and a digest of the parsed fields,
+and compares them with a stored baseline: a stage or peak memory more than --tolerance slower or
+larger, or any change in the parsed fields, is a regression and makes the
+run exit 1.
+
+Usage: python scripts/bench_extraction.py [--pages 1,10,100,500] [--formats txt,csv,pdf]
+       [--density 0.8] [--noise 0.1] [--seed 1] [--repeat 5] [--baseline FILE] [--save-baseline FILE]
+       [--tolerance 0.25]
+"""
+
+import argparse
+import gc
+import hashlib
+import json
+import os
+import shutil
+import sys
+import tempfile
+import time
+import tracemalloc
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic_manifests import write_manifest
+
+from src.extraction.fields import clean_document_text, extract_fields
+from src.extraction.pdf import read_pdf
+from src.routes.file_processor import decode_text, extract_data_from_csv, parse_maritime_data, read_source
+
+# Stage changes smaller than this are timer noise, not regressions
+NOISE_FLOOR_SECONDS = 0.002
+# Per-field times listed in the report
+SLOWEST_FIELDS = 10
+
+
+def read_stages(path, file_format):
+    """(stage name, callable returning (text, clean_text or None)) pairs for reading path"""
+    if file_format == 'pdf':
+        def read():
+            pdf = read_pdf(path)
+            return pdf['text'], pdf['clean_text']
+        return [('read', read)]
+    if file_format == 'csv':
+        return [('read', lambda: (extract_data_from_csv(path), None))]
+    return [('read', lambda: (decode_text(read_source(path), 'utf-8'), None))]
+
+
+def timed(function, repeat):
+    """(fastest seconds, last result) over repeat calls; the fastest run is the least disturbed by other load"""
+    times = []
+    # As timeit does, keep collection pauses out of the measurement
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            start = time.perf_counter()
+            result = function()
+            times.append(time.perf_counter() - start)
+    finally:
+        gc.enable()
+    return min(times), result
+
+
+def field_times(text, clean_text, repeat):
+    """Fastest seconds each extractor takes on the document, by output field.
+
+    Taken from extract_fields' own statistics, so keyword lookups shared
+    between fields are charged to the first field that asks.
+    """
+    runs = {}
+    for _ in range(repeat):
+        stats = {}
+        extract_fields(text, clean_text=clean_text, stats=stats)
+        for name, field_stats in stats.items():
+            runs.setdefault(name, []).append(field_stats['seconds'])
+    return {name: min(times) for name, times in runs.items()}
+
+
+def bench_case(path, file_format, pages, repeat):
+    stages = {}
+    for stage, read in read_stages(path, file_format):
+        stages[stage], (text, clean_text) = timed(read, repeat)
+    if clean_text is None:
+        stages['clean'], clean_text = timed(lambda: clean_document_text(text), repeat)
+    stages['parse'], parsed = timed(lambda: parse_maritime_data(text, clean_text), repeat)
+
+    total = sum(stages.values())
+    tracemalloc.start()
+    parse_maritime_data(*read_stages(path, file_format)[-1][1]())
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    return {
+        'stages': stages,
+        'total': total,
+        'pages_per_second': pages / total if total else None,
+        'peak_memory_bytes': peak,
+        'fields_found': len(parsed),
+        'output_digest': hashlib.sha256(json.dumps(parsed, sort_keys=True).encode()).hexdigest()[:16],
+        'field_times': field_times(text, clean_text, repeat),
+    }
+
+
+def compare(results, baseline, tolerance):
+    """Regression messages for results against a baseline run"""
+    regressions = []
+    for case, result in results['cases'].items():
+        base = baseline['cases'].get(case)
+        if base is None:
+            continue
+        if result['output_digest'] != base['output_digest']:
+            regressions.append(f'{case}: parsed fields changed ({base["output_digest"]} -> {result["output_digest"]})')
+        for stage, seconds in result['stages'].items():
+            base_seconds = base['stages'].get(stage)
+            if base_seconds is None:
+                continue
+            if seconds > base_seconds * (1 + tolerance) and seconds - base_seconds > NOISE_FLOOR_SECONDS:
+                regressions.append(f'{case} {stage}: {base_seconds * 1000:.1f} ms -> {seconds * 1000:.1f} ms')
+        if result['peak_memory_bytes'] > base['peak_memory_bytes'] * (1 + tolerance):
+            regressions.append(f'{case} peak memory: {base["peak_memory_bytes"] // 1024} KiB -> '
+                               f'{result["peak_memory_bytes"] // 1024} KiB')
+    return regressions
+
+
+def report(results):
+    print(f'{"case":<12} {"stages (ms)":<58} {"pages/s":>9} {"peak KiB":>9} {"fields":>6}  digest')
+    for case, result in results['cases'].items():
+        stages = ' '.join(f'{stage}={seconds * 1000:.1f}' for stage, seconds in result['stages'].items())
+        rate = result['pages_per_second']
+        print(f'{case:<12} {stages:<58} {rate:>9.1f} {result["peak_memory_bytes"] // 1024:>9} '
+              f'{result["fields_found"]:>6}  {result["output_digest"]}')
+    totals = {}
+    for result in results['cases'].values():
+        for field, seconds in result['field_times'].items():
+            totals[field] = totals.get(field, 0) + seconds
+    print('\nslowest fields (summed over cases, ms):')
+    for field, seconds in sorted(totals.items(), key=lambda item: -item[1])[:SLOWEST_FIELDS]:
+        print(f'  {field:<32} {seconds * 1000:.2f}')
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('--pages', default='1,10,100,500')
+    parser.add_argument('--formats', default='txt,csv,pdf')
+    parser.add_argument('--density', type=float, default=0.8)
+    parser.add_argument('--noise', type=float, default=0.1)
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--baseline', help='compare against this saved run')
+    parser.add_argument('--save-baseline', help='write this run to a file for later comparison')
+    parser.add_argument('--tolerance', type=float, default=0.25)
+    args = parser.parse_args()
+
+    config = {key: getattr(args, key) for key in ('pages', 'formats', 'density', 'noise', 'seed')}
+    results = {'config': config, 'cases': {}}
+    work_dir = tempfile.mkdtemp(prefix='bench-extraction-')
+    try:
+        for file_format in args.formats.split(','):
+            for pages in (int(p) for p in args.pages.split(',')):
+                path = write_manifest(work_dir, file_format, pages, args.density, args.noise, args.seed)
+                results['cases'][f'{file_format}-{pages}p'] = bench_case(path, file_format, pages, args.repeat)
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    report(results)
+    if args.save_baseline:
+        with open(args.save_baseline, 'w') as f:
+            json.dump(results, f, indent=2)
+        print(f'\nbaseline written to {args.save_baseline}')
+    if args.baseline:
+        with open(args.baseline) as f:
+            baseline = json.load(f)
+        if baseline['config'] != config:
+            print(f'\nwarning: baseline was run with {baseline["config"]}')
+        regressions = compare(results, baseline, args.tolerance)
+        if regressions:
+            print('\nREGRESSIONS')
+            for regression in regressions:
+                print(f'  {regression}')
+            sys.exit(1)
+        print(f'\nOK: no regressions against {args.baseline}')
+
+
+if __name__ == '__main__':
+    main()
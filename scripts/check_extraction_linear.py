@@ -0,0 +1,126 @@
+#!/usr/bin/env python3
+"""
+Check that field extraction time grows linearly with document size.
+
+Runs parse_maritime_data over an adversarial corpus: documents built to make
+backtracking regex patterns retry long gaps and runs from every position
+(labels repeated along one long line, names that only appear before their
+labels, letter-only lines, long digit runs, ...) plus a realistic manifest,
+each at doubling sizes. For every family it reports the fastest of --repeat
+runs per size and the growth exponent between sizes (1 is linear, 2
+quadratic). The check fails if an exponent goes above --max-exponent once
+the times are past timer noise, or if any pattern ran out of its time budget,
+which would hide a slow pattern rather than show it.
+
+Usage: python scripts/check_extraction_linear.py [--sizes 25000,50000,100000,200000] [--repeat 3]
+       [--max-exponent 1.4]
+"""
+
+import argparse
+import gc
+import math
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic_manifests import manifest_pages
+
+from src.routes.file_processor import parse_maritime_data
+
+# Times below this are dominated by timer noise and not used for the growth check
+NOISE_FLOOR_SECONDS = 0.005
+
+
+def _repeat_to(head, unit, size):
+    return head + unit * max(1, (size - len(head)) // len(unit))
+
+
+def _manifest(size):
+    pages = manifest_pages(max(1, size // 2500))
+    return '\n\n'.join('\n'.join(lines) for lines in pages)[:size]
+
+
+# Family name -> document of about the given size in characters
+ADVERSARIAL_DOCUMENTS = {
+    # Surnames before any label, then labels along one line the names never follow
+    'names_before_labels': lambda size: _repeat_to('chapman bailey wilkins banner\n', 'auto lead heavy assistant ', size),
+    # First names before any label, then labels followed by digits
+    'first_names_before_labels': lambda size: _repeat_to('colby cole spencer bruce\n', 'auto heavy 1 ', size),
+    # Letter-only lines, so name runs continue across every line end
+    'letter_only_lines': lambda size: _repeat_to('chapman colby wilkins spencer\n', 'auto lead heavy assistant\n', size),
+    # ZEE labels along one line without the values that end the gaps
+    'zee_gaps': lambda size: _repeat_to('equipment vehicles cargo value priority automobiles\n',
+                                        'zee heavy electric static ', size),
+    # Times along one line after the only 'shift'
+    'shift_times': lambda size: _repeat_to('shift\n', '1:00 AM 3:30 PM ', size),
+    # One long digit run after every unit word
+    'digit_run': lambda size: _repeat_to('automobiles vehicles cars heavy equipment drivers total minutes break '
+                                         'electric static cargo vans station wagons cars/hour\n', '1', size),
+    # Vessel keywords that never follow a name, then words the name patterns retry
+    'vessel_words': lambda size: _repeat_to('vessel# ship#\n', 'abcdefghij ', size),
+    # A berth before vessel words that are never followed by one, on the one line clean text has
+    'berth_gap': lambda size: _repeat_to('berth 1\n', 'vessel ship assigned ', size),
+    'manifest': _manifest,
+}
+
+
+def timed_parse(text, repeat):
+    """(fastest seconds, patterns that ran out of budget) for parse_maritime_data over text"""
+    times = []
+    exhausted = 0
+    gc.disable()
+    try:
+        for _ in range(repeat):
+            stats = {}
+            start = time.perf_counter()
+            parse_maritime_data(text, stats=stats)
+            times.append(time.perf_counter() - start)
+            exhausted = sum(field['patterns_exhausted'] for field in stats.values())
+    finally:
+        gc.enable()
+    return min(times), exhausted
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('--sizes', default='25000,50000,100000,200000')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--max-exponent', type=float, default=1.4)
+    args = parser.parse_args()
+    sizes = [int(size) for size in args.sizes.split(',')]
+
+    failures = []
+    print(f'{"family":<28} ' + ' '.join(f'{size:>10}' for size in sizes) + '  exponents')
+    for family, build in ADVERSARIAL_DOCUMENTS.items():
+        times = []
+        for size in sizes:
+            seconds, exhausted = timed_parse(build(size), args.repeat)
+            times.append(seconds)
+            if exhausted:
+                failures.append(f'{family} at {size} chars: {exhausted} pattern(s) ran out of their time budget')
+        exponents = []
+        for (size, seconds), (next_size, next_seconds) in zip(zip(sizes, times), zip(sizes[1:], times[1:])):
+            if next_seconds < NOISE_FLOOR_SECONDS:
+                exponents.append(None)
+                continue
+            exponent = math.log(next_seconds / max(seconds, 1e-9)) / math.log(next_size / size)
+            exponents.append(exponent)
+            if exponent > args.max_exponent:
+                failures.append(f'{family}: {seconds * 1000:.1f} ms at {size} chars -> '
+                                f'{next_seconds * 1000:.1f} ms at {next_size} chars (exponent {exponent:.2f})')
+        print(f'{family:<28} ' + ' '.join(f'{seconds * 1000:>8.1f}ms' for seconds in times) + '  ' +
+              ' '.join('-' if exponent is None else f'{exponent:.2f}' for exponent in exponents))
+
+    if failures:
+        print('\nSUPERLINEAR')
+        for failure in failures:
+            print(f'  {failure}')
+        sys.exit(1)
+    print(f'\nOK: extraction time grows at most as size^{args.max_exponent} on every family')
+
+
+if __name__ == '__main__':
+    main()
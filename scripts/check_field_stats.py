@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""
+Check that per-field statistics keep extractors that fill the same fields apart.
+
+Builds two extractors for one field, the first matching a labelled value
+and the second a fallback, names them with name_extractors and parses a
+document with statistics; each must get its own entry with its own
+matched pattern. Then checks that every registered extractor has a name of
+its own and that parsing complete_comprehensive_test_document.txt gives
+one statistics entry per extractor, both van id extractors included. Any
+failure makes the run exit 1.
+
+Usage: python scripts/check_field_stats.py
+"""
+
+import argparse
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from src.extraction.fields import FIELD_EXTRACTORS, FieldExtractor, extract_fields, name_extractors
+from src.extraction.stats import FieldStats
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE_TEXT = os.path.join(REPO_ROOT, 'complete_comprehensive_test_document.txt')
+
+
+def shared_key_failures():
+    """Failures for two extractors of one field parsed with statistics"""
+    extractors = name_extractors([
+        FieldExtractor(['berthId', 'berthCode'], [r'berth\s*id[:\s]+(\w+)']),
+        FieldExtractor(['berthId', 'berthCode'], [r'no\s*match\s*here(\d+)', r'(?<!\w)b(\d+)']),
+    ])
+    stats = {}
+    extract_fields('Berth ID: B7\nOverflow to b9', extractors, stats=stats)
+    first, second = (extractor.name for extractor in extractors)
+    failures = []
+    if first == second or set(stats) != {first, second}:
+        failures.append(f'two extractors of one field share statistics: names {first!r}, {second!r}, stats {sorted(stats)}')
+    elif (stats[first]['matched_pattern'], stats[second]['matched_pattern']) != (0, 1):
+        failures.append(f"matched patterns {stats[first]['matched_pattern']}, {stats[second]['matched_pattern']} != 0, 1")
+    return failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.parse_args()
+
+    failures = shared_key_failures()
+    names = [extractor.name for extractor in FIELD_EXTRACTORS]
+    duplicates = sorted({name for name in names if names.count(name) > 1})
+    if duplicates:
+        failures.append(f'registered extractors sharing a name: {duplicates}')
+
+    with open(SAMPLE_TEXT, encoding='utf-8') as f:
+        text = f.read()
+    stats = {}
+    extract_fields(text, stats=stats)
+    if len(stats) != len(FIELD_EXTRACTORS):
+        failures.append(f'{len(stats)} statistics entries for {len(FIELD_EXTRACTORS)} extractors')
+    field_stats = FieldStats()
+    field_stats.add(stats)
+    for field in field_stats.snapshot()['fields']:
+        if field['field'].startswith('van1Id'):
+            print(f"{field['field']:<20} found {field['found']}  pattern hits "
+                  f"{[pattern['hits'] for pattern in field['patterns']]}")
+            if not field['found']:
+                failures.append(f"{field['field']} found nothing in the sample document")
+
+    if failures:
+        print('\nFIELD STATISTICS MIXED UP')
+        for failure in failures:
+            print(f'  {failure}')
+        sys.exit(1)
+    print(f'\nOK: {len(FIELD_EXTRACTORS)} extractors keep statistics of their own')
+
+
+if __name__ == '__main__':
+    main()
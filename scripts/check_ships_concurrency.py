@@ -0,0 +1,101 @@
+#!/usr/bin/env python3
+"""
+Multi-process consistency check for the journaled ships store.
+
+Starts several worker processes, each with its own copy of the Flask app and
+ShipStore over one shared temporary database directory (the same situation as
+several gunicorn workers). Every worker creates a ship, then hammers
+PUT /api/ships/<id>/progress on its own ship while renaming the operation
+manager of a neighbour's ship. With stale per-process copies those writes
+would put back old progress values; the check fails if any final value was lost, if two
+workers were handed the same id, or if a freshly loaded store disagrees with
+what the workers see.
+
+Usage: python scripts/check_ships_concurrency.py [--workers 6] [--updates 200]
+"""
+
+import argparse
+import multiprocessing
+import os
+import shutil
+import sys
+import tempfile
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+def _client(db_dir):
+    from src.main import app
+    import src.routes.ships as ships
+    from src.models.ship_store import ShipStore
+
+    # Small threshold so compaction runs (and is picked up by other workers) during the check
+    ships.store = ShipStore(os.path.join(db_dir, 'ships.json'), compact_threshold=50)
+    ships.store.load()
+    return app.test_client()
+
+
+def _worker(db_dir, worker_num, workers, updates, barrier, ids):
+    client = _client(db_dir)
+    barrier.wait(timeout=120)
+    response = client.post('/api/ships', json={'vesselName': f'Worker {worker_num}'})
+    ids[worker_num] = response.get_json()['id']
+    barrier.wait(timeout=120)
+
+    own_id = ids[worker_num]
+    neighbour_id = ids[(worker_num + 1) % workers]
+    for i in range(1, updates + 1):
+        progress = 1 + (i % 99)
+        response = client.put(f'/api/ships/{own_id}/progress', json={'progress': progress})
+        assert response.status_code == 200, response.get_data(as_text=True)
+        manager = f'Worker {worker_num} update {i}'
+        response = client.put(f'/api/ships/{neighbour_id}', json={'operationManager': manager})
+        assert response.status_code == 200, response.get_data(as_text=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('--workers', type=int, default=6)
+    parser.add_argument('--updates', type=int, default=200)
+    args = parser.parse_args()
+
+    db_dir = tempfile.mkdtemp(prefix='ships-concurrency-')
+    try:
+        ctx = multiprocessing.get_context('spawn')
+        barrier = ctx.Barrier(args.workers)
+        ids = ctx.Manager().dict()
+        procs = [ctx.Process(target=_worker, args=(db_dir, n, args.workers, args.updates, barrier, ids))
+                 for n in range(args.workers)]
+        for proc in procs:
+            proc.start()
+        for proc in procs:
+            proc.join()
+
+        failures = [f'worker {n} exited with {proc.exitcode}' for n, proc in enumerate(procs) if proc.exitcode]
+        if len(set(ids.values())) != args.workers:
+            failures.append(f'duplicate ship ids handed out: {dict(ids)}')
+
+        expected_progress = 1 + (args.updates % 99)
+        ships = {s['id']: s for s in _client(db_dir).get('/api/ships').get_json()}
+        for worker_num, ship_id in ids.items():
+            expected_manager = f'Worker {(worker_num - 1) % args.workers} update {args.updates}'
+            ship = ships.get(ship_id)
+            if ship is None:
+                failures.append(f'ship {ship_id} from worker {worker_num} is missing')
+                continue
+            if ship['progress'] != expected_progress:
+                failures.append(f"ship {ship_id}: progress {ship['progress']} != {expected_progress}")
+            if ship['operationManager'] != expected_manager:
+                failures.append(f"ship {ship_id}: operationManager {ship['operationManager']!r} != {expected_manager!r}")
+
+        if failures:
+            print('FAILED')
+            for failure in failures:
+                print(f'  {failure}')
+            sys.exit(1)
+        print(f'OK: {args.workers} workers x {args.updates} progress + field updates, no lost writes')
+    finally:
+        shutil.rmtree(db_dir, ignore_errors=True)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,105 @@
+#!/usr/bin/env python3
+"""
+Check that documents in a known layout are read through their template, as text and as PDF.
+
+Reads complete_comprehensive_test_document.txt, the sample PDF of the same
+document and the text reflowed the way PDF readers give it (several
+'Label: value' pairs to a line, labels and values wrapped over two lines),
+written to a PDF and read back. Each must fit the comprehensive template,
+and the fields the template reads from the text file must come out the
+same from the others: all of them from the reflowed PDF, and those without
+digits from the sample PDF, whose digits pypdf cannot decode. Any
+difference makes the run exit 1.
+
+Usage: python scripts/check_template_layouts.py [--width 90]
+"""
+
+import argparse
+import os
+import shutil
+import sys
+import tempfile
+import textwrap
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from synthetic_manifests import write_pdf
+
+from src.extraction.pdf import read_pdf
+from src.extraction.templates import extract_document_fields, template_values
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SAMPLE_TEXT = os.path.join(REPO_ROOT, 'complete_comprehensive_test_document.txt')
+SAMPLE_PDF = os.path.join(REPO_ROOT, 'complete_comprehensive_test_document.pdf')
+# Lines per page of the reflowed PDF
+PAGE_LINES = 40
+
+
+def reflowed_lines(text, width):
+    """text's lines as a PDF reader gives them: headings alone, each block's other lines run together and wrapped"""
+    lines = []
+    block = []
+    for line in text.splitlines() + ['']:
+        stripped = line.strip()
+        if stripped and not stripped.isupper() and stripped.strip('='):
+            block.append(stripped)
+            continue
+        lines += textwrap.wrap(' '.join(block), width, break_on_hyphens=False)
+        block = []
+        if stripped.isupper():
+            lines.append(stripped)
+    return lines
+
+
+def template_fields(text):
+    """(template name or None, field -> value for the fields the template read)"""
+    template, known = template_values(text)
+    fields = extract_document_fields(text)
+    keys = {key for extractor in known for key in extractor.keys}
+    return template and template.name, {key: value for key, value in fields.items() if key in keys}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('--width', type=int, default=90)
+    args = parser.parse_args()
+
+    with open(SAMPLE_TEXT, encoding='utf-8') as f:
+        text = f.read()
+    _, expected = template_fields(text)
+
+    work_dir = tempfile.mkdtemp(prefix='check-templates-')
+    try:
+        reflowed_pdf = os.path.join(work_dir, 'sample-reflowed.pdf')
+        lines = reflowed_lines(text, args.width)
+        write_pdf(reflowed_pdf, [lines[i:i + PAGE_LINES] for i in range(0, len(lines), PAGE_LINES)])
+        documents = [
+            ('sample text', text, expected),
+            ('reflowed PDF', read_pdf(reflowed_pdf)['text'], expected),
+            ('sample PDF', read_pdf(SAMPLE_PDF)['text'],
+             {key: value for key, value in expected.items() if not any(c.isdigit() for c in str(value))}),
+        ]
+    finally:
+        shutil.rmtree(work_dir, ignore_errors=True)
+
+    failures = []
+    for name, document, wanted in documents:
+        template, fields = template_fields(document)
+        diffs = [f'{key}: {fields.get(key)!r} != {value!r}' for key, value in sorted(wanted.items())
+                 if fields.get(key) != value]
+        print(f'{name:<14} template {template or "none":<14} {len(wanted) - len(diffs)}/{len(wanted)} fields match')
+        if template is None:
+            failures.append(f'{name} fits no template')
+        failures += [f'{name} {diff}' for diff in diffs]
+
+    if failures:
+        print('\nTEMPLATE READ DIFFERS')
+        for failure in failures:
+            print(f'  {failure}')
+        sys.exit(1)
+    print(f'\nOK: {len(documents)} layouts of the sample read the same through the template')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,177 @@
+#!/usr/bin/env python3
+"""
+Synthetic vessel operation manifests for benchmarking document extraction.
+
+A manifest is a list of pages, each a list of text lines: labelled header
+fields in the layout of complete_comprehensive_test_document.txt, followed
+by cargo unit rows filling out the pages. ``density`` is the share of the
+known labelled fields that appear (spread over the first pages);
+``noise`` is the share of filler rows replaced by
+junk text and the chance a field label comes out in a different case. The
+same seed always gives the same manifest, and it can be written as TXT,
+CSV (label,value rows) or PDF.
+
+Usage: python scripts/synthetic_manifests.py OUT_DIR [--pages 1,10,100] [--formats txt,csv,pdf]
+       [--density 0.8] [--noise 0.1] [--seed 1]
+"""
+
+import argparse
+import csv
+import os
+import random
+
+# Lines per page, header fields included
+LINES_PER_PAGE = 50
+
+VESSELS = ['Atlantic Pioneer', 'Morning Crown', 'Grand Aurora', 'Höegh Trigger', 'Glovis Sirius']
+VESSEL_TYPES = ['Auto Carrier', 'RoRo', 'Car Carrier', 'Multi-Purpose']
+PORTS = ['Colonel Island', 'Brunswick', 'Savannah', 'Charleston', 'Baltimore']
+COMPANIES = ['APS Stevedoring', 'SSA Marine', 'Ports America']
+PEOPLE = ['John Smith', 'Colby Chapman', 'Cole Bailey', 'Spencer Wilkins', 'Bruce Banner', 'Sarah Johnson']
+BRANDS = ['Mercedes-Benz', 'BMW', 'Land Rover', 'Rolls-Royce', 'Audi', 'Porsche', 'MINI', 'Jaguar']
+JUNK = ['lorem', 'ipsum', '###', 'N/A', '----', 'ref', 'see attached', '0x1F', '~~', 'TBD', '%%', 'page']
+
+
+def _field_lines(rng):
+    """Labelled header lines, in document order, with values drawn from rng"""
+    lines = [
+        f'Vessel Name: {rng.choice(VESSELS)}',
+        f'Vessel Type: {rng.choice(VESSEL_TYPES)}',
+        f'Port: {rng.choice(PORTS)}',
+        f'Operation Date: 2025-{rng.randint(1, 12):02d}-{rng.randint(1, 28):02d}',
+        f'Berth Location: Berth {rng.randint(1, 3)}',
+        f'Stevedoring Company: {rng.choice(COMPANIES)}',
+        f"Operation Type: {rng.choice(['Discharge Only', 'Loading Only', 'Discharge + Loading'])}",
+        f'Operation Manager: {rng.choice(PEOPLE)}',
+        f'Auto Operations Lead: {rng.choice(PEOPLE)}',
+        f'Auto Operations Assistant: {rng.choice(PEOPLE)}',
+        f'High & Heavy Lead: {rng.choice(PEOPLE)}',
+        f'High & Heavy Assistant: {rng.choice(PEOPLE)}',
+        f'Total Automobiles to Discharge: {rng.randint(100, 4000)}',
+        f'Heavy Equipment to Discharge: {rng.randint(0, 400)}',
+        f'Electric Vehicles: {rng.randint(0, 300)} vehicles',
+        f'Static Cargo Units: {rng.randint(0, 60)} units',
+        f'BRV Loading Target: {rng.randint(0, 600)} vehicles',
+        f'ZEE Loading Target: {rng.randint(0, 600)} vehicles',
+        f'SOU Loading Target: {rng.randint(0, 600)} vehicles',
+        f'Expected Rate: {rng.randint(60, 200)} cars/hour',
+        f'Total Drivers: {rng.randint(5, 40)} drivers',
+        f'Shift Start Time: {rng.randint(5, 9):02d}:00 AM',
+        f'Shift End Time: {rng.randint(15, 20)}:00 PM',
+        f"Break Duration: {rng.choice([30, 45, 60])} minutes",
+        f'Number of Vans: {rng.randint(1, 6)}',
+        f'Number of Station Wagons: {rng.randint(0, 4)}',
+    ]
+    lines += [f'{brand}: {rng.randint(10, 900)} vehicles' for brand in BRANDS]
+    lines += [f'Van {i} ID: V{rng.randint(100, 999)}' for i in range(1, rng.randint(2, 8))]
+    lines += [f'Station Wagon {i} ID: W{rng.randint(100, 999)}' for i in range(1, rng.randint(2, 5))]
+    return lines
+
+
+def _mangle_case(line, rng):
+    label, sep, value = line.partition(': ')
+    label = rng.choice([label.upper(), label.lower(), label.title()])
+    return label + sep + value
+
+
+def manifest_pages(pages, density=0.8, noise=0.1, seed=1):
+    """A synthetic manifest of the given page count as a list of pages of lines"""
+    rng = random.Random(seed)
+    fields = [line for line in _field_lines(rng) if rng.random() < density]
+    fields = [_mangle_case(line, rng) if rng.random() < noise else line for line in fields]
+    result = []
+    unit = 0
+    for page_num in range(pages):
+        # Header fields fill the first pages, a page's worth at most per page
+        lines = fields[:LINES_PER_PAGE // 2]
+        fields = fields[LINES_PER_PAGE // 2:]
+        if page_num == 0:
+            lines = ['VESSEL OPERATION MANIFEST', '========================='] + lines
+        while len(lines) < LINES_PER_PAGE:
+            if rng.random() < noise:
+                lines.append(' '.join(rng.choice(JUNK) for _ in range(rng.randint(1, 8))))
+            else:
+                unit += 1
+                lines.append(f'Unit {unit}: VIN {rng.choice(BRANDS)[:3].upper()}{rng.randint(10 ** 9, 10 ** 10 - 1)} '
+                             f'Deck {rng.randint(1, 12)} Hold {rng.randint(1, 5)}')
+        result.append(lines)
+    # A long manifest that ran out of pages still carries its fields on the last page
+    if fields:
+        result[-1].extend(fields)
+    return result
+
+
+def write_txt(path, pages):
+    with open(path, 'w', encoding='utf-8') as f:
+        f.write('\n\n'.join('\n'.join(lines) for lines in pages) + '\n')
+
+
+def write_csv(path, pages):
+    """Label,value rows; lines without a 'label: value' shape go in the first column alone"""
+    with open(path, 'w', encoding='utf-8', newline='') as f:
+        writer = csv.writer(f)
+        writer.writerow(['Field', 'Value'])
+        for lines in pages:
+            for line in lines:
+                label, sep, value = line.partition(': ')
+                writer.writerow([label, value] if sep else [line])
+
+
+def _pdf_escape(text):
+    return text.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+
+
+def write_pdf(path, pages):
+    """A minimal PDF with one Helvetica text object per page (no layout engine needed)"""
+    objects = [
+        '<< /Type /Catalog /Pages 2 0 R >>',
+        '<< /Type /Pages /Kids [{}] /Count {} >>'.format(
+            ' '.join(f'{4 + 2 * i} 0 R' for i in range(len(pages))), len(pages)),
+        '<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>',
+    ]
+    for i, lines in enumerate(pages):
+        content = 'BT /F1 9 Tf 36 806 Td 11 TL ' + ' '.join(f'({_pdf_escape(line)}) Tj T*' for line in lines) + ' ET'
+        objects.append('<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 842] '
+                       f'/Resources << /Font << /F1 3 0 R >> >> /Contents {5 + 2 * i} 0 R >>')
+        objects.append(f'<< /Length {len(content.encode("cp1252"))} >>\nstream\n{content}\nendstream')
+    out = bytearray(b'%PDF-1.4\n')
+    offsets = []
+    for number, body in enumerate(objects, 1):
+        offsets.append(len(out))
+        out += f'{number} 0 obj\n{body}\nendobj\n'.encode('cp1252')
+    xref = len(out)
+    out += f'xref\n0 {len(objects) + 1}\n0000000000 65535 f \n'.encode()
+    out += b''.join(f'{offset:010d} 00000 n \n'.encode() for offset in offsets)
+    out += f'trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n'.encode()
+    with open(path, 'wb') as f:
+        f.write(out)
+
+
+WRITERS = {'txt': write_txt, 'csv': write_csv, 'pdf': write_pdf}
+
+
+def write_manifest(directory, file_format, pages, density=0.8, noise=0.1, seed=1):
+    """Generate a manifest and write it to directory; returns the file path"""
+    path = os.path.join(directory, f'manifest-{pages}p-d{density}-n{noise}-s{seed}.{file_format}')
+    WRITERS[file_format](path, manifest_pages(pages, density, noise, seed))
+    return path
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.split('\n\n')[1])
+    parser.add_argument('out_dir')
+    parser.add_argument('--pages', default='1,10,100')
+    parser.add_argument('--formats', default='txt,csv,pdf')
+    parser.add_argument('--density', type=float, default=0.8)
+    parser.add_argument('--noise', type=float, default=0.1)
+    parser.add_argument('--seed', type=int, default=1)
+    args = parser.parse_args()
+
+    os.makedirs(args.out_dir, exist_ok=True)
+    for file_format in args.formats.split(','):
+        for pages in (int(p) for p in args.pages.split(',')):
+            print(write_manifest(args.out_dir, file_format, pages, args.density, args.noise, args.seed))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,205 @@
+import hashlib
+import json
+import os
+import tempfile
+import threading
+from collections import OrderedDict
+
+import pypdf
+
+from src.extraction.fields import EXTRACTOR_VERSION, FIELD_EXTRACTORS
+
+# Bytes read at a time when hashing an upload
+HASH_CHUNK_SIZE = 1024 * 1024
+
+
+def code_fingerprint(code):
+    """Text covering a code object's bytecode, names and constants, nested functions included"""
+    consts = [code_fingerprint(const) if hasattr(const, 'co_code')
+              # Set literals compile to frozensets, whose order varies with the string hash seed
+              else repr(sorted(map(repr, const))) if isinstance(const, frozenset)
+              else repr(const) for const in code.co_consts]
+    return '|'.join([code.co_code.hex(), ','.join(code.co_names), ','.join(consts)])
+
+
+def normalizer_fingerprint(normalize):
+    """Text identifying a normalizer by where it is defined and what it does.
+
+    The name alone is not enough: lambdas all share one, and the functions
+    a factory such as known_person returns differ only in their closure, so
+    the bytecode, default arguments and closure values are covered as well.
+    """
+    parts = [getattr(normalize, '__module__', None) or '', getattr(normalize, '__qualname__', repr(normalize))]
+    code = getattr(normalize, '__code__', None)
+    if code is not None:
+        parts.append(code_fingerprint(code))
+        values = list(normalize.__defaults__ or ()) + [cell.cell_contents for cell in normalize.__closure__ or ()]
+        parts += [normalizer_fingerprint(value) if callable(value) else repr(value) for value in values]
+    return '\0'.join(parts)
+
+
+def extractor_fingerprint():
+    """Short digest of everything that decides extraction results.
+
+    Covers the manual EXTRACTOR_VERSION and each extractor's keys, mode,
+    target, normalizer and patterns, so editing a pattern or a normalizer
+    invalidates cached results without a version bump.
+    """
+    digest = hashlib.sha256(str(EXTRACTOR_VERSION).encode())
+    for extractor in FIELD_EXTRACTORS:
+        parts = [','.join(extractor.keys), extractor.mode, extractor.target, normalizer_fingerprint(extractor.normalize)]
+        parts += [pattern.regex.pattern for pattern in extractor.patterns]
+        digest.update('\0'.join(parts).encode())
+    return digest.hexdigest()[:16]
+
+
+EXTRACTOR_FINGERPRINT = extractor_fingerprint()
+
+
+def stream_digest(stream, limit=None, copy_to=None):
+    """(SHA-256 hex digest, size) of a binary stream read to the end.
+
+    With limit, reading stops as soon as the size passes it, so an
+    oversized upload is rejected without hashing the rest. With copy_to,
+    the bytes are also written to that file object in the same pass.
+    """
+    digest = hashlib.sha256()
+    size = 0
+    for chunk in iter(lambda: stream.read(HASH_CHUNK_SIZE), b''):
+        size += len(chunk)
+        if limit is not None and size > limit:
+            break
+        digest.update(chunk)
+        if copy_to is not None:
+            copy_to.write(chunk)
+    return digest.hexdigest(), size
+
+
+def file_digest(file_path):
+    """SHA-256 hex digest of a file's bytes"""
+    with open(file_path, 'rb') as f:
+        return stream_digest(f)[0]
+
+
+class ExtractionCache:
+    """Extraction results keyed by document (or PDF page) content, in memory and optionally on disk.
+
+    The memory tier is an LRU of at most ``max_entries`` results. With a
+    ``directory``, every result is also written there as a JSON file and
+    files are removed oldest-used first once they add up to more than
+    ``max_disk_bytes``, so results survive restarts and are shared by
+    worker processes. Keys include the extractor fingerprint, so results
+    from older extraction code are never returned and simply age out.
+    Pickled (for worker processes), a cache keeps only its disk tier.
+    """
+
+    def __init__(self, directory=None, max_entries=256, max_disk_bytes=64 * 1024 * 1024):
+        self.directory = directory
+        self.max_entries = max_entries
+        self.max_disk_bytes = max_disk_bytes
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._disk_bytes = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+            self._disk_bytes = sum(size for _, size, _ in self._disk_files())
+
+    @staticmethod
+    def key(digest, file_type):
+        """Cache key for a document's content digest read as file_type"""
+        return f'{digest}-{file_type}-{EXTRACTOR_FINGERPRINT}'
+
+    @staticmethod
+    def page_key(fingerprint):
+        """Cache key for a PDF page's text by its page_fingerprint (the field extractors do not change it)"""
+        return f'page-{fingerprint}-{pypdf.__version__}'
+
+    def __getstate__(self):
+        state = dict(self.__dict__)
+        state['_entries'] = OrderedDict()
+        del state['_lock']
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._lock = threading.Lock()
+
+    def _path(self, key):
+        return os.path.join(self.directory, f'{key}.json')
+
+    def _disk_files(self):
+        """(path, size, last used) of each cached file"""
+        files = []
+        for name in os.listdir(self.directory):
+            if not name.endswith('.json'):
+                continue
+            path = os.path.join(self.directory, name)
+            try:
+                st = os.stat(path)
+            except FileNotFoundError:
+                continue
+            files.append((path, st.st_size, st.st_mtime))
+        return files
+
+    def _remember(self, key, entry):
+        with self._lock:
+            self._entries[key] = entry
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def get(self, key):
+        """(entry, 'memory' or 'disk') for a cached result, or (None, None)"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                return entry, 'memory'
+        if not self.directory:
+            return None, None
+        path = self._path(key)
+        try:
+            with open(path, 'r') as f:
+                entry = json.load(f)
+            # The file's mtime is its last use, which disk eviction goes by
+            os.utime(path)
+        except (OSError, ValueError):
+            return None, None
+        self._remember(key, entry)
+        return entry, 'disk'
+
+    def put(self, key, entry):
+        """Cache an extraction result (a JSON-serializable dict)"""
+        self._remember(key, entry)
+        if not self.directory:
+            return
+        payload = json.dumps(entry)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, prefix='.tmp-')
+        try:
+            with os.fdopen(fd, 'w') as f:
+                f.write(payload)
+            os.replace(tmp_path, self._path(key))
+        except OSError as e:
+            print(f"Error writing extraction cache: {e}")
+            if os.path.exists(tmp_path):
+                os.remove(tmp_path)
+            return
+        with self._lock:
+            self._disk_bytes += len(payload.encode())
+            if self._disk_bytes > self.max_disk_bytes:
+                self._evict_disk()
+
+    def _evict_disk(self):
+        """Remove least recently used files until the directory fits max_disk_bytes (lock held)"""
+        files = sorted(self._disk_files(), key=lambda item: item[2])
+        total = sum(size for _, size, _ in files)
+        for path, size, _ in files:
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+        # Recounted from the directory, which other worker processes write to as well
+        self._disk_bytes = total
@@ -0,0 +1,145 @@
+import codecs
+import csv
+import io
+import json
+import re
+from contextlib import contextmanager
+
+# Bytes read from the start of a CSV to decide its encoding
+ENCODING_SAMPLE_BYTES = 64 * 1024
+
+# Header names recognised for each POST /api/ships body field, besides the field name itself;
+# headers are compared lowercased with everything but letters and digits dropped
+DEFAULT_COLUMN_ALIASES = {
+    'vesselName': ['Vessel Name', 'Vessel', 'Ship Name', 'Ship'],
+    'vesselType': ['Vessel Type', 'Ship Type', 'Type'],
+    'shippingLine': ['Shipping Line', 'Line', 'Carrier'],
+    'port': ['Port', 'Terminal'],
+    'operationDate': ['Operation Date', 'Date', 'ETA'],
+    'company': ['Stevedoring Company', 'Company', 'Stevedore'],
+    'operationType': ['Operation Type', 'Operation'],
+    'berthLocation': ['Berth Location', 'Berth', 'Berth Assignment'],
+    'operationManager': ['Operation Manager', 'Manager'],
+    'autoOpsLead': ['Auto Operations Lead', 'Auto Ops Lead', 'Auto Lead'],
+    'autoOpsAssistant': ['Auto Operations Assistant', 'Auto Ops Assistant', 'Auto Assistant'],
+    'heavyOpsLead': ['High & Heavy Lead', 'Heavy Ops Lead', 'Heavy Lead'],
+    'heavyOpsAssistant': ['High & Heavy Assistant', 'Heavy Ops Assistant', 'Heavy Assistant'],
+    'totalVehicles': ['Total Vehicles', 'Vehicles'],
+    'totalAutomobilesDischarge': ['Total Automobiles to Discharge', 'Automobiles', 'Autos'],
+    'heavyEquipmentDischarge': ['Heavy Equipment to Discharge', 'Heavy Equipment', 'Heavy'],
+    'totalElectricVehicles': ['Electric Vehicles', 'EVs'],
+    'totalStaticCargo': ['Static Cargo Units', 'Static Cargo'],
+    'brvTarget': ['BRV Loading Target', 'BRV Target', 'BRV'],
+    'zeeTarget': ['ZEE Loading Target', 'ZEE Target', 'ZEE'],
+    'souTarget': ['SOU Loading Target', 'SOU Target', 'SOU'],
+    'expectedRate': ['Expected Rate', 'Rate'],
+    'totalDrivers': ['Total Drivers', 'Drivers'],
+    'shiftStart': ['Shift Start Time', 'Shift Start', 'Start Time'],
+    'shiftEnd': ['Shift End Time', 'Shift End', 'End Time'],
+    'breakDuration': ['Break Duration', 'Break'],
+    'targetCompletion': ['Target Completion', 'Completion'],
+    'ticoVans': ['Number of Vans', 'Vans', 'TICO Vans'],
+    'ticoStationWagons': ['Number of Station Wagons', 'Station Wagons', 'TICO Station Wagons'],
+}
+
+HEADER_JUNK_RE = re.compile(r'[^a-z0-9]+')
+
+
+def normalize_header(name):
+    return HEADER_JUNK_RE.sub('', name.lower())
+
+
+def load_column_aliases(path):
+    """Extra header aliases ({field: [header, ...]}) from a JSON file, or {} without one"""
+    if not path:
+        return {}
+    with open(path, 'r') as f:
+        return json.load(f)
+
+
+def column_lookup(extra_aliases=None):
+    """Normalized header -> field for the default aliases plus extra_aliases (which win on clashes)"""
+    lookup = {}
+    for aliases in (DEFAULT_COLUMN_ALIASES, extra_aliases or {}):
+        for field, names in aliases.items():
+            for name in [field] + list(names):
+                lookup[normalize_header(name)] = field
+    return lookup
+
+
+def detect_encoding(sample, complete=False):
+    """Encoding of a CSV judged from its first bytes.
+
+    A byte order mark decides it; otherwise UTF-8 if the sample decodes as
+    UTF-8 (a character cut off at the end of an incomplete sample is
+    allowed), then cp1252, which Excel writes on Windows, then latin-1,
+    which decodes anything.
+    """
+    if sample.startswith(codecs.BOM_UTF8):
+        return 'utf-8-sig'
+    if sample.startswith((codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE)):
+        return 'utf-16'
+    for encoding in ('utf-8', 'cp1252'):
+        try:
+            codecs.getincrementaldecoder(encoding)().decode(sample, final=complete)
+            return encoding
+        except UnicodeDecodeError:
+            continue
+    return 'latin-1'
+
+
+@contextmanager
+def open_csv_text(source, newline=''):
+    """A text stream over a CSV path or binary stream, decoded as detect_encoding judges.
+
+    The file is decoded as it is read, so memory stays bounded however
+    large it is. Bytes that turn out not to fit the encoding past the
+    sample become U+FFFD. The default newline='' is what csv.reader
+    expects; newline=None translates line endings as text-mode open() does.
+    A stream passed in is left open.
+    """
+    raw = open(source, 'rb') if isinstance(source, str) else source
+    try:
+        raw.seek(0)
+        sample = raw.read(ENCODING_SAMPLE_BYTES)
+        encoding = detect_encoding(sample, complete=len(sample) < ENCODING_SAMPLE_BYTES)
+        raw.seek(0)
+        text = io.TextIOWrapper(raw, encoding=encoding, errors='replace', newline=newline)
+        try:
+            yield text
+        finally:
+            # Hand the binary stream back instead of letting the wrapper close it
+            text.detach()
+    finally:
+        if isinstance(source, str):
+            raw.close()
+
+
+def read_csv_text(source):
+    """The whole text of a CSV, for field extraction"""
+    with open_csv_text(source, newline=None) as text:
+        return text.read()
+
+
+def header_fields(header, lookup):
+    """The field each header column maps to, or None for columns that map to nothing"""
+    return [lookup.get(normalize_header(name)) for name in header]
+
+
+def iter_csv_records(source, lookup):
+    """Yield (line number, {field: value}) for each row of a one-vessel-per-row CSV.
+
+    The first row is the header, mapped to fields through lookup; columns
+    that map to nothing are ignored and blank rows skipped. Rows are read
+    one at a time, so memory does not grow with the file. Raises
+    ValueError when no header column names the vessel.
+    """
+    with open_csv_text(source) as text:
+        reader = csv.reader(text)
+        fields = header_fields(next(reader, []), lookup)
+        if 'vesselName' not in fields:
+            raise ValueError('The CSV header has no vessel name column')
+        for row in reader:
+            record = {field: value.strip() for field, value in zip(fields, row) if field and value.strip()}
+            if record:
+                yield reader.line_num, record
@@ -0,0 +1,659 @@
+import re
+import time
+
+from src.extraction.scanner import ScannedText, ScanPattern
+
+# Page markers added by PDF extraction, removed again before matching across page boundaries
+PAGE_START_RE = re.compile(r'=== PAGE \d+ OF \d+ ===\n?')
+PAGE_END_RE = re.compile(r'=== END PAGE \d+ ===\n?')
+WHITESPACE_RE = re.compile(r'\s+')
+
+# Bump when the text handling, a helper a normalizer calls or a template in templates.py changes
+# what gets extracted; pattern and normalizer changes are picked up by the extraction cache's fingerprint
+EXTRACTOR_VERSION = 5
+
+
+class FieldExtractor:
+    r"""Patterns for one output field (or a group of alias fields), tried in priority order.
+
+    ``mode`` decides how the patterns are applied to the ``target`` text
+    (``text`` as extracted, or ``clean_text`` without page markers and with
+    whitespace collapsed):
+
+    - ``search``: the first pattern that matches wins and ``normalize`` gets
+      the match object.
+    - ``scan``: every ``findall`` item of each pattern goes to ``normalize``
+      until one gives a value.
+    - ``max``: the largest number found by the first pattern that finds any.
+    - ``all``: ``normalize`` gets the full ``findall`` list of the single
+      pattern and returns one value per key (None leaves that key unset).
+
+    A normalizer returns None when its input does not give a value. Patterns
+    run through ``ScanPattern``, which skips the ones whose keywords the
+    document lacks without changing which pattern wins.
+
+    Patterns must stay linear in the document size: a gap like ``.*`` only
+    directly after a leading literal (see ScanPattern), ``(?>.*?x)`` for
+    any further gap, ``(?<!\d)`` before a leading ``\d+``, and a bounded
+    repeat wherever a run would otherwise be rescanned from each start.
+    scripts/check_extraction_linear.py checks this on adversarial documents.
+    """
+
+    def __init__(self, keys, patterns, normalize=None, target='text', mode='search'):
+        self.keys = (keys,) if isinstance(keys, str) else tuple(keys)
+        self.patterns = [ScanPattern(pattern) for pattern in patterns]
+        self.normalize = normalize or group_value
+        self.target = target
+        self.mode = mode
+        # Label for statistics: the field, or the first of a group and how many more
+        self.name = self.keys[0] if len(self.keys) == 1 else f'{self.keys[0]} (+{len(self.keys) - 1})'
+
+    def extract(self, doc, stats=None):
+        """The field value found in a ScannedText, or None.
+
+        With stats (a dict), also records how the value was found:
+        patterns_tried, patterns_skipped (tried but ruled out by the keyword
+        prefilter), patterns_exhausted (tried but stopped by their time
+        budget), matched_pattern (index of the pattern that gave the value,
+        or None) and matches (match objects or findall items seen).
+        """
+        tried = 0
+        matches = 0
+        matched = None
+        value = None
+        if self.mode == 'search':
+            for index, pattern in enumerate(self.patterns):
+                tried += 1
+                match = pattern.search(doc)
+                if match:
+                    matches, matched, value = 1, index, self.normalize(match)
+                    break
+        elif self.mode == 'scan':
+            for index, pattern in enumerate(self.patterns):
+                tried += 1
+                for item in pattern.findall(doc):
+                    matches += 1
+                    value = self.normalize(item)
+                    if value is not None:
+                        matched = index
+                        break
+                if matched is not None:
+                    break
+        elif self.mode == 'max':
+            for index, pattern in enumerate(self.patterns):
+                tried += 1
+                items = pattern.findall(doc)
+                matches += len(items)
+                # Take the largest number found (likely the total)
+                numbers = [int(item) for item in items if item.isdigit()]
+                if numbers:
+                    matched, value = index, max(numbers)
+                    break
+        else:
+            tried = 1
+            items = self.patterns[0].findall(doc)
+            matches = len(items)
+            value = self.normalize(items)
+            if value is not None and any(item is not None for item in value):
+                matched = 0
+        if stats is not None:
+            stats.update(
+                patterns_tried=tried,
+                patterns_skipped=sum(1 for pattern in self.patterns[:tried] if pattern.start(doc) < 0),
+                patterns_exhausted=sum(1 for pattern in self.patterns[:tried] if pattern in doc.exhausted),
+                matched_pattern=matched,
+                matches=matches
+            )
+        return value
+
+    def assign(self, data, value):
+        values = value if self.mode == 'all' else [value] * len(self.keys)
+        for key, item in zip(self.keys, values):
+            if item is not None:
+                data[key] = item
+
+
+def group_value(match):
+    return match.group(1).strip()
+
+
+def vessel_name(item):
+    name = item.strip()
+    if len(name) > 2 and not name.lower() in ['type', 'information', 'details']:
+        return name
+    return None
+
+
+def vessel_type(item):
+    kind = str(item).strip().lower()
+    if 'auto' in kind or 'car' in kind or 'vehicle' in kind:
+        return 'Auto Carrier'
+    elif 'roro' in kind or 'ro-ro' in kind:
+        return 'RoRo Vessel'
+    elif 'container' in kind:
+        return 'Container Ship'
+    elif 'multi' in kind:
+        return 'Multi-Purpose'
+    return None
+
+
+def port_name(item):
+    if 'colonel' in str(item).lower():
+        return 'Colonel Island'
+    elif len(str(item).strip()) > 1:
+        return str(item).strip()
+    return None
+
+
+def iso_date(item):
+    """YYYY-MM-DD from an MM/DD/YYYY or YYYY-MM-DD date"""
+    if '/' in item:
+        parts = item.split('/')
+        if len(parts) == 3 and len(parts[2]) == 4:  # MM/DD/YYYY
+            return f"{parts[2]}-{parts[0].zfill(2)}-{parts[1].zfill(2)}"
+    elif '-' in item and len(item.split('-')[0]) == 4:  # YYYY-MM-DD
+        return item
+    return None
+
+
+def known_company(text):
+    """The full name of a stevedoring company text mentions, or None"""
+    found = text.lower()
+    if 'aps' in found:
+        return 'APS Stevedoring'
+    elif 'ssa' in found:
+        return 'SSA Marine'
+    elif 'ports' in found:
+        return 'Ports America'
+    return None
+
+
+def company_name(match):
+    company = known_company(match.group(0))
+    if company:
+        return company
+    return match.group(1).strip() if match.groups() else match.group(0).strip()
+
+
+def brand_count(match):
+    count = match.group(1) or match.group(2) if match.groups() else match.group(0)
+    if count and count.isdigit():
+        return int(count)
+    return None
+
+
+def operation_type(match):
+    return operation_kind(match.group(1) if match.groups() else match.group(0))
+
+
+def operation_kind(text):
+    """'Discharge Only', 'Loading Only' or 'Discharge + Loading' from an operation description, or None"""
+    op_type = text.lower()
+    if 'discharge' in op_type and ('loading' in op_type or 'both' in op_type or '+' in op_type):
+        return 'Discharge + Loading'
+    elif 'discharge' in op_type:
+        return 'Discharge Only'
+    elif 'loading' in op_type:
+        return 'Loading Only'
+    elif 'both' in op_type:
+        return 'Discharge + Loading'
+    return None
+
+
+def known_person(first_name, full_name):
+    """Normalizer giving full_name when the match mentions first_name, else the captured name"""
+    def normalize(match):
+        if first_name in match.group(0).lower():
+            return full_name
+        elif match.groups():
+            return match.group(1).strip()
+        return None
+    return normalize
+
+
+def berth_location(item):
+    berth_identifier = str(item).strip()
+    # Handle single digit berth numbers
+    if berth_identifier in ['1', '2', '3']:
+        return f'Berth {berth_identifier}'
+    # Handle full berth names
+    elif 'berth' in berth_identifier.lower() and any(num in berth_identifier for num in ['1', '2', '3']):
+        return berth_identifier.title()
+    # Handle other dock/pier references: extract the number and format as Berth X
+    for num in ['1', '2', '3']:
+        if num in berth_identifier:
+            return f'Berth {num}'
+    return None
+
+
+def van_numbers(matches):
+    """Generic V<number> ids for the first four vans, when at least four are listed"""
+    if len(matches) >= 4:
+        return [f'V{number}' for number in matches[:4]]
+    return None
+
+
+def first_by_number(numbers):
+    """Normalizer giving, for each number, the id from its first (number, id) match"""
+    def normalize(matches):
+        found = {}
+        for number, value in matches:
+            found.setdefault(number, value.strip())
+        return [found.get(number) for number in numbers]
+    return normalize
+
+
+def numbered_ids(keys, label, numbers):
+    """Extractor for '<label> N id: X' ids, one key per number.
+
+    The lookahead pattern matches at every position, overlaps included, so
+    one findall finds for each N the same first match a separate
+    '<label>\\s*N\\s*id' search would. Numbers are compared as text, so
+    'van 07 id' does not count as van 7.
+    """
+    return FieldExtractor(keys, [rf'(?={label}\s*(\d+)\s*id[:\s]+([A-Za-z0-9]+))'], first_by_number(numbers), mode='all')
+
+
+def zee_priority(match):
+    return priority_kind(match.group(1))
+
+
+def priority_kind(text):
+    """'high', 'urgent', 'express' or 'standard' from a priority description"""
+    priority = text.strip().lower()
+    if 'high' in priority:
+        return 'high'
+    elif 'urgent' in priority:
+        return 'urgent'
+    elif 'express' in priority:
+        return 'express'
+    return 'standard'
+
+
+# Every extractor in output order, compiled once at import
+FIELD_EXTRACTORS = [
+    FieldExtractor('vesselName', [
+        r'vessel\s*name[:\s\-=]+([A-Za-z0-9\s\-\.]+)',
+        r'ship\s*name[:\s\-=]+([A-Za-z0-9\s\-\.]+)',
+        r'mv\s+([A-Za-z0-9\s\-\.]+)',
+        r'm/v\s+([A-Za-z0-9\s\-\.]+)',
+        r'vessel[:\s\-=]+([A-Za-z0-9\s\-\.]+)',
+        r'name\s*of\s*vessel[:\s\-=]+([A-Za-z0-9\s\-\.]+)',
+        r'ship[:\s\-=]+([A-Za-z0-9\s\-\.]+)',
+        r'vessel\s*:\s*([A-Za-z0-9\s\-\.]+)',
+        # Clean text has no whitespace runs, so '\s?' matches what '\s*' would; bounded, these
+        # two are only tried in windows around their keywords (see ScanPattern)
+        r'([A-Z][A-Z\s]{2,20})\s?(?:vessel|ship)',
+        r'(?:the\s)?([A-Z][A-Za-z\s]{5,30})\s?(?:auto\s?carrier|roro|vessel)'
+    ], vessel_name, target='clean_text', mode='scan'),
+
+    FieldExtractor('vesselType', [
+        r'vessel\s*type[:\s\-=]+([A-Za-z\s\-]+)',
+        r'ship\s*type[:\s\-=]+([A-Za-z\s\-]+)',
+        r'type[:\s\-=]+(auto\s*carrier|roro|ro-ro|container|multi-purpose|car\s*carrier)',
+        r'(auto\s*carrier|roro|ro-ro|container\s*ship|multi-purpose|car\s*carrier)',
+        r'vehicle\s*carrier',
+        r'automobile\s*carrier'
+    ], vessel_type, target='clean_text', mode='scan'),
+
+    FieldExtractor('port', [
+        r'port[:\s\-=]+([A-Za-z\s]+)',
+        r'destination[:\s\-=]+([A-Za-z\s]+)',
+        r'berth[:\s\-=]+([A-Za-z0-9\s]+)',
+        r'location[:\s\-=]+([A-Za-z\s]+)',
+        r'terminal[:\s\-=]+([A-Za-z\s]+)',
+        r'colonel\s*island',
+        r'brunswick',
+        r'savannah',
+        r'charleston',
+        r'(colonel\s*island|brunswick|savannah|charleston)',
+        r'discharge\s*port[:\s\-=]+([A-Za-z\s]+)',
+        r'loading\s*port[:\s\-=]+([A-Za-z\s]+)'
+    ], port_name, target='clean_text', mode='scan'),
+
+    FieldExtractor('operationDate', [
+        r'(\d{4}-\d{2}-\d{2})',
+        r'(\d{2}/\d{2}/\d{4})',
+        r'(\d{2}-\d{2}-\d{4})',
+        r'date[:\s]+(\d{1,2}[/-]\d{1,2}[/-]\d{4})'
+    ], iso_date, target='clean_text', mode='scan'),
+
+    FieldExtractor('company', [
+        r'stevedoring[:\s]+([A-Za-z\s]+)',
+        r'company[:\s]+([A-Za-z\s]+)',
+        r'aps\s*stevedoring',
+        r'ssa\s*marine',
+        r'ports\s*america'
+    ], company_name),
+
+    FieldExtractor(['totalAutomobilesDischarge', 'totalAutomobiles', 'automobiles'], [
+        r'total\s*automobiles?[:\s]+(\d+)',
+        r'total\s*vehicles?[:\s]+(\d+)',
+        r'automobiles?\s*discharge[:\s]+(\d+)',
+        r'automobiles?[:\s]+(\d+)',
+        r'cars?[:\s]+(\d+)',
+        r'units?[:\s]+(\d+)',
+        r'(?<!\d)(\d+)\s*automobiles?',
+        r'(?<!\d)(\d+)\s*vehicles?',
+        r'(?<!\d)(\d+)\s*cars?'
+    ], target='clean_text', mode='max'),
+
+    FieldExtractor(['heavyEquipmentDischarge', 'heavyEquipment'], [
+        r'heavy\s*equipment\s*units?[:\s]+(\d+)',
+        r'heavy\s*equipment[:\s]+(\d+)',
+        r'hh[:\s]+(\d+)',
+        r'high\s*&\s*heavy[:\s]+(\d+)',
+        r'high\s*and\s*heavy[:\s]+(\d+)',
+        r'(?<!\d)(\d+)\s*heavy\s*equipment',
+        r'equipment\s*units?[:\s]+(\d+)'
+    ], target='clean_text', mode='max'),
+
+    # Brand-specific counts
+    FieldExtractor('mbCount', [r'mercedes[-\s]*benz[:\s]+(\d+)|mb[:\s]+(\d+)'], brand_count),
+    FieldExtractor('bmwCount', [r'bmw[:\s]+(\d+)'], brand_count),
+    FieldExtractor('lrCount', [r'land\s*rover[:\s]+(\d+)|lr[:\s]+(\d+)'], brand_count),
+    FieldExtractor('rrCount', [r'rolls[-\s]*royce[:\s]+(\d+)|rr[:\s]+(\d+)'], brand_count),
+
+    FieldExtractor('operationType', [
+        r'operation[:\s\-=]+(discharge|loading|discharge\s*\+\s*loading|discharge\s*and\s*loading)',
+        r'(discharge\s*only|loading\s*only|discharge\s*and\s*loading)',
+        r'type\s*of\s*operation[:\s\-=]+(discharge|loading|both)',
+        r'operation\s*type[:\s\-=]+(discharge|loading|both)',
+        r'work\s*type[:\s\-=]+(discharge|loading|both)',
+        r'(discharge|loading|both)\s*operation',
+        r'cargo\s*operation[:\s\-=]+(discharge|loading|both)'
+    ], operation_type, target='clean_text'),
+
+    # Team assignments: Auto Operations Team. The last two fallbacks follow a
+    # name onto later lines for at most 200 characters
+    FieldExtractor('autoOperationsLead', [
+        r'auto\s*operations?\s*team[:\s]*lead\s*supervisor[:\s]+([A-Za-z\s]+)',
+        r'auto\s*operations?[:\s]*lead[:\s]+([A-Za-z\s]+)',
+        r'lead\s*supervisor[:\s]+([A-Za-z\s]+)',
+        r'colby\s+chapman',
+        r'auto(?>.*?lead).*((?:\n[A-Za-z\s]{0,200})?[A-Za-z\s]chapman)',
+        r'auto(?:.*?|.*\n[A-Za-z\s]{0,200}?)(colby[A-Za-z\s]*)'
+    ], known_person('colby', 'Colby Chapman')),
+
+    FieldExtractor('autoOperationsAssistant', [
+        r'auto\s*operations?\s*team[:\s]*assistant\s*supervisor[:\s]+([A-Za-z\s]+)',
+        r'auto\s*operations?[:\s]*assistant[:\s]+([A-Za-z\s]+)',
+        r'assistant\s*supervisor[:\s]+([A-Za-z\s]+)',
+        r'cole\s+bailey',
+        r'auto(?>.*?assistant).*((?:\n[A-Za-z\s]{0,200})?[A-Za-z\s]bailey)',
+        r'auto(?:.*?|.*\n[A-Za-z\s]{0,200}?)(cole[A-Za-z\s]*)'
+    ], known_person('cole', 'Cole Bailey')),
+
+    # High & Heavy Team
+    FieldExtractor('heavyHeavyLead', [
+        r'high\s*&?\s*heavy\s*team[:\s]*lead\s*supervisor[:\s]+([A-Za-z\s]+)',
+        r'high\s*&?\s*heavy[:\s]*lead[:\s]+([A-Za-z\s]+)',
+        r'heavy\s*equipment[:\s]*lead[:\s]+([A-Za-z\s]+)',
+        r'spencer\s+wilkins',
+        r'heavy(?>.*?lead).*((?:\n[A-Za-z\s]{0,200})?[A-Za-z\s]wilkins)',
+        r'heavy(?:.*?|.*\n[A-Za-z\s]{0,200}?)(spencer[A-Za-z\s]*)'
+    ], known_person('spencer', 'Spencer Wilkins')),
+
+    FieldExtractor('heavyHeavyAssistant', [
+        r'high\s*&?\s*heavy\s*team[:\s]*assistant\s*supervisor[:\s]+([A-Za-z\s]+)',
+        r'high\s*&?\s*heavy[:\s]*assistant[:\s]+([A-Za-z\s]+)',
+        r'heavy\s*equipment[:\s]*assistant[:\s]+([A-Za-z\s]+)',
+        r'bruce\s+banner',
+        r'heavy(?>.*?assistant).*((?:\n[A-Za-z\s]{0,200})?[A-Za-z\s]banner)',
+        r'heavy(?:.*?|.*\n[A-Za-z\s]{0,200}?)(bruce[A-Za-z\s]*)'
+    ], known_person('bruce', 'Bruce Banner')),
+
+    FieldExtractor('operationManager', [
+        r'operation\s*manager[:\s]+([A-Za-z\s]+)',
+        r'manager[:\s]+([A-Za-z\s]+)',
+        r'your\s*name[:\s]+([A-Za-z\s]+)',
+        r'john\s+smith',
+        r'supervisor[:\s]+([A-Za-z\s]+)'
+    ], known_person('john', 'John Smith')),
+
+    FieldExtractor(['berthLocation', 'berth', 'berthAssignment'], [
+        r'berth\s*location[:\s\-=]+([A-Za-z0-9\s]+)',
+        r'berth[:\s\-=]+([123456])',
+        r'berth\s*([123456])',
+        r'assigned.*berth[:\s\-=]*([123456])',
+        r'berth\s*assignment[:\s\-=]+([A-Za-z0-9\s]+)',
+        r'dock[:\s\-=]+([123456])',
+        r'pier[:\s\-=]+([123456])',
+        r'terminal\s*berth[:\s\-=]+([123456])',
+        r'vessel.*berth[:\s\-=]+([123456])',
+        r'ship.*berth[:\s\-=]+([123456])',
+        r'mooring[:\s\-=]+([A-Za-z0-9\s]+)',
+        r'wharf[:\s\-=]+([A-Za-z0-9\s]+)',
+        r'(?:at\s+)?berth\s*(\d+)',
+        r'(?:position|location)[:\s\-=]+berth\s*(\d+)'
+    ], berth_location, target='clean_text', mode='scan'),
+
+    # Operational parameters
+    FieldExtractor('expectedRate', [
+        r'expected\s*rate[:\s]+(\d+(?:\.\d+)?)',
+        r'rate[:\s]+(\d+(?:\.\d+)?)\s*cars?/hour',
+        r'(?<!\d)(\d+(?:\.\d+)?)\s*cars?/hour',
+        r'processing\s*rate[:\s]+(\d+(?:\.\d+)?)'
+    ]),
+
+    FieldExtractor('totalDrivers', [
+        r'total\s*drivers?[:\s]+(\d+)',
+        r'drivers?[:\s]+(\d+)\s*drivers?',
+        r'(?<!\d)(\d+)\s*drivers?\s*total'
+    ]),
+
+    FieldExtractor('shiftStart', [
+        r'shift\s*start[:\s]+(\d{1,2}:\d{2}(?:\s*[AP]M)?)',
+        r'start\s*time[:\s]+(\d{1,2}:\d{2}(?:\s*[AP]M)?)',
+        r'(\d{1,2}:\d{2}\s*AM).{0,200}?shift',
+    ]),
+
+    FieldExtractor('shiftEnd', [
+        r'shift\s*end[:\s]+(\d{1,2}:\d{2}(?:\s*[AP]M)?)',
+        r'end\s*time[:\s]+(\d{1,2}:\d{2}(?:\s*[AP]M)?)',
+        r'(\d{1,2}:\d{2}\s*PM).{0,200}?shift',
+    ]),
+
+    FieldExtractor('breakDuration', [
+        r'break\s*duration[:\s]+(\d+)',
+        r'break[:\s]+(\d+)\s*minutes?',
+        r'(?<!\d)(\d+)\s*minutes?\s*break',
+    ]),
+
+    # Vehicle IDs, then generic V<number> ids, which win when at least four are listed
+    numbered_ids(['van1Id', 'van2Id', 'van3Id', 'van4Id'], 'van', ['1', '2', '3', '4']),
+    FieldExtractor(['van1Id', 'van2Id', 'van3Id', 'van4Id'], [r'v(\d+)'], van_numbers, mode='all'),
+
+    # Zone allocations
+    FieldExtractor('zoneA', [r'zone\s*a[:\s]+(\d+)']),
+    FieldExtractor('zoneB', [r'zone\s*b[:\s]+(\d+)']),
+    FieldExtractor('zoneC', [r'zone\s*c[:\s]+(\d+)']),
+
+    # Loading targets
+    FieldExtractor('brvTarget', [
+        r'brv\s*terminal[:\s]+(\d+)',
+        r'brv\s*total\s*vehicles?[:\s]+(\d+)',
+        r'brv[:\s]+(\d+)',
+        r'brunswick\s*terminal[:\s]+(\d+)'
+    ], target='clean_text', mode='max'),
+
+    FieldExtractor('zeeTarget', [
+        r'zee\s*compound[:\s]+(\d+)',
+        r'zee\s*total\s*vehicles?[:\s]+(\d+)',
+        r'zee[:\s]+(\d+)',
+        r'zee\s*facility[:\s]+(\d+)'
+    ], target='clean_text', mode='max'),
+
+    FieldExtractor('souTarget', [
+        r'sou\s*facility[:\s]+(\d+)',
+        r'sou\s*total\s*vehicles?[:\s]+(\d+)',
+        r'sou[:\s]+(\d+)',
+        r'southern\s*facility[:\s]+(\d+)'
+    ], target='clean_text', mode='max'),
+
+    # Additional vehicle brands
+    FieldExtractor('audi', [r'audi[:\s]+(\d+)']),
+    FieldExtractor('porsche', [r'porsche[:\s]+(\d+)']),
+    FieldExtractor('mini', [r'mini[:\s]+(\d+)']),
+    FieldExtractor('jaguar', [r'jaguar[:\s]+(\d+)']),
+
+    # Additional cargo fields
+    FieldExtractor('electricVehicles', [
+        r'electric\s*vehicles?[:\s]+(\d+)',
+        r'ev[:\s]+(\d+)',
+        r'(?<!\d)(\d+)\s*electric\s*vehicles?'
+    ]),
+
+    # ZEE Compound
+    FieldExtractor('zeeAutomobiles', [
+        r'zee\s*automobiles?[:\s]+(\d+)',
+        r'zee\s*compound\s*automobiles?[:\s]+(\d+)',
+        r'zee.*automobiles?[:\s]+(\d+)'
+    ]),
+
+    FieldExtractor('zeeHeavyEquipment', [
+        r'zee\s*heavy\s*equipment[:\s]+(\d+)',
+        r'zee\s*compound\s*heavy[:\s]+(\d+)',
+        r'zee(?>.*?heavy).*equipment[:\s]+(\d+)'
+    ]),
+
+    FieldExtractor('zeeElectricVehicles', [
+        r'zee\s*electric\s*vehicles?[:\s]+(\d+)',
+        r'zee\s*compound\s*electric[:\s]+(\d+)',
+        r'zee(?>.*?electric).*vehicles?[:\s]+(\d+)'
+    ]),
+
+    FieldExtractor('zeeStaticCargo', [
+        r'zee\s*static\s*cargo[:\s]+(\d+)',
+        r'zee\s*compound\s*static[:\s]+(\d+)',
+        r'zee(?>.*?static).*cargo[:\s]+(\d+)'
+    ]),
+
+    FieldExtractor('zeeCargoType', [
+        r'zee\s*cargo\s*type[:\s]+([A-Za-z\s\-]+)',
+        r'zee\s*compound\s*cargo[:\s]+([A-Za-z\s\-]+)',
+        r'zee(?>.*?cargo).*type[:\s]+([A-Za-z\s\-]+)'
+    ]),
+
+    FieldExtractor('zeeCargoValue', [
+        r'zee\s*cargo\s*value[:\s]+(\d+)',
+        r'zee\s*compound\s*value[:\s]+(\d+)',
+        r'zee.*value[:\s]+(\d+)'
+    ]),
+
+    FieldExtractor('zeePriority', [
+        r'zee\s*priority[:\s]+([A-Za-z\s]+)',
+        r'zee\s*compound\s*priority[:\s]+([A-Za-z\s]+)',
+        r'zee.*priority[:\s]+([A-Za-z\s]+)'
+    ], zee_priority),
+
+    FieldExtractor('staticCargo', [
+        r'static\s*cargo[:\s]+(\d+)',
+        r'static\s*cargo\s*units?[:\s]+(\d+)',
+        r'(?<!\d)(\d+)\s*static\s*cargo'
+    ]),
+
+    FieldExtractor('cargoType', [
+        r'cargo\s*brand[/\s]*type[:\s]+([A-Za-z\s\-]+)',
+        r'cargo\s*type[:\s]+([A-Za-z\s\-]+)',
+        r'brand[/\s]*type[:\s]+([A-Za-z\s\-]+)'
+    ]),
+
+    # Zone descriptions
+    FieldExtractor('zoneADescription', [r'zone\s*a[:\s]*description[:\s]+([A-Za-z\s\-]+)']),
+    FieldExtractor('zoneBDescription', [r'zone\s*b[:\s]*description[:\s]+([A-Za-z\s\-]+)']),
+    FieldExtractor('zoneCDescription', [r'zone\s*c[:\s]*description[:\s]+([A-Za-z\s\-]+)']),
+
+    # TICO Transportation vehicle counts
+    FieldExtractor('numVans', [
+        r'number\s*of\s*vans[:\s]+(\d+)',
+        r'vans?[:\s]+(\d+)',
+        r'(?<!\d)(\d+)\s*vans?'
+    ]),
+
+    FieldExtractor('numStationWagons', [
+        r'number\s*of\s*station\s*wagons?[:\s]+(\d+)',
+        r'station\s*wagons?[:\s]+(\d+)',
+        r'(?<!\d)(\d+)\s*station\s*wagons?'
+    ]),
+]
+
+# Individual vehicle IDs (up to 15 vans and 15 wagons)
+ID_NUMBERS = [str(i) for i in range(1, 16)]
+FIELD_EXTRACTORS += [
+    numbered_ids([f'vanId{i}' for i in ID_NUMBERS], 'van', ID_NUMBERS),
+    numbered_ids([f'wagonId{i}' for i in ID_NUMBERS], r'(?:station\s*wagon|wagon)', ID_NUMBERS),
+]
+
+
+def name_extractors(extractors):
+    """Number the names of extractors after the first that fill the same fields ('van1Id (+3) #2').
+
+    Statistics are kept by name, so two extractors under one name would
+    overwrite each other's.
+    """
+    seen = {}
+    for extractor in extractors:
+        base = extractor.name.split(' #')[0]
+        seen[base] = seen.get(base, 0) + 1
+        extractor.name = base if seen[base] == 1 else f'{base} #{seen[base]}'
+    return extractors
+
+
+name_extractors(FIELD_EXTRACTORS)
+
+
+def strip_page_markers(text):
+    if '===' not in text:
+        return text
+    return PAGE_END_RE.sub(' ', PAGE_START_RE.sub(' ', text))
+
+
+def clean_document_text(text):
+    """Text with page markers removed and whitespace collapsed, for matching across page boundaries"""
+    return WHITESPACE_RE.sub(' ', strip_page_markers(text))
+
+
+def clean_page_texts(pages):
+    """clean_document_text of the marked-up pages, built from the page texts directly"""
+    return WHITESPACE_RE.sub(' ', ''.join(f' {strip_page_markers(page)} ' for page in pages))
+
+
+def extract_fields(text, extractors=FIELD_EXTRACTORS, clean_text=None, stats=None, known=None):
+    """Run the extractors over a document; returns field name -> value.
+
+    clean_text can be passed when the caller built it already (see
+    clean_document_text). known maps extractors to values already read
+    from the document some other way (see templates.py); those extractors
+    are not run. With stats (a dict), each extractor's
+    FieldExtractor.extract statistics plus its time in seconds are stored
+    under its name (unique among FIELD_EXTRACTORS, see name_extractors),
+    with from_template set for the known values.
+    """
+    known = known or {}
+    # Only the texts some extractor still has to search are prepared
+    targets = {extractor.target for extractor in extractors if extractor not in known}
+    texts = {}
+    if 'text' in targets:
+        texts['text'] = ScannedText(text)
+    if 'clean_text' in targets:
+        texts['clean_text'] = ScannedText(clean_document_text(text) if clean_text is None else clean_text)
+    data = {}
+    for extractor in extractors:
+        if extractor in known:
+            value = known[extractor]
+            if stats is not None:
+                stats[extractor.name] = {
+                    'seconds': 0.0, 'patterns_tried': 0, 'patterns_skipped': 0, 'patterns_exhausted': 0,
+                    'matched_pattern': None, 'matches': 0, 'from_template': True
+                }
+        elif stats is None:
+            value = extractor.extract(texts[extractor.target])
+        else:
+            field_stats = stats[extractor.name] = {}
+            start = time.perf_counter()
+            value = extractor.extract(texts[extractor.target], field_stats)
+            field_stats['seconds'] = time.perf_counter() - start
+        if value is not None:
+            extractor.assign(data, value)
+    return data
@@ -0,0 +1,146 @@
+import json
+import os
+import threading
+import time
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+from src.models.ship_store import atomic_write_json
+
+# How often a wait on a job owned by another worker process rereads its file
+JOB_POLL_SECONDS = 0.5
+
+FINISHED = ('done', 'failed')
+
+
+class ExtractionJobs:
+    """Background extraction jobs run by a bounded thread pool.
+
+    ``submit`` queues a callable and returns the job record at once, or
+    None when ``max_pending`` jobs are already queued or running, so the
+    caller can push back instead of piling work up. With a ``directory``,
+    every status change is also written there as ``<id>.json``, so a
+    worker process other than the one running a job can answer polls for
+    it. Finished jobs, and job files untouched for as long, are forgotten
+    after ``keep_seconds``.
+    """
+
+    def __init__(self, workers=2, max_pending=16, directory=None, keep_seconds=3600):
+        self.max_pending = max_pending
+        self.directory = directory
+        self.keep_seconds = keep_seconds
+        self._executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix='extract-job')
+        self._jobs = {}
+        self._pending = 0
+        self._changed = threading.Condition()
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def _path(self, job_id):
+        return os.path.join(self.directory, f'{job_id}.json')
+
+    def _save(self, job):
+        """Publish a job's current state (condition held)"""
+        self._jobs[job['id']] = job
+        self._changed.notify_all()
+        if self.directory:
+            try:
+                atomic_write_json(self._path(job['id']), job)
+            except OSError as e:
+                print(f"Error writing extraction job {job['id']}: {e}")
+
+    def submit(self, work, **details):
+        """Queue work() and return the new job record, or None when the queue is full.
+
+        work returns the job's result (a JSON-serializable dict); an
+        exception fails the job with its message. details (e.g. filename)
+        are copied into the record.
+        """
+        with self._changed:
+            if self._pending >= self.max_pending:
+                return None
+            self._prune()
+            job = dict(details, id=uuid.uuid4().hex, status='queued', submittedAt=datetime.now().isoformat())
+            self._pending += 1
+            self._save(job)
+        self._executor.submit(self._run, job['id'], work)
+        return dict(job)
+
+    def _run(self, job_id, work):
+        with self._changed:
+            job = dict(self._jobs[job_id], status='running', startedAt=datetime.now().isoformat())
+            self._save(job)
+        try:
+            finished = {'status': 'done', 'result': work()}
+        except Exception as e:
+            print(f"Extraction job {job_id} failed: {str(e)}")
+            finished = {'status': 'failed', 'error': str(e)}
+        with self._changed:
+            job = dict(job, finishedAt=datetime.now().isoformat(), **finished)
+            self._pending -= 1
+            self._save(job)
+
+    def _prune(self):
+        """Forget finished jobs older than keep_seconds (condition held).
+
+        Also removes job files in the directory last written more than
+        keep_seconds ago, whichever process wrote them, so jobs of other or
+        restarted workers (and ones a crash left unfinished) age out too.
+        """
+        cutoff = (datetime.now() - timedelta(seconds=self.keep_seconds)).isoformat()
+        for job_id, job in list(self._jobs.items()):
+            # ISO timestamps from the same clock compare chronologically
+            if job['status'] in FINISHED and job['finishedAt'] < cutoff:
+                del self._jobs[job_id]
+        if not self.directory:
+            return
+        mtime_cutoff = time.time() - self.keep_seconds
+        try:
+            entries = list(os.scandir(self.directory))
+        except OSError as e:
+            print(f"Error listing extraction jobs: {e}")
+            return
+        for entry in entries:
+            job = self._jobs.get(entry.name[:-len('.json')])
+            if job is not None and job['status'] not in FINISHED:
+                continue
+            try:
+                if entry.is_file() and entry.stat().st_mtime < mtime_cutoff:
+                    os.remove(entry.path)
+            except FileNotFoundError:
+                # Another worker process pruned it first
+                pass
+            except OSError as e:
+                print(f"Error removing extraction job file {entry.name}: {e}")
+
+    def pending(self):
+        """Number of jobs queued or running in this process"""
+        with self._changed:
+            return self._pending
+
+    def get(self, job_id):
+        """A job's current record, from this process or the jobs directory, or None"""
+        with self._changed:
+            job = self._jobs.get(job_id)
+        if job is not None:
+            return dict(job)
+        if not self.directory or not all(c in '0123456789abcdef' for c in job_id):
+            return None
+        try:
+            with open(self._path(job_id), 'r') as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return None
+
+    def wait(self, job_id, timeout):
+        """The job's record once it has finished, or its latest record after timeout seconds"""
+        deadline = time.monotonic() + timeout
+        with self._changed:
+            while True:
+                job = self.get(job_id)
+                remaining = deadline - time.monotonic()
+                if job is None or job['status'] in FINISHED or remaining <= 0:
+                    return job
+                # Jobs run here notify right away; other workers' jobs are seen by rereading the file
+                self._changed.wait(remaining if job_id in self._jobs else min(remaining, JOB_POLL_SECONDS))
@@ -0,0 +1,283 @@
+import concurrent.futures
+import hashlib
+import os
+import signal
+import time
+
+from pypdf import PdfReader
+from pypdf.generic import ArrayObject, DictionaryObject, IndirectObject, StreamObject
+
+from src.extraction.fields import clean_page_texts
+from src.extraction.pool import discard_pool, get_pool
+
+# Separators around each page in the extracted text
+PAGE_HEADER = '\n=== PAGE {number} OF {total} ===\n'
+PAGE_FOOTER = '\n=== END PAGE {number} ===\n'
+
+# Pages queued per worker ahead of the page being collected, so a document deadline wastes little work
+PAGES_AHEAD_PER_WORKER = 2
+
+# Stream entries that only say how the data is stored; fingerprints cover the decoded data instead
+STREAM_STORAGE_KEYS = {'/Length', '/Filter', '/DecodeParms'}
+# Page entries text extraction reads
+PAGE_TEXT_KEYS = ('/Contents', '/Resources', '/Rotate')
+
+# Worker-side cache of the document being read, so each worker parses it once
+_worker_document = (None, None)
+
+
+class PageTimeout(BaseException):
+    """Raised inside a worker when a page runs past its time budget.
+
+    Not an Exception, so pypdf's own broad ``except Exception`` recovery
+    cannot swallow it and carry on with the page.
+    """
+
+
+def _raise_page_timeout(signum, frame):
+    raise PageTimeout()
+
+
+def _iter_page_objects(source):
+    """Yield (page number, page count, pypdf page) for a file path or a seekable binary stream"""
+    if isinstance(source, str):
+        file = open(source, 'rb')
+    else:
+        file = source
+        file.seek(0)
+    try:
+        pdf_reader = PdfReader(file)
+        total_pages = len(pdf_reader.pages)
+        for page_num, page in enumerate(pdf_reader.pages, 1):
+            yield page_num, total_pages, page
+    finally:
+        if file is not source:
+            file.close()
+
+
+def iter_pdf_pages(source):
+    """Yield (page number, page count, page text), extracting each page only when it is reached.
+
+    source is a file path or a seekable binary stream (read from the start).
+    """
+    for page_num, total_pages, page in _iter_page_objects(source):
+        yield page_num, total_pages, page.extract_text() or ""
+
+
+def _object_digest(obj, memo):
+    """Digest of a PDF object's content, references followed; memo keeps those of indirect objects"""
+    if isinstance(obj, IndirectObject):
+        key = (obj.idnum, obj.generation)
+        if key not in memo:
+            # Stands in for the object if it refers back to itself
+            memo[key] = b'cycle'
+            memo[key] = _object_digest(obj.get_object(), memo)
+        return memo[key]
+    digest = hashlib.sha256(type(obj).__name__.encode())
+    if isinstance(obj, DictionaryObject):
+        is_stream = isinstance(obj, StreamObject)
+        for name in sorted(obj):
+            if name == '/Parent' or (is_stream and name in STREAM_STORAGE_KEYS):
+                continue
+            digest.update(name.encode())
+            digest.update(_object_digest(obj.raw_get(name), memo))
+        # Image data never becomes text
+        if is_stream and obj.get('/Subtype') != '/Image':
+            digest.update(obj.get_data())
+    elif isinstance(obj, ArrayObject):
+        for item in obj:
+            digest.update(_object_digest(item, memo))
+    else:
+        digest.update(repr(obj).encode())
+    return digest.digest()
+
+
+def page_fingerprint(page, memo=None):
+    """Hex digest of what a page's text is extracted from: its content streams and the resources they use.
+
+    Object numbers and stream compression are left out, so unchanged pages
+    of a revision still match when a different tool wrote the file. memo
+    (a dict) lets the pages of one document share the digests of objects
+    such as fonts.
+    """
+    memo = {} if memo is None else memo
+    digest = hashlib.sha256()
+    for name in PAGE_TEXT_KEYS:
+        digest.update(name.encode())
+        digest.update(_object_digest(page.raw_get(name) if name in page else None, memo))
+    return digest.hexdigest()
+
+
+def _page_lookup(page_cache):
+    """A function giving (cache key, cached entry or None) for a pypdf page of one document"""
+    memo = {}
+
+    def lookup(page):
+        try:
+            key = page_cache.page_key(page_fingerprint(page, memo))
+        except Exception as e:
+            print(f"Error fingerprinting PDF page: {str(e)}")
+            return None, None
+        return key, page_cache.get(key)[0]
+    return lookup
+
+
+def mark_pages(pages, total_pages):
+    """The page texts joined with page markers, as extract_text_from_pdf returns them"""
+    parts = []
+    for page_num, page_text in enumerate(pages, 1):
+        parts.append(PAGE_HEADER.format(number=page_num, total=total_pages))
+        parts.append(page_text)
+        parts.append(PAGE_FOOTER.format(number=page_num))
+    return ''.join(parts)
+
+
+def _worker_reader(file_path):
+    """The worker's PdfReader for file_path, reparsed only when another (or a changed) file comes in"""
+    global _worker_document
+    stat = os.stat(file_path)
+    key = (file_path, stat.st_mtime_ns, stat.st_size)
+    cached_key, reader = _worker_document
+    if cached_key != key:
+        # PdfReader loads a named file into memory, so the upload can be removed while workers hold it
+        reader = PdfReader(file_path)
+        _worker_document = (key, reader)
+    return reader
+
+
+def _extract_page(file_path, page_index, page_timeout):
+    """Worker task: the text of one page, or None if it ran past page_timeout seconds"""
+    page = _worker_reader(file_path).pages[page_index]
+    if not page_timeout or not hasattr(signal, 'setitimer'):
+        return page.extract_text() or ""
+    # Pool workers run tasks on their main thread, so an alarm can interrupt a runaway page
+    previous = signal.signal(signal.SIGALRM, _raise_page_timeout)
+    signal.setitimer(signal.ITIMER_REAL, page_timeout)
+    try:
+        try:
+            return page.extract_text() or ""
+        finally:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+    except PageTimeout:
+        # Also covers an alarm landing just after the text came back
+        return None
+    finally:
+        signal.signal(signal.SIGALRM, previous)
+
+
+def _iter_parallel_pages(file_path, pool, workers, page_timeout, deadline, lookup=None):
+    """Yield (page number, page count, page text or None, cache key, cached entry), extracted by pool.
+
+    A bounded window of pages is queued ahead of the one being collected
+    and results come back in page order. Text is None for a page that ran
+    past page_timeout or failed in its worker. Pages lookup finds cached
+    are not sent to the pool. Stops early, without yielding the rest, once
+    the deadline has passed.
+    """
+    pdf_reader = PdfReader(file_path)
+    total_pages = len(pdf_reader.pages)
+    ahead = workers * PAGES_AHEAD_PER_WORKER
+    futures = {}
+    queued = 0
+    try:
+        for page_index in range(total_pages):
+            while queued < total_pages and queued <= page_index + ahead:
+                key, entry = lookup(pdf_reader.pages[queued]) if lookup else (None, None)
+                future = None if entry else pool.submit(_extract_page, file_path, queued, page_timeout)
+                futures[queued] = (key, entry, future)
+                queued += 1
+            key, entry, future = futures.pop(page_index)
+            if entry:
+                yield page_index + 1, total_pages, entry['text'], key, entry
+                continue
+            timeout = None if deadline is None else max(deadline - time.monotonic(), 0)
+            try:
+                page_text = future.result(timeout=timeout)
+            except concurrent.futures.TimeoutError:
+                return
+            except concurrent.futures.process.BrokenProcessPool:
+                discard_pool('pages', pool)
+                raise
+            except Exception as e:
+                print(f"Error extracting PDF page {page_index + 1}: {str(e)}")
+                page_text = None
+            yield page_index + 1, total_pages, page_text, key, None
+    finally:
+        for _, _, future in futures.values():
+            if future:
+                future.cancel()
+
+
+def _iter_timed_pages(source, deadline, lookup=None):
+    """Yield pages as _iter_parallel_pages does, read in this thread.
+
+    Stops before the next page once the deadline has passed.
+    """
+    page_iter = _iter_page_objects(source)
+    try:
+        for page_num, total_pages, page in page_iter:
+            key, entry = lookup(page) if lookup else (None, None)
+            page_text = entry['text'] if entry else page.extract_text() or ""
+            yield page_num, total_pages, page_text, key, entry
+            if deadline is not None and time.monotonic() >= deadline:
+                return
+    finally:
+        page_iter.close()
+
+
+def read_pdf(source, workers=0, page_timeout=None, document_timeout=None, page_cache=None):
+    """Read a PDF (a file path or a binary stream) page by page for field extraction.
+
+    Every page is read: a later page can still change what is parsed (a
+    larger total, a match for a higher-priority pattern), so no set of
+    fields found on the first pages makes the rest safe to skip.
+
+    With workers and a file path, pages are extracted by the 'pages' pool
+    (see start_pool; its processes open the file themselves) and a page
+    running past page_timeout seconds is left empty instead of holding up
+    the document; streams, and files when no pool was started, are read in
+    this thread. Pages not reached within document_timeout seconds are
+    skipped.
+
+    With a page_cache (an ExtractionCache), each page's text is cached by
+    page_fingerprint, so a revised document only has its changed pages
+    extracted again.
+
+    Returns a dict with text (carrying the usual page markers), clean_text
+    (built from the page texts without stripping the markers out again),
+    pages_read, pages_cached (pages read from page_cache), total_pages,
+    timed_out_pages (page numbers left empty) and truncated (whether the
+    document budget ran out first).
+    """
+    deadline = time.monotonic() + document_timeout if document_timeout else None
+    lookup = _page_lookup(page_cache) if page_cache is not None else None
+    pool = get_pool('pages') if workers and isinstance(source, str) else None
+    if pool:
+        page_iter = _iter_parallel_pages(source, pool, workers, page_timeout, deadline, lookup)
+    else:
+        page_iter = _iter_timed_pages(source, deadline, lookup)
+    pages = []
+    pages_cached = 0
+    timed_out_pages = []
+    total_pages = 0
+    try:
+        for page_num, total_pages, page_text, key, entry in page_iter:
+            if entry:
+                pages_cached += 1
+            elif key and page_text is not None:
+                page_cache.put(key, {'text': page_text})
+            if page_text is None:
+                timed_out_pages.append(page_num)
+                page_text = ""
+            pages.append(page_text)
+    finally:
+        page_iter.close()
+    return {
+        'text': mark_pages(pages, total_pages),
+        'clean_text': clean_page_texts(pages),
+        'pages_read': len(pages),
+        'pages_cached': pages_cached,
+        'total_pages': total_pages,
+        'timed_out_pages': timed_out_pages,
+        'truncated': len(pages) < total_pages
+    }
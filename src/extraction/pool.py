@@ -0,0 +1,43 @@
+import concurrent.futures
+import threading
+
+# Process pools by purpose, started with the app: name -> pool
+_pools = {}
+_pools_lock = threading.Lock()
+
+
+def start_pool(name, workers):
+    """Start the shared process pool for name and fork its workers right away.
+
+    Call at app startup, before the app starts threads of its own (only
+    earlier pools' helper threads may run): a fork copies only the calling
+    thread, so a lock another thread holds at that moment (the ship
+    store's, logging's) stays held for good in the workers. Pools are
+    therefore never created from request threads. They use the default
+    (fork) start method on Linux, as spawned workers would re-import main.py
+    and start a second app and database in every process.
+    """
+    pool = concurrent.futures.ProcessPoolExecutor(max_workers=workers)
+    # With fork, the first task starts every worker at once
+    pool.submit(int).result()
+    with _pools_lock:
+        previous = _pools.get(name)
+        _pools[name] = pool
+    if previous is not None:
+        previous.shutdown(wait=False, cancel_futures=True)
+    return pool
+
+
+def get_pool(name):
+    """The pool start_pool started for name, or None if there is none (or it broke)"""
+    with _pools_lock:
+        return _pools.get(name)
+
+
+def discard_pool(name, pool):
+    """Drop a broken pool; callers then do the work in their own thread"""
+    with _pools_lock:
+        if _pools.get(name) is pool:
+            del _pools[name]
+            print(f"Process pool '{name}' broke; extracting in request threads until restart")
+    pool.shutdown(wait=False, cancel_futures=True)
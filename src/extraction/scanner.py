@@ -0,0 +1,301 @@
+import re
+import time
+
+try:
+    from re import _constants as sre_constants, _parser as sre_parse
+except ImportError:  # Python < 3.11
+    import sre_constants
+    import sre_parse
+
+LITERAL = sre_constants.LITERAL
+SUBPATTERN = sre_constants.SUBPATTERN
+BRANCH = sre_constants.BRANCH
+ASSERT = sre_constants.ASSERT
+ANY = sre_constants.ANY
+MAX_REPEAT = sre_constants.MAX_REPEAT
+MIN_REPEAT = sre_constants.MIN_REPEAT
+MAXREPEAT = sre_constants.MAXREPEAT
+ATOMIC_GROUP = sre_constants.ATOMIC_GROUP
+# Items whose match depends only on the characters they consume (no anchors, lookarounds or backreferences)
+CONSUMING_OPS = {LITERAL, sre_constants.NOT_LITERAL, sre_constants.IN, ANY, SUBPATTERN, BRANCH,
+                 MAX_REPEAT, MIN_REPEAT, sre_constants.POSSESSIVE_REPEAT, ATOMIC_GROUP}
+
+# Longest a line-anchored or keyword-windowed pattern keeps trying further parts of one document
+PATTERN_BUDGET_SECONDS = 0.25
+# Widest match (in characters) of a pattern only tried in windows around its keywords
+MAX_WINDOW_WIDTH = 64
+
+# Characters that IGNORECASE matches against ASCII letters but str.lower() does not
+# fold to them; dotted capital I is mapped first so lowering never changes the length
+CASE_FOLDS = str.maketrans({'İ': 'i', 'ı': 'i', 'ſ': 's'})
+
+
+def _flatten(items):
+    """Items of a parsed pattern with plain groups inlined, as groups do not change what must match"""
+    for op, av in items:
+        if op is SUBPATTERN:
+            yield from _flatten(av[-1])
+        else:
+            yield op, av
+
+
+def literal_requirements(items):
+    """Literals any match of the parsed items must contain.
+
+    Returns (required, prefix): required is a list of alternative sets, each
+    a tuple of lowercase strings at least one of which occurs in every
+    match; prefix is a tuple of strings one of which every match starts
+    with, or None.
+    """
+    required = []
+    prefix = None
+    run = ''
+    run_starts = False
+    for position, (op, av) in enumerate(_flatten(items)):
+        if op is LITERAL:
+            if not run:
+                run_starts = position == 0
+            run += chr(av)
+            continue
+        if run:
+            required.append((run.lower(),))
+            if run_starts:
+                prefix = (run.lower(),)
+            run = ''
+        if op is ASSERT and av[0] == 1:
+            # Whatever a lookahead matches is in the text too, starting here
+            lookahead_required, lookahead_prefix = literal_requirements(av[1])
+            required.extend(lookahead_required)
+            if position == 0:
+                prefix = lookahead_prefix
+        elif op is BRANCH:
+            branches = [literal_requirements(branch) for branch in av[1]]
+            longest = []
+            for branch_required, _ in branches:
+                literals = [group[0] for group in branch_required if len(group) == 1]
+                if not literals:
+                    break
+                longest.append(max(literals, key=len))
+            else:
+                required.append(tuple(longest))
+            if position == 0 and all(branch_prefix for _, branch_prefix in branches):
+                prefix = tuple(literal for _, branch_prefix in branches for literal in branch_prefix)
+    if run:
+        required.append((run.lower(),))
+        if run_starts:
+            prefix = (run.lower(),)
+    return required, prefix
+
+
+def _is_line_gap(op, av):
+    """Whether a parsed item is '.*' or '.*?' (any run of characters up to the end of the line)"""
+    return op in (MAX_REPEAT, MIN_REPEAT) and av[0] == 0 and av[1] == MAXREPEAT and list(av[2]) == [(ANY, None)]
+
+
+def opens_with_line_gap(items):
+    """Whether parsed items are a literal followed directly by '.*' or '.*?'.
+
+    The gap may also open an atomic group or every branch of an alternation.
+    Such a pattern can only match from a later occurrence of its literal
+    on a line if it also matches from the first one on that line: the gap
+    from the first can run on to wherever the later match continues.
+    """
+    items = list(_flatten(items))
+    position = 0
+    while position < len(items) and items[position][0] is LITERAL:
+        position += 1
+    if position == 0 or position == len(items):
+        return False
+    return _starts_with_line_gap(items[position:])
+
+
+def _starts_with_line_gap(items):
+    if not items:
+        return False
+    op, av = items[0]
+    if op is ATOMIC_GROUP:
+        return _starts_with_line_gap(list(_flatten(av)))
+    if op is BRANCH:
+        return all(_starts_with_line_gap(list(_flatten(branch))) for branch in av[1])
+    return _is_line_gap(op, av)
+
+
+def only_consumes(items):
+    """Whether every item of a parsed pattern matches by the characters it consumes alone.
+
+    For such a pattern, whether a match fits inside a slice of the text
+    does not depend on anything outside the slice.
+    """
+    for op, av in items:
+        if op not in CONSUMING_OPS:
+            return False
+        if op is SUBPATTERN:
+            children = [av[-1]]
+        elif op is BRANCH:
+            children = av[1]
+        elif op in (MAX_REPEAT, MIN_REPEAT, sre_constants.POSSESSIVE_REPEAT):
+            children = [av[2]]
+        elif op is ATOMIC_GROUP:
+            children = [av]
+        else:
+            children = []
+        if not all(only_consumes(child) for child in children):
+            return False
+    return True
+
+
+def _findall_item(match):
+    """What re.findall gives for a match"""
+    groups = match.groups('')
+    if not groups:
+        return match.group(0)
+    return groups[0] if len(groups) == 1 else groups
+
+
+class ScannedText:
+    """A document prepared for keyword-filtered matching.
+
+    Keyword lookups run on a case-folded copy (same length, so offsets carry
+    over) and are memoized, so each keyword costs at most one ``str.find``
+    per document however many patterns share it.
+    """
+
+    def __init__(self, text):
+        self.text = text
+        self.folded = text.translate(CASE_FOLDS).lower()
+        if len(self.folded) != len(text):
+            # Should not happen after CASE_FOLDS; match without filtering rather than misplace offsets
+            self.folded = None
+        self._positions = {}
+        # Line-anchored and keyword-windowed patterns that ran out of PATTERN_BUDGET_SECONDS on this document
+        self.exhausted = set()
+
+    def find(self, keyword):
+        """Offset of the first occurrence of a lowercase keyword, or -1"""
+        position = self._positions.get(keyword)
+        if position is None:
+            position = self._positions[keyword] = self.folded.find(keyword)
+        return position
+
+
+class ScanPattern:
+    """A compiled IGNORECASE pattern plus the literals that must appear for it to match.
+
+    ``search`` and ``findall`` behave like the compiled pattern's methods on
+    the whole text, but skip patterns whose required keywords are absent and
+    start at the first occurrence of a leading literal.
+
+    A pattern that is a literal followed by a '.*' gap is line-anchored:
+    instead of letting the regex engine retry the gap from every position
+    (quadratic on long lines), only the first occurrence of the literal on
+    each line is tried, which finds the same matches (see
+    opens_with_line_gap). Between lines the pattern's time is checked, and
+    after ``budget`` seconds it gives up as if nothing more matched, noting
+    itself in the document's ``exhausted`` set.
+
+    A pattern with no leading literal but a bounded width (at most
+    MAX_WINDOW_WIDTH characters) and a required keyword is keyword-windowed:
+    every match contains an occurrence of the keyword, so the regex is only
+    run over windows reaching one width either side of the occurrences
+    (occurrences closer than that share a window), under the same budget.
+    Other patterns are kept to a single linear pass by how they are written.
+    """
+
+    def __init__(self, pattern, budget=PATTERN_BUDGET_SECONDS):
+        self.regex = re.compile(pattern, re.IGNORECASE)
+        parsed = sre_parse.parse(pattern, re.IGNORECASE)
+        self.required, self.prefix = literal_requirements(parsed)
+        self.line_anchored = self.prefix is not None and len(self.prefix) == 1 and opens_with_line_gap(parsed)
+        width = parsed.getwidth()[1]
+        self.window = None
+        if self.prefix is None and self.required and width <= MAX_WINDOW_WIDTH and only_consumes(parsed):
+            self.window = width
+        self.budget = budget
+
+    def start(self, doc):
+        """Where a match can first start in doc, or -1 if the pattern cannot match"""
+        if doc.folded is None:
+            return 0
+        for group in self.required:
+            if all(doc.find(keyword) < 0 for keyword in group):
+                return -1
+        if self.prefix is None:
+            return 0
+        starts = [doc.find(keyword) for keyword in self.prefix if doc.find(keyword) >= 0]
+        return min(starts) if starts else -1
+
+    def _line_matches(self, doc, start):
+        """Matches of a line-anchored pattern from start, as re.finditer would give them"""
+        text, literal = doc.text, self.prefix[0]
+        deadline = time.perf_counter() + self.budget
+        position = doc.folded.find(literal, start)
+        while position >= 0:
+            match = self.regex.match(text, position)
+            if match:
+                yield match
+                next_start = max(match.end(), position + 1)
+            else:
+                # No later occurrence on this line can match either
+                line_end = text.find('\n', position)
+                if line_end < 0:
+                    return
+                next_start = line_end + 1
+            if time.perf_counter() > deadline:
+                doc.exhausted.add(self)
+                return
+            position = doc.folded.find(literal, next_start)
+
+    def _next_keyword(self, doc, start):
+        """Offset of the next occurrence of any of the first required keywords from start, or -1"""
+        positions = [doc.folded.find(keyword, start) for keyword in self.required[0]]
+        positions = [position for position in positions if position >= 0]
+        return min(positions) if positions else -1
+
+    def _window_matches(self, doc, start):
+        """Matches of a keyword-windowed pattern from start, as re.finditer would give them"""
+        text, width = doc.text, self.window
+        deadline = time.perf_counter() + self.budget
+        first = self._next_keyword(doc, start)
+        while first >= 0:
+            last = first
+            following = self._next_keyword(doc, last + 1)
+            while 0 <= following <= last + width:
+                last, following = following, self._next_keyword(doc, following + 1)
+            # Any match starting up to the last occurrence ends inside the window, and none starts before it
+            match = self.regex.search(text, max(start, first - width), last + width)
+            if match and match.start() <= last:
+                yield match
+                start = match.end()
+            else:
+                start = last + 1
+            if time.perf_counter() > deadline:
+                doc.exhausted.add(self)
+                return
+            first = self._next_keyword(doc, start)
+
+    def _matches(self, doc, start):
+        if doc.folded is None:
+            return None
+        if self.line_anchored:
+            return self._line_matches(doc, start)
+        if self.window is not None:
+            return self._window_matches(doc, start)
+        return None
+
+    def search(self, doc):
+        start = self.start(doc)
+        if start < 0:
+            return None
+        matches = self._matches(doc, start)
+        if matches is not None:
+            return next(matches, None)
+        return self.regex.search(doc.text, start)
+
+    def findall(self, doc):
+        start = self.start(doc)
+        if start < 0:
+            return []
+        matches = self._matches(doc, start)
+        if matches is not None:
+            return [_findall_item(match) for match in matches]
+        return self.regex.findall(doc.text, start)
@@ -0,0 +1,71 @@
+import threading
+
+from src.extraction.fields import FIELD_EXTRACTORS
+
+
+class FieldStats:
+    """Per-field extraction statistics summed over the documents this process has parsed.
+
+    ``add`` takes the stats dict filled by extract_fields for one document.
+    ``snapshot`` lists the fields slowest first, each with how often every
+    one of its patterns gave the value, so costly fields and patterns that
+    never match real documents stand out. Values read from a known
+    template's labels count as found, under templateFills.
+    """
+
+    def __init__(self, extractors=FIELD_EXTRACTORS):
+        self._patterns = {extractor.name: [p.regex.pattern for p in extractor.patterns] for extractor in extractors}
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            self.documents = 0
+            self._fields = {}
+
+    def add(self, stats):
+        with self._lock:
+            self.documents += 1
+            for name, field_stats in stats.items():
+                totals = self._fields.get(name)
+                if totals is None:
+                    totals = self._fields[name] = {
+                        'calls': 0, 'found': 0, 'seconds': 0.0, 'patterns_tried': 0,
+                        'patterns_skipped': 0, 'patterns_exhausted': 0, 'matches': 0, 'template_fills': 0,
+                        'pattern_hits': {}
+                    }
+                totals['calls'] += 1
+                totals['seconds'] += field_stats['seconds']
+                totals['patterns_tried'] += field_stats['patterns_tried']
+                totals['patterns_skipped'] += field_stats['patterns_skipped']
+                totals['patterns_exhausted'] += field_stats['patterns_exhausted']
+                totals['matches'] += field_stats['matches']
+                index = field_stats['matched_pattern']
+                if field_stats.get('from_template'):
+                    totals['found'] += 1
+                    totals['template_fills'] += 1
+                elif index is not None:
+                    totals['found'] += 1
+                    totals['pattern_hits'][index] = totals['pattern_hits'].get(index, 0) + 1
+
+    def snapshot(self):
+        with self._lock:
+            fields = []
+            for name, totals in self._fields.items():
+                hits = totals['pattern_hits']
+                fields.append({
+                    'field': name,
+                    'calls': totals['calls'],
+                    'found': totals['found'],
+                    'totalMs': round(totals['seconds'] * 1000, 3),
+                    'averageMs': round(totals['seconds'] * 1000 / totals['calls'], 4),
+                    'patternsTried': totals['patterns_tried'],
+                    'patternsSkipped': totals['patterns_skipped'],
+                    'patternsExhausted': totals['patterns_exhausted'],
+                    'matches': totals['matches'],
+                    'templateFills': totals['template_fills'],
+                    'patterns': [{'index': index, 'pattern': pattern, 'hits': hits.get(index, 0)}
+                                 for index, pattern in enumerate(self._patterns.get(name, []))]
+                })
+            fields.sort(key=lambda field: -field['totalMs'])
+            return {'documents': self.documents, 'fields': fields}
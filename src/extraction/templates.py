@@ -0,0 +1,277 @@
+import re
+
+from src.extraction.fields import (FIELD_EXTRACTORS, berth_location, extract_fields, iso_date, known_company,
+                                   operation_kind, port_name, priority_kind, vessel_name, vessel_type)
+
+# A 'Label: value' line, the label optionally bulleted; the label ends at the first colon
+# (any label, known or not: such a line ends the value of the label before it)
+LABEL_LINE_RE = re.compile(r'^[ \t\-*•]*([A-Za-z][^:\n]{0,60}):[ \t]*([^\n]*)', re.MULTILINE)
+INTEGER_RE = re.compile(r'\d+')
+DECIMAL_RE = re.compile(r'\d+(?:\.\d+)?')
+DATE_RE = re.compile(r'\d{4}-\d{2}-\d{2}|\d{1,2}/\d{1,2}/\d{4}')
+TIME_RE = re.compile(r'\d{1,2}:\d{2}(?:\s*[AP]M)?', re.IGNORECASE)
+ID_RE = re.compile(r'[A-Za-z0-9]+')
+# The end of one PDF page and the start of the next, with the blank lines between them
+PAGE_BREAK_RE = re.compile(r'\n*=== END PAGE \d+ ===\s*(?:=== PAGE \d+ OF \d+ ===\n?)?')
+
+# Share of a template's signature labels a document must carry to be read as that template
+TEMPLATE_MIN_SHARE = 0.6
+
+
+def normalize_label(label):
+    return ' '.join(label.lower().split())
+
+
+def text_value(value):
+    return value.strip() or None
+
+
+def integer_value(value):
+    match = INTEGER_RE.search(value)
+    return int(match.group(0)) if match else None
+
+
+def integer_text(value):
+    match = INTEGER_RE.search(value)
+    return match.group(0) if match else None
+
+
+def decimal_text(value):
+    match = DECIMAL_RE.search(value)
+    return match.group(0) if match else None
+
+
+def date_value(value):
+    match = DATE_RE.search(value)
+    return iso_date(match.group(0)) if match else None
+
+
+def time_text(value):
+    match = TIME_RE.search(value)
+    return match.group(0) if match else None
+
+
+def company_value(value):
+    return known_company(value) or text_value(value)
+
+
+def id_value(value):
+    match = ID_RE.search(value)
+    return match.group(0) if match else None
+
+
+# Labels both wizard layouts use -> (field, parser giving the value in the form its extractor gives it)
+COMMON_LABELS = {
+    'vessel name': ('vesselName', vessel_name),
+    'vessel type': ('vesselType', vessel_type),
+    'port': ('port', port_name),
+    'operation date': ('operationDate', date_value),
+    'berth location': ('berthLocation', berth_location),
+    'stevedoring company': ('company', company_value),
+    'operation type': ('operationType', operation_kind),
+    'operation manager': ('operationManager', text_value),
+    'total automobiles to discharge': ('totalAutomobilesDischarge', integer_value),
+    'heavy equipment to discharge': ('heavyEquipmentDischarge', integer_value),
+    'brv loading target': ('brvTarget', integer_value),
+    'zee loading target': ('zeeTarget', integer_value),
+    'sou loading target': ('souTarget', integer_value),
+    'electric vehicles': ('electricVehicles', integer_text),
+    'static cargo units': ('staticCargo', integer_text),
+    'expected rate': ('expectedRate', decimal_text),
+    'total drivers': ('totalDrivers', integer_text),
+    'shift start time': ('shiftStart', time_text),
+    'shift end time': ('shiftEnd', time_text),
+    'break duration': ('breakDuration', integer_text),
+    'number of vans': ('numVans', integer_text),
+    'number of station wagons': ('numStationWagons', integer_text),
+}
+
+# Numbered labels -> fields named with the number (fields that no extractor has are dropped)
+NUMBERED_LABELS = [
+    (re.compile(r'van (\d+) id'), ('vanId{}', 'van{}Id'), id_value),
+    (re.compile(r'station wagon (\d+) id'), ('wagonId{}',), id_value),
+]
+
+
+class DocumentTemplate:
+    """A known document layout: 'Label: value' lines whose labels say which field they fill.
+
+    ``labels`` maps lowercase labels to (field, parser); a label under a
+    section line (a label with no value, like 'Auto Operations Team:') is
+    looked up as 'section / label' first. A document is read as the
+    template when it carries at least TEMPLATE_MIN_SHARE of the
+    ``signature`` labels.
+    """
+
+    def __init__(self, name, labels, signature):
+        self.name = name
+        self.labels = dict(COMMON_LABELS, **labels)
+        self.signature = signature
+
+    def share(self, found_labels):
+        """Share of the signature labels among found_labels"""
+        return sum(1 for label in self.signature if label in found_labels) / len(self.signature)
+
+    def values(self, label_lines):
+        """Field -> value for the labelled lines, the first line giving a field winning"""
+        values = {}
+        for section_label, label, value in label_lines:
+            entry = self.labels.get(section_label) or self.labels.get(label)
+            if entry:
+                fields, parse = (entry[0],), entry[1]
+            else:
+                numbered = numbered_fields(label)
+                if numbered is None:
+                    continue
+                parse, fields = numbered
+            parsed = parse(value)
+            if parsed is None:
+                continue
+            for name in fields:
+                values.setdefault(name, parsed)
+        return values
+
+
+def numbered_fields(label):
+    """(parser, fields) for a numbered label such as 'van 2 id', or None"""
+    for label_re, names, parse in NUMBERED_LABELS:
+        match = label_re.fullmatch(label)
+        if match:
+            return parse, [name.format(match.group(1)) for name in names]
+    return None
+
+
+# The layout of complete_comprehensive_test_document.txt: team members under team sections,
+# brands listed with their abbreviations
+COMPREHENSIVE = DocumentTemplate('comprehensive', {
+    'auto operations team / lead supervisor': ('autoOperationsLead', text_value),
+    'auto operations team / assistant supervisor': ('autoOperationsAssistant', text_value),
+    'high & heavy team / lead supervisor': ('heavyHeavyLead', text_value),
+    'high & heavy team / assistant supervisor': ('heavyHeavyAssistant', text_value),
+    'mercedes-benz (mb)': ('mbCount', integer_value),
+    'bmw': ('bmwCount', integer_value),
+    'land rover (lr)': ('lrCount', integer_value),
+    'rolls-royce (rr)': ('rrCount', integer_value),
+    'audi': ('audi', integer_text),
+    'porsche': ('porsche', integer_text),
+    'mini': ('mini', integer_text),
+    'jaguar': ('jaguar', integer_text),
+    'cargo brand/type': ('cargoType', text_value),
+    'zone a - description': ('zoneADescription', text_value),
+    'zone b - description': ('zoneBDescription', text_value),
+    'zone c - description': ('zoneCDescription', text_value),
+    'zone a - vehicles': ('zoneA', integer_text),
+    'zone b - vehicles': ('zoneB', integer_text),
+    'zone c - vehicles': ('zoneC', integer_text),
+    'zone a': ('zoneA', integer_text),
+    'zone b': ('zoneB', integer_text),
+    'zone c': ('zoneC', integer_text),
+    'zee automobiles': ('zeeAutomobiles', integer_text),
+    'zee heavy equipment': ('zeeHeavyEquipment', integer_text),
+    'zee electric vehicles': ('zeeElectricVehicles', integer_text),
+    'zee static cargo': ('zeeStaticCargo', integer_text),
+    'zee cargo type': ('zeeCargoType', text_value),
+    'zee cargo value': ('zeeCargoValue', integer_text),
+    'zee priority': ('zeePriority', priority_kind),
+}, signature=(
+    'vessel name', 'vessel type', 'port', 'operation date', 'berth location', 'stevedoring company',
+    'operation type', 'operation manager', 'auto operations team / lead supervisor',
+    'high & heavy team / lead supervisor', 'total automobiles to discharge', 'expected rate', 'shift start time'
+))
+
+TEMPLATES = [COMPREHENSIVE]
+
+
+def known_label_re(templates):
+    """Regex finding a label of the templates (section labels included) and its colon anywhere in a text.
+
+    The words of a label may be split by any whitespace, as a PDF wraps a
+    label over two lines as readily as a value.
+    """
+    phrases = {part for template in templates for label in template.labels for part in label.split(' / ')}
+    alternatives = [r'\s+'.join(re.escape(word) for word in phrase.split())
+                    for phrase in sorted(phrases, key=len, reverse=True)]
+    alternatives += [label_re.pattern.replace(' ', r'\s+') for label_re, _, _ in NUMBERED_LABELS]
+    return re.compile(r'(?<!\S)(' + '|'.join(alternatives) + r')[ \t]*:', re.IGNORECASE)
+
+
+KNOWN_LABEL_RE = known_label_re(TEMPLATES)
+
+
+def continues_value(line):
+    """Whether a line carries on the value of the label before it: not blank, a heading or a label line"""
+    stripped = line.strip(' \t-=')
+    # Headings are several capitalised words; 'V210' or '07:00 AM' is more likely a wrapped value
+    heading = stripped.isupper() and sum(word.isalpha() for word in stripped.split()) > 1
+    return bool(stripped) and not heading and not LABEL_LINE_RE.match(line)
+
+
+def label_lines(text):
+    """(section / label, label, value) for each known label in text, in one pass over it.
+
+    A value runs up to the next known label, so the several 'Label: value'
+    pairs a PDF puts on one line are told apart, and on over the following
+    lines that carry it on. A label with no value (like 'Auto Operations
+    Team:') opens a section.
+    """
+    lines = []
+    section = None
+    matches = list(KNOWN_LABEL_RE.finditer(text))
+    for match, following in zip(matches, matches[1:] + [None]):
+        label = normalize_label(match.group(1))
+        first, *rest = text[match.end():following.start() if following else len(text)].split('\n')
+        value_lines = [first]
+        for line in rest:
+            if not continues_value(line):
+                break
+            value_lines.append(line)
+        value = ' '.join(' '.join(value_lines).split()).strip(' -')
+        if not value:
+            section = label
+            continue
+        lines.append((f'{section} / {label}' if section else label, label, value))
+    return lines
+
+
+def match_template(lines):
+    """The registered template the labelled lines fit best, or None if none fits well enough"""
+    found_labels = set()
+    for section_label, label, _ in lines:
+        found_labels.add(section_label)
+        found_labels.add(label)
+    best, best_share = None, TEMPLATE_MIN_SHARE
+    for template in TEMPLATES:
+        share = template.share(found_labels)
+        if share >= best_share:
+            best, best_share = template, share
+    return best
+
+
+def template_values(text):
+    """(template, {extractor: value}) for a document in a known layout, or (None, {})"""
+    # Pages run on into each other, as a label or value can be broken over a page end
+    lines = label_lines(PAGE_BREAK_RE.sub('\n', text))
+    template = match_template(lines)
+    if template is None:
+        return None, {}
+    values = template.values(lines)
+    known = {}
+    for extractor in FIELD_EXTRACTORS:
+        found = [values.get(key) for key in extractor.keys]
+        # Fields the document has no labelled line for are left to the extractor's patterns;
+        # numbered ids come from the same 'Van N ID: X' lines either way, so any of them will do
+        if any(value is not None for value in found):
+            known[extractor] = found if extractor.mode == 'all' else next(value for value in found if value is not None)
+    return template, known
+
+
+def extract_document_fields(text, clean_text=None, stats=None):
+    """extract_fields for a whole document, reading the fields of a known layout from its labels.
+
+    When the document fits a registered template, the fields it has
+    labelled lines for are read from them in a single pass over the text;
+    only the extractors for the other fields run their patterns. Other
+    documents go through every extractor.
+    """
+    _, known = template_values(text)
+    return extract_fields(text, clean_text=clean_text, stats=stats, known=known)
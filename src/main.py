@@ -8,10 +8,13 @@ if parent_dir not in sys.path:
 
 from flask import Flask, send_from_directory, jsonify, redirect, send_file
 from flask_cors import CORS
+from sqlalchemy.exc import OperationalError
+from src.extraction.csv_rows import load_column_aliases
+from src.metrics import init_metrics
 from src.models.user import db
 from src.routes.user import user_bp
-from src.routes.file_processor import file_processor_bp
-from src.routes.ships import ships_bp
+from src.routes.file_processor import file_processor_bp, init_extraction
+from src.routes.ships import ships_bp, init_ships_store
 
 app = Flask(__name__, static_folder=os.path.join(os.path.dirname(os.path.dirname(__file__)), 'static'))
 app.config['SECRET_KEY'] = os.environ.get('SECRET_KEY', 'fallback-dev-key-change-in-production')
@@ -20,6 +23,11 @@ app.config['MAX_CONTENT_LENGTH'] = 16 * 1024 * 1024  # 16MB max file size
 # Enable CORS for all routes
 CORS(app)
 
+# Request and operation timings on /metrics: 'full' (latency histograms), 'light' (latency sums and
+# counts only, cheap enough to leave on in production) or 'off'
+app.config['METRICS_MODE'] = os.environ.get('METRICS_MODE', 'full')
+init_metrics(app)
+
 app.register_blueprint(user_bp, url_prefix='/api')
 app.register_blueprint(file_processor_bp)
 app.register_blueprint(ships_bp)
@@ -31,10 +39,46 @@ os.makedirs(db_dir, exist_ok=True)
 # uncomment if you need to use database
 app.config['SQLALCHEMY_DATABASE_URI'] = f"sqlite:///{os.path.join(db_dir, 'app.db')}"
 app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
+# Wait for a locked database instead of failing when several workers write at once
+app.config['SQLALCHEMY_ENGINE_OPTIONS'] = {'connect_args': {'timeout': 30}}
+# 'json' (journaled ships.json) or 'sqlite' (Ship table in app.db)
+app.config['SHIPS_BACKEND'] = os.environ.get('SHIPS_BACKEND', 'json')
+# PDF pages are extracted by this many worker processes (0 reads them in the request thread);
+# a page over the page budget is left empty and pages past the document budget are skipped
+app.config['PDF_WORKERS'] = int(os.environ.get('PDF_WORKERS', 0))
+app.config['PDF_PAGE_TIMEOUT'] = float(os.environ.get('PDF_PAGE_TIMEOUT', 10))
+app.config['PDF_DOCUMENT_TIMEOUT'] = float(os.environ.get('PDF_DOCUMENT_TIMEOUT', 60))
+# Extraction results by document content: an in-memory LRU in front of a size-bounded directory
+app.config['EXTRACT_CACHE_DIR'] = os.environ.get('EXTRACT_CACHE_DIR', os.path.join(db_dir, 'extract_cache'))
+app.config['EXTRACT_CACHE_ENTRIES'] = int(os.environ.get('EXTRACT_CACHE_ENTRIES', 256))
+app.config['EXTRACT_CACHE_DISK_BYTES'] = int(os.environ.get('EXTRACT_CACHE_DISK_MB', 64)) * 1024 * 1024
+# Text of PDF pages by page content, so a revised manifest only has its changed pages extracted
+app.config['PAGE_CACHE_DIR'] = os.environ.get('PAGE_CACHE_DIR', os.path.join(db_dir, 'page_cache'))
+app.config['PAGE_CACHE_ENTRIES'] = int(os.environ.get('PAGE_CACHE_ENTRIES', 4096))
+app.config['PAGE_CACHE_DISK_BYTES'] = int(os.environ.get('PAGE_CACHE_DISK_MB', 64)) * 1024 * 1024
+# Background extraction jobs: worker threads, jobs queued or running before 429, and the
+# directory job states are written to so any worker process can answer status polls
+app.config['EXTRACT_JOB_WORKERS'] = int(os.environ.get('EXTRACT_JOB_WORKERS', 2))
+app.config['EXTRACT_JOB_QUEUE'] = int(os.environ.get('EXTRACT_JOB_QUEUE', 16))
+app.config['EXTRACT_JOBS_DIR'] = os.environ.get('EXTRACT_JOBS_DIR', os.path.join(db_dir, 'extract_jobs'))
+# Worker processes /api/extract/batch spreads a batch's documents over; 1 (the default)
+# extracts them in turn, as each worker is forked for every app process at startup
+app.config['EXTRACT_BATCH_WORKERS'] = int(os.environ.get('EXTRACT_BATCH_WORKERS', 1))
+# Extra CSV header names for ship fields, as {"vesselName": ["Ship", ...]} in a JSON file
+app.config['CSV_COLUMN_ALIASES'] = load_column_aliases(os.environ.get('CSV_COLUMN_ALIASES_FILE'))
+init_extraction(app)
 db.init_app(app)
 
 with app.app_context():
-    db.create_all()
+    # WAL lets readers proceed while a writer holds the lock; the mode persists in the file
+    with db.engine.connect() as conn:
+        conn.exec_driver_sql('PRAGMA journal_mode=WAL')
+    try:
+        db.create_all()
+    except OperationalError:
+        # Another worker created the tables between the existence check and CREATE TABLE
+        db.create_all()
+    init_ships_store(app)
 
 @app.route('/')
 def index():
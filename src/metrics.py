@@ -0,0 +1,174 @@
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+
+from flask import Response, g, request
+
+# Latency histogram bucket upper bounds in seconds, from a cached JSON answer to a long PDF
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# full: latency histograms; light: latency sums and counts only, a few series per endpoint
+# and no bucket search, for leaving on in production; off: no timing and no /metrics
+METRICS_MODES = ('full', 'light', 'off')
+# Endpoint label for requests that matched no route, so unknown paths add no series
+UNMATCHED_ENDPOINT = 'unmatched'
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+class Metrics:
+    """Request and operation timings of this process, rendered in the Prometheus text format.
+
+    ``request_started``/``request_finished`` count requests by endpoint
+    (the matched URL rule) and status, time them, and track how many are
+    in flight. ``timer`` times internal operations such as load_ships.
+    In ``full`` mode latencies go into histograms over ``buckets``; in
+    ``light`` mode only their sum and count are kept (Prometheus
+    summaries without quantiles).
+    """
+
+    def __init__(self, mode='full', buckets=LATENCY_BUCKETS):
+        self.mode = mode
+        self.buckets = buckets
+        self._lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        with self._lock:
+            # (method, endpoint, status) -> count
+            self._requests = {}
+            # (method, endpoint) or operation -> [bucket counts or None, sum, count]
+            self._latency = {}
+            self._operations = {}
+            # endpoint -> requests in progress
+            self._in_flight = {}
+
+    def _observe(self, series, key, seconds):
+        """Add one duration to a latency series (lock held)"""
+        entry = series.get(key)
+        if entry is None:
+            entry = series[key] = [[0] * (len(self.buckets) + 1) if self.mode == 'full' else None, 0.0, 0]
+        if entry[0] is not None:
+            entry[0][bisect.bisect_left(self.buckets, seconds)] += 1
+        entry[1] += seconds
+        entry[2] += 1
+
+    def request_started(self, endpoint):
+        with self._lock:
+            self._in_flight[endpoint] = self._in_flight.get(endpoint, 0) + 1
+
+    def request_finished(self, method, endpoint, status, seconds):
+        with self._lock:
+            key = (method, endpoint, str(status))
+            self._requests[key] = self._requests.get(key, 0) + 1
+            self._observe(self._latency, (method, endpoint), seconds)
+
+    def request_ended(self, endpoint):
+        with self._lock:
+            self._in_flight[endpoint] = self._in_flight.get(endpoint, 0) - 1
+
+    def observe(self, operation, seconds):
+        with self._lock:
+            self._observe(self._operations, operation, seconds)
+
+    @contextmanager
+    def timer(self, operation):
+        """Time the block as one run of operation (also when it raises)"""
+        if self.mode == 'off':
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(operation, time.perf_counter() - start)
+
+    def _latency_lines(self, name, series, label_names):
+        kind = 'histogram' if self.mode == 'full' else 'summary'
+        lines = [f'# TYPE {name} {kind}']
+        for key, (counts, total, count) in sorted(series.items()):
+            labels = _labels(zip(label_names, key if isinstance(key, tuple) else (key,)))
+            if counts is not None:
+                cumulative = 0
+                for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                    cumulative += bucket_count
+                    le = '+Inf' if bound == float('inf') else repr(bound)
+                    lines.append(f'{name}_bucket{{{labels},le="{le}"}} {cumulative}')
+            lines.append(f'{name}_sum{{{labels}}} {total!r}')
+            lines.append(f'{name}_count{{{labels}}} {count}')
+        return lines
+
+    def render(self):
+        """All metrics in the Prometheus text exposition format"""
+        with self._lock:
+            lines = ['# HELP http_requests_total Requests answered, by method, endpoint and status.',
+                     '# TYPE http_requests_total counter']
+            for key, count in sorted(self._requests.items()):
+                lines.append(f'http_requests_total{{{_labels(zip(("method", "endpoint", "status"), key))}}} {count}')
+            lines.append('# HELP http_request_duration_seconds Time to produce a response, by method and endpoint.')
+            lines += self._latency_lines('http_request_duration_seconds', self._latency, ('method', 'endpoint'))
+            lines += ['# HELP http_requests_in_flight Requests in progress, by endpoint.',
+                      '# TYPE http_requests_in_flight gauge']
+            for endpoint, count in sorted(self._in_flight.items()):
+                lines.append(f'http_requests_in_flight{{{_labels([("endpoint", endpoint)])}}} {count}')
+            lines.append('# HELP operation_duration_seconds Time spent in internal operations, by operation.')
+            lines += self._latency_lines('operation_duration_seconds', self._operations, ('operation',))
+        return '\n'.join(lines) + '\n'
+
+
+def _labels(pairs):
+    """'name="value",...' with the values escaped as the text format requires"""
+    return ','.join(f'{name}="{_escape(value)}"' for name, value in pairs)
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+# Timings of this process; init_metrics sets the mode from the app config
+METRICS = Metrics()
+
+
+def timer(operation):
+    """METRICS.timer, for timing an internal operation: ``with timer('load_ships'): ...``"""
+    return METRICS.timer(operation)
+
+
+def _start_request():
+    endpoint = request.url_rule.rule if request.url_rule else UNMATCHED_ENDPOINT
+    g.metrics_request = (endpoint, time.perf_counter())
+    METRICS.request_started(endpoint)
+
+
+def _finish_request(response):
+    started = g.get('metrics_request')
+    if started:
+        endpoint, start = started
+        # A streamed response is timed up to when its first byte is ready
+        METRICS.request_finished(request.method, endpoint, response.status_code, time.perf_counter() - start)
+    return response
+
+
+def _end_request(error=None):
+    started = g.pop('metrics_request', None)
+    if started:
+        METRICS.request_ended(started[0])
+
+
+def metrics_view():
+    """Prometheus scrape endpoint"""
+    return Response(METRICS.render(), content_type=PROMETHEUS_CONTENT_TYPE)
+
+
+def init_metrics(app):
+    """Time app's requests and serve /metrics, in the mode app.config['METRICS_MODE'] names"""
+    mode = app.config.get('METRICS_MODE', 'full')
+    if mode not in METRICS_MODES:
+        raise ValueError(f"METRICS_MODE must be one of {', '.join(METRICS_MODES)}, not {mode!r}")
+    METRICS.mode = mode
+    METRICS.reset()
+    if mode == 'off':
+        return
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+    app.teardown_request(_end_request)
+    app.add_url_rule('/metrics', 'metrics', metrics_view)
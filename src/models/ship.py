@@ -0,0 +1,89 @@
+import re
+
+from src.models.user import db
+
+# API field names in the order the ship record is serialized
+SHIP_FIELDS = [
+    'id', 'vesselName', 'vesselType', 'shippingLine', 'port', 'operationDate', 'company',
+    'operationType', 'berth', 'operationManager', 'autoOpsLead', 'autoOpsAssistant',
+    'heavyOpsLead', 'heavyOpsAssistant', 'totalVehicles', 'totalAutomobilesDischarge',
+    'heavyEquipmentDischarge', 'totalElectricVehicles', 'totalStaticCargo', 'brvTarget',
+    'zeeTarget', 'souTarget', 'expectedRate', 'totalDrivers', 'shiftStart', 'shiftEnd',
+    'breakDuration', 'targetCompletion', 'ticoVans', 'ticoStationWagons', 'status', 'progress',
+    'createdAt', 'startTime', 'estimatedCompletion', 'updatedAt'
+]
+
+
+def column_name(field):
+    """Map a camelCase API field to its snake_case column attribute"""
+    return re.sub(r'([A-Z])', r'_\1', field).lower()
+
+
+class Ship(db.Model):
+    id = db.Column(db.Integer, primary_key=True)
+    vessel_name = db.Column(db.String(200), nullable=False, index=True)
+    vessel_type = db.Column(db.String(100))
+    shipping_line = db.Column(db.String(100))
+    port = db.Column(db.String(100), index=True)
+    # ISO YYYY-MM-DD strings sort chronologically, so range filters stay index scans
+    operation_date = db.Column(db.String(32), index=True)
+    company = db.Column(db.String(100))
+    operation_type = db.Column(db.String(100))
+    berth = db.Column(db.String(50), index=True)
+    operation_manager = db.Column(db.String(100))
+    auto_ops_lead = db.Column(db.String(100))
+    auto_ops_assistant = db.Column(db.String(100))
+    heavy_ops_lead = db.Column(db.String(100))
+    heavy_ops_assistant = db.Column(db.String(100))
+    total_vehicles = db.Column(db.Integer)
+    total_automobiles_discharge = db.Column(db.Integer)
+    heavy_equipment_discharge = db.Column(db.Integer)
+    total_electric_vehicles = db.Column(db.Integer)
+    total_static_cargo = db.Column(db.Integer)
+    brv_target = db.Column(db.Integer)
+    zee_target = db.Column(db.Integer)
+    sou_target = db.Column(db.Integer)
+    expected_rate = db.Column(db.Float)
+    total_drivers = db.Column(db.Integer)
+    shift_start = db.Column(db.String(20))
+    shift_end = db.Column(db.String(20))
+    break_duration = db.Column(db.Integer)
+    target_completion = db.Column(db.String(50))
+    tico_vans = db.Column(db.Integer)
+    tico_station_wagons = db.Column(db.Integer)
+    status = db.Column(db.String(20), nullable=False, default='active', index=True)
+    progress = db.Column(db.Float, default=0)
+    created_at = db.Column(db.String(50))
+    start_time = db.Column(db.String(50))
+    estimated_completion = db.Column(db.String(50))
+    updated_at = db.Column(db.String(50))
+
+    def to_dict(self):
+        ship = {field: getattr(self, column_name(field)) for field in SHIP_FIELDS}
+        # Progress is stored as a float but whole percentages read back as ints, as in the JSON store
+        if isinstance(ship['progress'], float) and ship['progress'].is_integer():
+            ship['progress'] = int(ship['progress'])
+        return ship
+
+    def update_from_dict(self, data):
+        for field, value in data.items():
+            if field in SHIP_FIELDS:
+                setattr(self, column_name(field), value)
+
+    def __repr__(self):
+        return f'<Ship {self.vessel_name}>'
+
+
+class ShipChange(db.Model):
+    """Latest change to each ship, numbered from one table-wide sequence.
+
+    Every write replaces the ship's row, so ``seq`` is the ships data version
+    and rows with ``seq`` above a client's version are exactly its delta.
+    """
+    # AUTOINCREMENT so sequence numbers are never reused after deletes
+    __table_args__ = {'sqlite_autoincrement': True}
+
+    seq = db.Column(db.Integer, primary_key=True)
+    ship_id = db.Column(db.Integer, nullable=False, index=True)
+    # create, update, progress, status or delete
+    event = db.Column(db.String(20), nullable=False, default='update')
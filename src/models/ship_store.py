@@ -0,0 +1,941 @@
+import bisect
+import json
+import os
+import stat
+import tempfile
+import threading
+import time
+from contextlib import contextmanager
+from datetime import datetime, timedelta
+
+try:
+    import fcntl
+except ImportError:  # Windows: no cross-process file locking, run a single worker
+    fcntl = None
+
+from sqlalchemy import distinct, func
+
+from src.metrics import timer
+from src.models.ship import Ship, ShipChange, column_name
+from src.models.user import db
+
+# Number of journal records written before the journal is folded into a new snapshot
+COMPACT_THRESHOLD = 500
+# How often wait_for_change looks for writes made by other processes
+CHANGE_POLL_SECONDS = 0.5
+# Read once at import, while only one thread runs, as os.umask can only be read by setting it
+UMASK = os.umask(0)
+os.umask(UMASK)
+
+
+def replacement_mode(path):
+    """Permissions for a file replacing path: the current file's, or what open() would give a new one"""
+    try:
+        return stat.S_IMODE(os.stat(path).st_mode)
+    except FileNotFoundError:
+        return 0o666 & ~UMASK
+
+
+def atomic_write_text(path, text):
+    """Write text to path via a temp file and rename so readers never see a partial file"""
+    directory = os.path.dirname(path)
+    os.makedirs(directory, exist_ok=True)
+    fd, tmp_path = tempfile.mkstemp(dir=directory, prefix='.tmp-')
+    try:
+        with os.fdopen(fd, 'w') as f:
+            f.write(text)
+            f.flush()
+            os.fsync(f.fileno())
+        # mkstemp creates the file 0600; keep the permissions the file had
+        os.chmod(tmp_path, replacement_mode(path))
+        os.replace(tmp_path, path)
+    except Exception:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+        raise
+
+
+def atomic_write_json(path, payload, indent=None):
+    """Atomically replace path with payload serialized as JSON"""
+    atomic_write_text(path, json.dumps(payload, indent=indent))
+
+
+def _file_stamp(path):
+    """Identity and size of a file, or None if it does not exist"""
+    try:
+        st = os.stat(path)
+    except FileNotFoundError:
+        return None
+    return (st.st_ino, st.st_mtime_ns, st.st_size)
+
+
+class ShipStats:
+    """Running totals over the ships that are not complete.
+
+    Kept up to date by ``ShipIndex`` on every add and unindex, so the stats
+    and berth endpoints never rescan the ship history.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.active_ships = 0
+        self.total_vehicles = 0
+        self.progress_sum = 0
+        self.berths = {}  # berth -> ids of active ships assigned to it
+
+    def add(self, ship):
+        if ship['status'] == 'complete':
+            return
+        self.active_ships += 1
+        self.total_vehicles += _to_int(ship.get('totalVehicles', 0))
+        self.progress_sum += _to_float(ship.get('progress', 0))
+        if ship.get('berth'):
+            self.berths.setdefault(ship['berth'], set()).add(ship['id'])
+
+    def discard(self, ship):
+        if ship['status'] == 'complete':
+            return
+        self.active_ships -= 1
+        self.total_vehicles -= _to_int(ship.get('totalVehicles', 0))
+        self.progress_sum -= _to_float(ship.get('progress', 0))
+        if ship.get('berth'):
+            ids = self.berths.get(ship['berth'])
+            if ids is not None:
+                ids.discard(ship['id'])
+                if not ids:
+                    del self.berths[ship['berth']]
+
+
+def _date_bounds(start_date, end_date):
+    """ISO string bounds (low inclusive, high exclusive) for operation dates from start_date to end_date.
+
+    The upper bound is the day after end_date so dates with a time part still
+    fall inside; either bound is None when its date is not given.
+    """
+    low = start_date.isoformat() if start_date else None
+    high = (end_date + timedelta(days=1)).isoformat() if end_date else None
+    return low, high
+
+
+def _to_int(value):
+    try:
+        return int(value)
+    except (TypeError, ValueError):
+        return 0
+
+
+def _to_float(value):
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return 0.0
+
+
+def rollup_entry(ship):
+    """What one ship contributes to its day in the analytics rollup, or None if it has no usable date"""
+    try:
+        ship_date = datetime.fromisoformat(ship.get('operationDate', ship.get('createdAt', '')))
+    except (TypeError, ValueError):
+        return None
+
+    shift_hours = 12  # Default shift length
+    if 'shiftStart' in ship and 'shiftEnd' in ship:
+        try:
+            start_time = datetime.strptime(ship['shiftStart'], '%H:%M')
+            end_time = datetime.strptime(ship['shiftEnd'], '%H:%M')
+            shift_hours = (end_time - start_time).seconds / 3600
+        except (TypeError, ValueError):
+            pass
+
+    leads = []
+    if ship.get('autoOpsLead'):
+        leads.append((ship['autoOpsLead'], 'Auto Operations Lead'))
+    if ship.get('heavyOpsLead'):
+        leads.append((ship['heavyOpsLead'], 'Heavy Equipment Lead'))
+
+    return {
+        'date': ship_date.date().isoformat(),
+        'hours': shift_hours,
+        'vehicles': _to_int(ship.get('totalVehicles', 0)),
+        'automobiles': _to_int(ship.get('totalAutomobilesDischarge', 0)),
+        'heavyEquipment': _to_int(ship.get('heavyEquipmentDischarge', 0)),
+        'leads': leads
+    }
+
+
+def new_rollup_bucket():
+    return {'ships': 0, 'hours': 0, 'vehicles': 0, 'automobiles': 0, 'heavyEquipment': 0, 'leads': {}}
+
+
+def add_to_rollup(bucket, entry, sign=1):
+    """Add (or with sign=-1 subtract) one ship's rollup entry to a day bucket"""
+    bucket['ships'] += sign
+    for key in ('hours', 'vehicles', 'automobiles', 'heavyEquipment'):
+        bucket[key] += sign * entry[key]
+    for lead in entry['leads']:
+        totals = bucket['leads'].setdefault(lead, {'hours': 0, 'ships': 0})
+        totals['hours'] += sign * entry['hours']
+        totals['ships'] += sign
+        if not totals['ships']:
+            del bucket['leads'][lead]
+
+
+class DailyRollup:
+    """Per-day analytics totals (ships, shift hours, vehicles, per-lead hours) keyed by ISO date.
+
+    Dates and shift times are parsed once when a ship is indexed, so analytics
+    for any period is a sum over at most one bucket per day.
+    """
+
+    def __init__(self):
+        self.clear()
+
+    def clear(self):
+        self.days = {}
+
+    def add(self, ship):
+        entry = rollup_entry(ship)
+        if entry is not None:
+            add_to_rollup(self.days.setdefault(entry['date'], new_rollup_bucket()), entry)
+
+    def discard(self, ship):
+        entry = rollup_entry(ship)
+        if entry is None or entry['date'] not in self.days:
+            return
+        bucket = self.days[entry['date']]
+        add_to_rollup(bucket, entry, sign=-1)
+        if not bucket['ships']:
+            del self.days[entry['date']]
+
+
+class ShipIndex:
+    """Primary-key map plus secondary indexes over the ship records.
+
+    ``by_id`` keeps insertion order, which is id order because ids are handed
+    out by the monotonically increasing ``next_id`` counter. Aggregate views
+    (``ShipStats``, ``DailyRollup``) are updated alongside the secondary indexes.
+    """
+
+    INDEXED_FIELDS = ('status', 'berth', 'port', 'operationDate')
+
+    def __init__(self):
+        self.stats = ShipStats()
+        self.rollup = DailyRollup()
+        self.views = [self.stats, self.rollup]
+        self.clear()
+
+    def clear(self):
+        self.by_id = {}
+        self.secondary = {field: {} for field in self.INDEXED_FIELDS}
+        self.next_id = 1
+        for view in self.views:
+            view.clear()
+
+    def add(self, ship):
+        """Index a ship; re-adding an existing id keeps its position in by_id"""
+        self.by_id[ship['id']] = ship
+        self.next_id = max(self.next_id, ship['id'] + 1)
+        for field, values in self.secondary.items():
+            values.setdefault(ship.get(field), set()).add(ship['id'])
+        for view in self.views:
+            view.add(ship)
+
+    def unindex(self, ship):
+        """Drop a ship from the secondary indexes and views before its fields change"""
+        for field, values in self.secondary.items():
+            ids = values.get(ship.get(field))
+            if ids is not None:
+                ids.discard(ship['id'])
+                if not ids:
+                    del values[ship.get(field)]
+        for view in self.views:
+            view.discard(ship)
+
+    def remove(self, ship):
+        self.unindex(ship)
+        self.by_id.pop(ship['id'], None)
+
+    def lookup(self, field, value):
+        """Ids of the ships whose indexed field equals value"""
+        return self.secondary[field].get(value, set())
+
+
+class ShipStore:
+    """Journaled ship storage: a JSON snapshot plus an append-only log of mutations.
+
+    The snapshot keeps the original ``ships.json`` list format. Every mutation
+    appends one JSON line to the journal instead of rewriting the snapshot, and
+    once the journal grows past ``compact_threshold`` records it is folded into
+    a fresh snapshot that replaces the old one atomically.
+
+    Records live in a ``ShipIndex`` so lookups by id, status, berth and
+    operation date do not scan the full history. Mutations must go through
+    ``create``/``update``/``delete`` to keep the indexes consistent.
+
+    Several processes (e.g. gunicorn workers) can share one store. Writers hold
+    an exclusive ``flock`` on the lock file and first catch up on records other
+    processes appended, so ids and updates never overwrite each other. Every
+    journal record carries a sequence number (``version``); readers compare
+    the journal and snapshot file stamps with what they last applied and tail
+    or reload only when another process has written since.
+
+    The version also drives delta sync: ``changes_since`` reports the ships
+    written or deleted after a given version, back to ``base_version`` (the
+    version of the last compaction, whose details the snapshot no longer has).
+    """
+
+    def __init__(self, snapshot_path, journal_path=None, lock_path=None, compact_threshold=COMPACT_THRESHOLD):
+        base_path = os.path.splitext(snapshot_path)[0]
+        self.snapshot_path = snapshot_path
+        self.journal_path = journal_path or base_path + '.journal'
+        self.lock_path = lock_path or base_path + '.lock'
+        self.compact_threshold = compact_threshold
+        self.index = ShipIndex()
+        self.version = 0
+        self.base_version = 0
+        # ship id -> (seq, event) of its latest journal record, oldest first
+        self._changes = {}
+        self._journal_records = 0
+        self._loaded = False
+        self._snapshot_stamp = None
+        self._journal_ino = None
+        self._journal_offset = 0
+        # flock is per open file, so threads of one process serialize on this first
+        self._thread_lock = threading.RLock()
+        self._written = threading.Condition(self._thread_lock)
+        self._lock_file = None
+
+    @contextmanager
+    def _locked(self, exclusive):
+        with self._thread_lock:
+            if fcntl is None:
+                yield
+                return
+            if self._lock_file is None:
+                os.makedirs(os.path.dirname(self.lock_path), exist_ok=True)
+                self._lock_file = open(self.lock_path, 'a')
+            fcntl.flock(self._lock_file, fcntl.LOCK_EX if exclusive else fcntl.LOCK_SH)
+            try:
+                yield
+            finally:
+                fcntl.flock(self._lock_file, fcntl.LOCK_UN)
+
+    @contextmanager
+    def _restoring(self):
+        """Reload the index from disk if the block fails, dropping its half-applied changes"""
+        try:
+            yield
+        except Exception:
+            self._reload()
+            raise
+
+    @contextmanager
+    def _reading(self):
+        """Catch up with other processes, then keep this process's writers out while the block reads.
+
+        Writers replace ship records rather than change them in place, so the
+        ships a read returns stay consistent after the block ends.
+        """
+        with self._thread_lock:
+            self.refresh()
+            yield
+
+    def load(self):
+        """Load the snapshot and replay the journal on top of it"""
+        with self._locked(exclusive=False):
+            self._reload()
+
+    def refresh(self):
+        """Catch up with writes made by other processes since this one last looked"""
+        if self._is_current():
+            return
+        with self._locked(exclusive=False):
+            self._sync()
+
+    def _is_current(self):
+        if not self._loaded or _file_stamp(self.snapshot_path) != self._snapshot_stamp:
+            return False
+        journal = _file_stamp(self.journal_path)
+        if journal is None:
+            return self._journal_ino is None
+        return journal[0] == self._journal_ino and journal[2] == self._journal_offset
+
+    def _sync(self):
+        """Tail new journal records, or reload if the files were replaced (caller holds the lock)"""
+        journal = _file_stamp(self.journal_path)
+        if (not self._loaded
+                or _file_stamp(self.snapshot_path) != self._snapshot_stamp
+                or (journal[0] if journal else None) != self._journal_ino
+                or (journal and journal[2] < self._journal_offset)):
+            self._reload()
+        elif journal and journal[2] > self._journal_offset:
+            for record in self._read_journal():
+                self._apply_to_index(record)
+
+    def _reload(self):
+        self.index.clear()
+        self.version = 0
+        self.base_version = 0
+        self._changes = {}
+        self._loaded = False
+        self._journal_ino = None
+        self._journal_offset = 0
+        self._journal_records = 0
+
+        self._snapshot_stamp = _file_stamp(self.snapshot_path)
+        ships = []
+        if self._snapshot_stamp is not None:
+            with open(self.snapshot_path, 'r') as f:
+                ships = json.load(f)
+
+        by_id = {s['id']: s for s in ships}
+        for record in self._read_journal():
+            if record['op'] == 'put':
+                by_id[record['ship']['id']] = record['ship']
+            elif record['op'] == 'delete':
+                by_id.pop(record['id'], None)
+
+        for ship_id in sorted(by_id):
+            self.index.add(by_id[ship_id])
+        self._loaded = True
+
+    def _read_journal(self):
+        """Yield the complete journal records past the current offset and advance it"""
+        try:
+            f = open(self.journal_path, 'rb')
+        except FileNotFoundError:
+            return
+        with f:
+            self._journal_ino = os.fstat(f.fileno()).st_ino
+            f.seek(self._journal_offset)
+            for line in f:
+                if not line.endswith(b'\n'):
+                    # Partial line from a crashed or in-flight append; pick it up next time
+                    break
+                self._journal_offset += len(line)
+                if not line.strip():
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    print(f"Skipping unreadable journal record in {self.journal_path}")
+                    continue
+                # Journals written before sequence numbers existed count up from the snapshot
+                self.version = record.get('seq', self.version + 1)
+                if record['op'] == 'base':
+                    self.base_version = self.version
+                    continue
+                self._journal_records += 1
+                # A batch is one line, so it is replayed whole or not at all
+                for change in record.get('changes', [record]):
+                    self._note_change(change)
+                    yield change
+
+    def _note_change(self, record):
+        """Record the ship's latest change at the current version"""
+        ship_id = record['ship']['id'] if record['op'] == 'put' else record['id']
+        # Journals written before events were recorded only know puts and deletes
+        event = record.get('event') or ('delete' if record['op'] == 'delete' else 'update')
+        # Re-inserting moves the id to the end, keeping _changes ordered by seq
+        self._changes.pop(ship_id, None)
+        self._changes[ship_id] = (self.version, event)
+
+    def _apply_to_index(self, record):
+        if record['op'] == 'put':
+            ship = record['ship']
+            existing = self.index.by_id.get(ship['id'])
+            if existing is not None:
+                self.index.unindex(existing)
+            self.index.add(ship)
+        elif record['op'] == 'delete':
+            existing = self.index.by_id.get(record['id'])
+            if existing is not None:
+                self.index.remove(existing)
+
+    def all(self):
+        """All ships in id order"""
+        with self._reading():
+            return list(self.index.by_id.values())
+
+    def count(self):
+        self.refresh()
+        return len(self.index.by_id)
+
+    def get(self, ship_id):
+        self.refresh()
+        return self.index.by_id.get(ship_id)
+
+    def page(self, criteria, start_date=None, end_date=None, after_id=0, limit=None):
+        """One page of the ships matching the filters, in id order, and the cursor for the next.
+
+        criteria maps indexed fields to the values allowed, e.g.
+        {'status': ['active', 'paused']}; operation dates are compared as ISO
+        strings from start_date to end_date inclusive. The page holds up to
+        limit ships with ids above after_id; the cursor is the last id on it,
+        or None if nothing follows.
+        """
+        with self._reading():
+            ids = None
+            for field, values in criteria.items():
+                matches = set()
+                for value in values:
+                    matches |= self.index.lookup(field, value)
+                ids = matches if ids is None else ids & matches
+            if start_date or end_date:
+                low, high = _date_bounds(start_date, end_date)
+                matches = set()
+                for day, day_ids in self.index.secondary['operationDate'].items():
+                    if isinstance(day, str) and (low is None or day >= low) and (high is None or day < high):
+                        matches |= day_ids
+                ids = matches if ids is None else ids & matches
+
+            # by_id is already in id order
+            ids = list(self.index.by_id) if ids is None else sorted(ids)
+            start = bisect.bisect_right(ids, after_id)
+            end = len(ids) if limit is None else start + limit
+            ships = [self.index.by_id[ship_id] for ship_id in ids[start:end]]
+            return ships, (ships[-1]['id'] if end < len(ids) else None)
+
+    def current_version(self):
+        """Sequence number of the latest write visible to this process"""
+        self.refresh()
+        return self.version
+
+    def events_since(self, version):
+        """Latest event per ship written after version, oldest first, or None if version is unknown here.
+
+        Each event is {'seq', 'event', 'shipId', 'ship'}; event is create,
+        update, progress, status or delete, and ship is None for deletes.
+        """
+        with self._reading():
+            if version < self.base_version or version > self.version:
+                return None
+            events = []
+            for ship_id, (seq, event) in reversed(self._changes.items()):
+                if seq <= version:
+                    break
+                ship = None if event == 'delete' else self.index.by_id[ship_id]
+                events.append({'seq': seq, 'event': event, 'shipId': ship_id, 'ship': ship})
+        events.reverse()
+        return events
+
+    def changes_since(self, version):
+        """(changed ships, deleted ids) written after version, or None if that is older than the journal"""
+        # Version 0 predates the snapshot, whose ships have no change records
+        events = self.events_since(version) if version > 0 else None
+        if events is None:
+            return None
+        changed = sorted((e['ship'] for e in events if e['ship'] is not None), key=lambda ship: ship['id'])
+        deleted = sorted(e['shipId'] for e in events if e['ship'] is None)
+        return changed, deleted
+
+    def wait_for_change(self, version, timeout):
+        """Block until a write newer than version is visible or timeout seconds pass; True if one was"""
+        deadline = time.monotonic() + timeout
+        with self._written:
+            while True:
+                self.refresh()
+                if self.version > version:
+                    return True
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return False
+                # Writes in this process notify right away; other workers' writes are seen by polling
+                self._written.wait(min(remaining, CHANGE_POLL_SECONDS))
+
+    def stats(self):
+        """Operations totals over the active ships, read from the running aggregates"""
+        with self._reading():
+            stats = self.index.stats
+            return {
+                'activeShips': stats.active_ships,
+                'totalShips': len(self.index.by_id),
+                'totalVehicles': stats.total_vehicles,
+                'berthsOccupied': len(stats.berths),
+                'averageProgress': stats.progress_sum / stats.active_ships if stats.active_ships else 0
+            }
+
+    def berth_occupancy(self):
+        """Berth -> active ship at it; the most recently created ship wins a shared berth"""
+        with self._reading():
+            return {berth: self.index.by_id[max(ids)] for berth, ids in self.index.stats.berths.items()}
+
+    def daily_rollup(self, start_date, end_date):
+        """ISO date -> rollup bucket for the days from start_date to end_date inclusive that had ships"""
+        rollup = {}
+        with self._reading():
+            days = self.index.rollup.days
+            day = start_date
+            while day <= end_date:
+                bucket = days.get(day.isoformat())
+                if bucket is not None:
+                    # Copies, as writers change the buckets in place
+                    leads = {lead: dict(totals) for lead, totals in bucket['leads'].items()}
+                    rollup[day.isoformat()] = dict(bucket, leads=leads)
+                day += timedelta(days=1)
+        return rollup
+
+    def create(self, fields):
+        """Assign the next id to a new ship record and store it"""
+        with self._locked(exclusive=True):
+            self._sync()
+            ship = {'id': self.index.next_id}
+            ship.update(fields)
+            with self._restoring():
+                self.index.add(ship)
+            self._append({'op': 'put', 'event': 'create', 'ship': ship})
+            return ship
+
+    def update(self, ship_id, changes, event='update'):
+        """Apply field changes to an existing ship; returns None if it does not exist.
+
+        event names the kind of change (update, progress or status) for change streams.
+        """
+        with self._locked(exclusive=True):
+            self._sync()
+            ship = self.index.by_id.get(ship_id)
+            if ship is None:
+                return None
+            with self._restoring():
+                self.index.unindex(ship)
+                # A new record, so ships already handed to readers do not change under them
+                ship = dict(ship, **changes)
+                self.index.add(ship)
+            self._append({'op': 'put', 'event': event, 'ship': ship})
+            return ship
+
+    def delete(self, ship_id):
+        """Remove a ship; returns the removed record or None if it does not exist"""
+        with self._locked(exclusive=True):
+            self._sync()
+            ship = self.index.by_id.get(ship_id)
+            if ship is None:
+                return None
+            with self._restoring():
+                self.index.remove(ship)
+            self._append({'op': 'delete', 'event': 'delete', 'id': ship_id})
+            return ship
+
+    def apply(self, operations):
+        """Apply a list of operations atomically as one journal record.
+
+        Operations are {'op': 'create', 'fields'}, {'op': 'update', 'id',
+        'changes', 'event'} or {'op': 'delete', 'id'}, in order. Returns the
+        ship each one created, updated or removed, or None without changing
+        anything if one targets a ship that does not exist at that point.
+        """
+        with self._locked(exclusive=True):
+            self._sync()
+            # Check every target first so a failure leaves the index untouched
+            live = set(self.index.by_id)
+            next_id = self.index.next_id
+            for operation in operations:
+                if operation['op'] == 'create':
+                    live.add(next_id)
+                    next_id += 1
+                elif operation['id'] not in live:
+                    return None
+                elif operation['op'] == 'delete':
+                    live.discard(operation['id'])
+
+            results, changes = [], []
+            with self._restoring():
+                for operation in operations:
+                    if operation['op'] == 'create':
+                        ship = {'id': self.index.next_id}
+                        ship.update(operation['fields'])
+                        self.index.add(ship)
+                        changes.append({'op': 'put', 'event': 'create', 'ship': ship})
+                    elif operation['op'] == 'update':
+                        ship = self.index.by_id[operation['id']]
+                        self.index.unindex(ship)
+                        ship = dict(ship, **operation['changes'])
+                        self.index.add(ship)
+                        changes.append({'op': 'put', 'event': operation.get('event', 'update'), 'ship': ship})
+                    else:
+                        ship = self.index.by_id[operation['id']]
+                        self.index.remove(ship)
+                        changes.append({'op': 'delete', 'event': 'delete', 'id': ship['id']})
+                    results.append(ship)
+            if changes:
+                self._append({'op': 'batch', 'changes': changes})
+            return results
+
+    def _append(self, record):
+        """Append one record to the journal (caller holds the exclusive lock and has synced).
+
+        Raises if the record could not be written, after reloading the index
+        from disk so it no longer holds the change that was not saved.
+        """
+        # Timed as save_ships, the write that replaced rewriting ships.json
+        with timer('save_ships'):
+            offset = self._journal_offset
+            try:
+                record['seq'] = self.version + 1
+                os.makedirs(os.path.dirname(self.journal_path), exist_ok=True)
+                with open(self.journal_path, 'ab') as f:
+                    if f.tell() > self._journal_offset:
+                        # A torn last line from a crashed append; writing after it would join
+                        # this record to it and lose both on the next load
+                        print(f"Dropping partial journal record in {self.journal_path}")
+                        f.truncate(self._journal_offset)
+                    f.write(json.dumps(record).encode() + b'\n')
+                    f.flush()
+                    os.fsync(f.fileno())
+                    self._journal_ino = os.fstat(f.fileno()).st_ino
+                    self._journal_offset = f.tell()
+            except Exception:
+                self._discard_after(offset)
+                raise
+            self.version = record['seq']
+            self._journal_records += 1
+            for change in record.get('changes', [record]):
+                self._note_change(change)
+            self._written.notify_all()
+            if self._journal_records >= self.compact_threshold:
+                try:
+                    self._compact()
+                except Exception as e:
+                    # The record is in the journal; compaction is retried on the next write
+                    print(f"Error compacting ships data: {e}")
+
+    def _discard_after(self, offset):
+        """Cut an unsaved record off the journal and reload, dropping its changes from the index"""
+        try:
+            with open(self.journal_path, 'r+b') as f:
+                f.truncate(offset)
+        except OSError as e:
+            print(f"Error discarding unsaved journal record: {e}")
+        self._reload()
+
+    def compact(self):
+        """Write the current ships list as the new snapshot and start an empty journal"""
+        with self._locked(exclusive=True):
+            self._sync()
+            self._compact()
+
+    def _compact(self):
+        if not self._loaded:
+            # Never let a failed load overwrite the snapshot with an empty list
+            return
+        atomic_write_json(self.snapshot_path, list(self.index.by_id.values()), indent=2)
+        # The fresh journal starts with a base record so the version survives compaction.
+        # Replaying the old journal over the new snapshot is idempotent, so a crash
+        # between these two steps only costs a redundant replay on the next load
+        base = json.dumps({'seq': self.version, 'op': 'base'}) + '\n'
+        atomic_write_text(self.journal_path, base)
+        self._snapshot_stamp = _file_stamp(self.snapshot_path)
+        journal = _file_stamp(self.journal_path)
+        self._journal_ino = journal[0]
+        self._journal_offset = journal[2]
+        self._journal_records = 0
+        self.base_version = self.version
+        self._changes = {}
+
+
+class SqlShipStore:
+    """Ship storage backed by the ``Ship`` table, with the same interface as ``ShipStore``.
+
+    Nothing is cached in-process: lookups and filters run as queries against
+    the indexed columns, so every worker sharing the database sees the same
+    data. Methods must be called inside an application context.
+    """
+
+    def __init__(self, import_path=None):
+        # JSON snapshot (plus journal) to seed an empty table from
+        self.import_path = import_path
+
+    def load(self):
+        """Import the JSON ships store the first time the table is empty"""
+        if Ship.query.first() is not None or not self.import_path or not os.path.exists(self.import_path):
+            return
+        legacy = ShipStore(self.import_path)
+        legacy.load()
+        for record in legacy.all():
+            ship = Ship()
+            ship.update_from_dict(record)
+            db.session.add(ship)
+        self._commit()
+        print(f"Imported {legacy.count()} ships from {self.import_path}")
+
+    @staticmethod
+    def _commit():
+        try:
+            with timer('save_ships'):
+                db.session.commit()
+        except Exception:
+            db.session.rollback()
+            raise
+
+    def all(self):
+        """All ships in id order"""
+        return [ship.to_dict() for ship in Ship.query.order_by(Ship.id)]
+
+    def count(self):
+        return Ship.query.count()
+
+    def get(self, ship_id):
+        ship = db.session.get(Ship, ship_id)
+        return ship.to_dict() if ship else None
+
+    def page(self, criteria, start_date=None, end_date=None, after_id=0, limit=None):
+        """One page of the ships matching the filters and the next cursor; see ShipStore.page"""
+        query = Ship.query.filter(Ship.id > after_id)
+        for field, values in criteria.items():
+            query = query.filter(getattr(Ship, column_name(field)).in_(values))
+        low, high = _date_bounds(start_date, end_date)
+        if low is not None:
+            query = query.filter(Ship.operation_date >= low)
+        if high is not None:
+            query = query.filter(Ship.operation_date < high)
+        query = query.order_by(Ship.id)
+        if limit is None:
+            return [ship.to_dict() for ship in query], None
+        # One extra row tells whether another page follows
+        ships = [ship.to_dict() for ship in query.limit(limit + 1)]
+        if len(ships) > limit:
+            return ships[:limit], ships[limit - 1]['id']
+        return ships, None
+
+    def stats(self):
+        """Operations totals over the active ships, aggregated by the database"""
+        active = Ship.status != 'complete'
+        active_ships, total_vehicles, average_progress = db.session.query(
+            func.count(Ship.id), func.sum(Ship.total_vehicles), func.avg(Ship.progress)
+        ).filter(active).one()
+        berths_occupied = db.session.query(func.count(distinct(Ship.berth))).filter(
+            active, Ship.berth != ''
+        ).scalar()
+        return {
+            'activeShips': active_ships,
+            'totalShips': Ship.query.count(),
+            'totalVehicles': total_vehicles or 0,
+            'berthsOccupied': berths_occupied,
+            'averageProgress': average_progress or 0
+        }
+
+    def berth_occupancy(self):
+        """Berth -> active ship at it; the most recently created ship wins a shared berth"""
+        latest = db.session.query(func.max(Ship.id)).filter(
+            Ship.status != 'complete', Ship.berth != ''
+        ).group_by(Ship.berth)
+        return {ship.berth: ship.to_dict() for ship in Ship.query.filter(Ship.id.in_(latest))}
+
+    def daily_rollup(self, start_date, end_date):
+        """ISO date -> rollup bucket for the days from start_date to end_date inclusive that had ships"""
+        # Operation dates may carry a time, so bound by the start of the following day
+        ships = Ship.query.filter(
+            Ship.operation_date >= start_date.isoformat(),
+            Ship.operation_date < (end_date + timedelta(days=1)).isoformat()
+        )
+        rollup = {}
+        for ship in ships:
+            entry = rollup_entry(ship.to_dict())
+            if entry is not None:
+                add_to_rollup(rollup.setdefault(entry['date'], new_rollup_bucket()), entry)
+        return dict(sorted(rollup.items()))
+
+    def current_version(self):
+        """Sequence number of the latest write to the table"""
+        return db.session.query(func.max(ShipChange.seq)).scalar() or 0
+
+    def events_since(self, version):
+        """Latest event per ship written after version, oldest first, or None if version is unknown here"""
+        if version > self.current_version():
+            return None
+        changes = ShipChange.query.filter(ShipChange.seq > version).order_by(ShipChange.seq).all()
+        changed_ids = [change.ship_id for change in changes if change.event != 'delete']
+        ships = {ship.id: ship.to_dict() for ship in Ship.query.filter(Ship.id.in_(changed_ids))} if changed_ids else {}
+        return [{'seq': change.seq, 'event': change.event, 'shipId': change.ship_id, 'ship': ships.get(change.ship_id)}
+                for change in changes]
+
+    def changes_since(self, version):
+        """(changed ships, deleted ids) written after version, or None for a full resync"""
+        # Version 0 predates any change record, e.g. ships imported from ships.json
+        events = self.events_since(version) if version > 0 else None
+        if events is None:
+            return None
+        changed = sorted((e['ship'] for e in events if e['ship'] is not None), key=lambda ship: ship['id'])
+        deleted = sorted(e['shipId'] for e in events if e['ship'] is None)
+        return changed, deleted
+
+    def wait_for_change(self, version, timeout):
+        """Block until a write newer than version is committed or timeout seconds pass; True if one was"""
+        deadline = time.monotonic() + timeout
+        while True:
+            # End the read transaction so the next query sees other connections' commits
+            db.session.rollback()
+            if self.current_version() > version:
+                return True
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                return False
+            time.sleep(min(remaining, CHANGE_POLL_SECONDS))
+
+    @staticmethod
+    def _note_change(ship_id, event):
+        """Give the ship a fresh change sequence number in the current transaction"""
+        ShipChange.query.filter_by(ship_id=ship_id).delete()
+        db.session.add(ShipChange(ship_id=ship_id, event=event))
+
+    def create(self, fields):
+        """Insert a new ship; the database assigns the id"""
+        ship = Ship()
+        ship.update_from_dict({k: v for k, v in fields.items() if k != 'id'})
+        db.session.add(ship)
+        db.session.flush()
+        self._note_change(ship.id, 'create')
+        self._commit()
+        return ship.to_dict()
+
+    def update(self, ship_id, changes, event='update'):
+        """Apply field changes to an existing ship; returns None if it does not exist"""
+        ship = db.session.get(Ship, ship_id)
+        if ship is None:
+            return None
+        ship.update_from_dict({k: v for k, v in changes.items() if k != 'id'})
+        self._note_change(ship_id, event)
+        self._commit()
+        return ship.to_dict()
+
+    def delete(self, ship_id):
+        """Remove a ship; returns the removed record or None if it does not exist"""
+        ship = db.session.get(Ship, ship_id)
+        if ship is None:
+            return None
+        record = ship.to_dict()
+        db.session.delete(ship)
+        self._note_change(ship_id, 'delete')
+        self._commit()
+        return record
+
+    def apply(self, operations):
+        """Apply a list of operations in one transaction; see ShipStore.apply"""
+        results = []
+        for operation in operations:
+            if operation['op'] == 'create':
+                ship = Ship()
+                ship.update_from_dict({k: v for k, v in operation['fields'].items() if k != 'id'})
+                db.session.add(ship)
+                db.session.flush()
+                self._note_change(ship.id, 'create')
+                results.append(ship.to_dict())
+                continue
+            ship = db.session.get(Ship, operation['id'])
+            if ship is None:
+                db.session.rollback()
+                return None
+            if operation['op'] == 'update':
+                ship.update_from_dict({k: v for k, v in operation['changes'].items() if k != 'id'})
+                self._note_change(ship.id, operation.get('event', 'update'))
+                results.append(ship.to_dict())
+            else:
+                results.append(ship.to_dict())
+                db.session.delete(ship)
+                # Flush so later operations in the batch no longer find it
+                db.session.flush()
+                self._note_change(operation['id'], 'delete')
+        self._commit()
+        return results
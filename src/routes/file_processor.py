@@ -1,9 +1,18 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, current_app, request, jsonify
 import os
-import re
-import json
+import io
+import hashlib
+import tempfile
+from concurrent.futures.process import BrokenProcessPool
 from werkzeug.utils import secure_filename
-from pypdf import PdfReader
+from src.extraction.cache import ExtractionCache, file_digest, stream_digest
+from src.extraction.csv_rows import read_csv_text
+from src.extraction.jobs import ExtractionJobs
+from src.extraction.pdf import iter_pdf_pages, mark_pages, read_pdf
+from src.extraction.pool import discard_pool, get_pool, start_pool
+from src.extraction.stats import FieldStats
+from src.extraction.templates import extract_document_fields
+from src.metrics import timer
 
 file_processor_bp = Blueprint('file_processor', __name__)
 
@@ -11,6 +20,46 @@ file_processor_bp = Blueprint('file_processor', __name__)
 UPLOAD_FOLDER = os.path.abspath(os.path.join(os.path.dirname(__file__), '..', '..', 'uploads'))
 ALLOWED_EXTENSIONS = {'txt', 'pdf', 'csv'}
 MAX_FILE_SIZE = 16 * 1024 * 1024  # 16MB
+# Uploads queued as jobs are copied to a buffer kept in memory up to this size, then spilled to a temp file
+JOB_SPOOL_BYTES = 1024 * 1024
+# Longest a job status request may wait for the job to finish (below common proxy timeouts)
+JOB_MAX_WAIT_SECONDS = 25
+# Most files one /api/extract/batch request may carry
+MAX_BATCH_FILES = 20
+
+# Results of /api/extract by document content, PDF page texts by page content, and the
+# background extraction jobs; in-memory defaults until init_extraction applies the app config
+extract_cache = ExtractionCache()
+page_cache = ExtractionCache()
+extract_jobs = ExtractionJobs()
+# Per-field statistics of every document parsed in this process
+FIELD_STATS = FieldStats()
+
+def init_extraction(app):
+    """Set up the extraction caches, process pools and job pool from the app config.
+
+    Call at startup, before any other thread runs, as the process pools fork here.
+    """
+    global extract_cache, page_cache, extract_jobs
+    if app.config.get('PDF_WORKERS', 0) > 0:
+        start_pool('pages', app.config['PDF_WORKERS'])
+    if app.config.get('EXTRACT_BATCH_WORKERS', 1) > 1:
+        start_pool('batch', app.config['EXTRACT_BATCH_WORKERS'])
+    extract_cache = ExtractionCache(
+        app.config.get('EXTRACT_CACHE_DIR'),
+        max_entries=app.config.get('EXTRACT_CACHE_ENTRIES', 256),
+        max_disk_bytes=app.config.get('EXTRACT_CACHE_DISK_BYTES', 64 * 1024 * 1024)
+    )
+    page_cache = ExtractionCache(
+        app.config.get('PAGE_CACHE_DIR'),
+        max_entries=app.config.get('PAGE_CACHE_ENTRIES', 4096),
+        max_disk_bytes=app.config.get('PAGE_CACHE_DISK_BYTES', 64 * 1024 * 1024)
+    )
+    extract_jobs = ExtractionJobs(
+        workers=app.config.get('EXTRACT_JOB_WORKERS', 2),
+        max_pending=app.config.get('EXTRACT_JOB_QUEUE', 16),
+        directory=app.config.get('EXTRACT_JOBS_DIR')
+    )
 
 def allowed_file(filename):
     return '.' in filename and filename.rsplit('.', 1)[1].lower() in ALLOWED_EXTENSIONS
@@ -18,794 +67,44 @@ def allowed_file(filename):
 def extract_text_from_pdf(file_path):
     """Extract text from PDF file - processes all pages"""
     try:
-        with open(file_path, 'rb') as file:
-            pdf_reader = PdfReader(file)
-            text = ""
-            total_pages = len(pdf_reader.pages)
-
-            for page_num, page in enumerate(pdf_reader.pages, 1):
-                page_text = page.extract_text() or ""
-                # Add page separator for better parsing
-                text += f"\n=== PAGE {page_num} OF {total_pages} ===\n"
-                text += page_text
-                text += f"\n=== END PAGE {page_num} ===\n"
-
-        return text
+        pages = []
+        total_pages = 0
+        for page_num, total_pages, page_text in iter_pdf_pages(file_path):
+            pages.append(page_text)
+        # Add page separators for better parsing
+        return mark_pages(pages, total_pages)
     except Exception as e:
         return f"Error reading PDF: {str(e)}"
 
-def extract_data_from_csv(file_path):
-    """Extract data from CSV file"""
+def read_source(source):
+    """Bytes of a file path or a binary stream (read from the start)"""
+    if isinstance(source, str):
+        with open(source, 'rb') as f:
+            return f.read()
+    source.seek(0)
+    return source.read()
+
+def decode_text(data, encoding):
+    """Decode file bytes with newlines translated as text-mode open() does"""
+    return data.decode(encoding).replace('\r\n', '\n').replace('\r', '\n')
+
+def extract_data_from_csv(source):
+    """Extract data from CSV file (a path or a binary stream)"""
     try:
-        # Try UTF-8 first, fallback to other encodings
-        for encoding in ['utf-8', 'latin-1', 'cp1252']:
-            try:
-                with open(file_path, 'r', encoding=encoding) as file:
-                    text = file.read()
-                return text
-            except UnicodeDecodeError:
-                continue
-        return "Error: Unable to decode file with supported encodings"
+        # Decoded as it is read, in the encoding its first bytes suggest
+        return read_csv_text(source)
     except Exception as e:
         return f"Error reading CSV file: {str(e)}"
 
-def parse_maritime_data(text):
-    """Parse maritime-specific data from extracted text - handles multi-page documents"""
-    data = {}
-
-    # Clean up the text for better parsing across page boundaries
-    # Remove page markers but keep the content
-    clean_text = re.sub(r'=== PAGE \d+ OF \d+ ===\n?', ' ', text)
-    clean_text = re.sub(r'=== END PAGE \d+ ===\n?', ' ', clean_text)
-    # Normalize whitespace
-    clean_text = re.sub(r'\s+', ' ', clean_text)
-
-    # More comprehensive vessel name patterns
-    vessel_patterns = [
-        r'vessel\s*name[:\s\-=]+([A-Za-z0-9\s\-\.]+)',
-        r'ship\s*name[:\s\-=]+([A-Za-z0-9\s\-\.]+)',
-        r'mv\s+([A-Za-z0-9\s\-\.]+)',
-        r'm/v\s+([A-Za-z0-9\s\-\.]+)',
-        r'vessel[:\s\-=]+([A-Za-z0-9\s\-\.]+)',
-        r'name\s*of\s*vessel[:\s\-=]+([A-Za-z0-9\s\-\.]+)',
-        r'ship[:\s\-=]+([A-Za-z0-9\s\-\.]+)',
-        r'vessel\s*:\s*([A-Za-z0-9\s\-\.]+)',
-        r'([A-Z][A-Z\s]{2,20})\s*(?:vessel|ship)',
-        r'(?:the\s+)?([A-Z][A-Za-z\s]{5,30})\s*(?:auto\s*carrier|roro|vessel)'
-    ]
-
-    for pattern in vessel_patterns:
-        # Search all occurrences, not just the first one
-        matches = re.findall(pattern, clean_text, re.IGNORECASE)
-        if matches:
-            # Take the first match that looks like a valid vessel name
-            for match in matches:
-                vessel_name = match.strip()
-                if len(vessel_name) > 2 and not vessel_name.lower() in ['type', 'information', 'details']:
-                    data['vesselName'] = vessel_name
-                    break
-            if 'vesselName' in data:
-                break
-
-    # Enhanced vessel type patterns
-    vessel_type_patterns = [
-        r'vessel\s*type[:\s\-=]+([A-Za-z\s\-]+)',
-        r'ship\s*type[:\s\-=]+([A-Za-z\s\-]+)',
-        r'type[:\s\-=]+(auto\s*carrier|roro|ro-ro|container|multi-purpose|car\s*carrier)',
-        r'(auto\s*carrier|roro|ro-ro|container\s*ship|multi-purpose|car\s*carrier)',
-        r'vehicle\s*carrier',
-        r'automobile\s*carrier'
-    ]
-
-    for pattern in vessel_type_patterns:
-        matches = re.findall(pattern, clean_text, re.IGNORECASE)
-        if matches:
-            for match in matches:
-                vessel_type = str(match).strip().lower()
-                if 'auto' in vessel_type or 'car' in vessel_type or 'vehicle' in vessel_type:
-                    data['vesselType'] = 'Auto Carrier'
-                    break
-                elif 'roro' in vessel_type or 'ro-ro' in vessel_type:
-                    data['vesselType'] = 'RoRo Vessel'
-                    break
-                elif 'container' in vessel_type:
-                    data['vesselType'] = 'Container Ship'
-                    break
-                elif 'multi' in vessel_type:
-                    data['vesselType'] = 'Multi-Purpose'
-                    break
-            if 'vesselType' in data:
-                break
-
-    # Enhanced port patterns
-    port_patterns = [
-        r'port[:\s\-=]+([A-Za-z\s]+)',
-        r'destination[:\s\-=]+([A-Za-z\s]+)',
-        r'berth[:\s\-=]+([A-Za-z0-9\s]+)',
-        r'location[:\s\-=]+([A-Za-z\s]+)',
-        r'terminal[:\s\-=]+([A-Za-z\s]+)',
-        r'colonel\s*island',
-        r'brunswick',
-        r'savannah',
-        r'charleston',
-        r'(colonel\s*island|brunswick|savannah|charleston)',
-        r'discharge\s*port[:\s\-=]+([A-Za-z\s]+)',
-        r'loading\s*port[:\s\-=]+([A-Za-z\s]+)'
-    ]
-
-    for pattern in port_patterns:
-        matches = re.findall(pattern, clean_text, re.IGNORECASE)
-        if matches:
-            for match in matches:
-                if isinstance(match, tuple):
-                    match = match[0] if match[0] else match
-                if 'colonel' in str(match).lower():
-                    data['port'] = 'Colonel Island'
-                    break
-                elif len(str(match).strip()) > 1:
-                    data['port'] = str(match).strip()
-                    break
-            if 'port' in data:
-                break
-        else:
-            # Check for direct matches
-            match = re.search(pattern, clean_text, re.IGNORECASE)
-            if match:
-                if 'colonel' in match.group(0).lower():
-                    data['port'] = 'Colonel Island'
-                    break
-                elif match.groups():
-                    data['port'] = match.group(1).strip()
-                    break
-                else:
-                    data['port'] = match.group(0).strip()
-                    break
-
-    # Date patterns - search cleaned text for all dates
-    date_patterns = [
-        r'(\d{4}-\d{2}-\d{2})',
-        r'(\d{2}/\d{2}/\d{4})',
-        r'(\d{2}-\d{2}-\d{4})',
-        r'date[:\s]+(\d{1,2}[/-]\d{1,2}[/-]\d{4})'
-    ]
-
-    for pattern in date_patterns:
-        matches = re.findall(pattern, clean_text, re.IGNORECASE)
-        if matches:
-            for date_str in matches:
-                if isinstance(date_str, tuple):
-                    date_str = date_str[0]
-                try:
-                    # Convert to YYYY-MM-DD format
-                    if '/' in date_str:
-                        parts = date_str.split('/')
-                        if len(parts) == 3 and len(parts[2]) == 4:  # MM/DD/YYYY
-                            data['operationDate'] = f"{parts[2]}-{parts[0].zfill(2)}-{parts[1].zfill(2)}"
-                            break
-                    elif '-' in date_str and len(date_str.split('-')[0]) == 4:  # YYYY-MM-DD
-                        data['operationDate'] = date_str
-                        break
-                except:
-                    continue
-            if 'operationDate' in data:
-                break
-
-    # Company patterns
-    company_patterns = [
-        r'stevedoring[:\s]+([A-Za-z\s]+)',
-        r'company[:\s]+([A-Za-z\s]+)',
-        r'aps\s*stevedoring',
-        r'ssa\s*marine',
-        r'ports\s*america'
-    ]
-
-    for pattern in company_patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            if 'aps' in match.group(0).lower():
-                data['company'] = 'APS Stevedoring'
-            elif 'ssa' in match.group(0).lower():
-                data['company'] = 'SSA Marine'
-            elif 'ports' in match.group(0).lower():
-                data['company'] = 'Ports America'
-            else:
-                data['company'] = match.group(1).strip() if match.groups() else match.group(0).strip()
-            break
-
-    # Vehicle count patterns - search all pages with more specific patterns
-    vehicle_patterns = [
-        r'total\s*automobiles?[:\s]+(\d+)',
-        r'total\s*vehicles?[:\s]+(\d+)',
-        r'automobiles?\s*discharge[:\s]+(\d+)',
-        r'automobiles?[:\s]+(\d+)',
-        r'cars?[:\s]+(\d+)',
-        r'units?[:\s]+(\d+)',
-        r'(\d+)\s*automobiles?',
-        r'(\d+)\s*vehicles?',
-        r'(\d+)\s*cars?'
-    ]
-
-    for pattern in vehicle_patterns:
-        matches = re.findall(pattern, clean_text, re.IGNORECASE)
-        if matches:
-            # Take the largest number found (likely the total)
-            numbers = [int(match) for match in matches if match.isdigit()]
-            if numbers:
-                data['totalAutomobilesDischarge'] = max(numbers)
-                # Also set alternative field names
-                data['totalAutomobiles'] = max(numbers)
-                data['automobiles'] = max(numbers)
-                break
-
-    # Heavy equipment patterns - search all pages with more specific patterns
-    heavy_equipment_patterns = [
-        r'heavy\s*equipment\s*units?[:\s]+(\d+)',
-        r'heavy\s*equipment[:\s]+(\d+)',
-        r'hh[:\s]+(\d+)',
-        r'high\s*&\s*heavy[:\s]+(\d+)',
-        r'high\s*and\s*heavy[:\s]+(\d+)',
-        r'(\d+)\s*heavy\s*equipment',
-        r'equipment\s*units?[:\s]+(\d+)'
-    ]
-
-    for pattern in heavy_equipment_patterns:
-        matches = re.findall(pattern, clean_text, re.IGNORECASE)
-        if matches:
-            numbers = [int(match) for match in matches if match.isdigit()]
-            if numbers:
-                data['heavyEquipmentDischarge'] = max(numbers)
-                # Also set alternative field name
-                data['heavyEquipment'] = max(numbers)
-                break
-
-    # Brand-specific patterns
-    brand_patterns = {
-        'MB': r'mercedes[-\s]*benz[:\s]+(\d+)|mb[:\s]+(\d+)',
-        'BMW': r'bmw[:\s]+(\d+)',
-        'LR': r'land\s*rover[:\s]+(\d+)|lr[:\s]+(\d+)',
-        'RR': r'rolls[-\s]*royce[:\s]+(\d+)|rr[:\s]+(\d+)'
-    }
+def parse_maritime_data(text, clean_text=None, stats=None):
+    """Parse maritime-specific data from extracted text - handles multi-page documents.
 
-    for brand, pattern in brand_patterns.items():
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            count = match.group(1) or match.group(2) if match.groups() else match.group(0)
-            if count and count.isdigit():
-                data[f'{brand.lower()}Count'] = int(count)
-
-    # Enhanced operation type patterns
-    operation_patterns = [
-        r'operation[:\s\-=]+(discharge|loading|discharge\s*\+\s*loading|discharge\s*and\s*loading)',
-        r'(discharge\s*only|loading\s*only|discharge\s*and\s*loading)',
-        r'type\s*of\s*operation[:\s\-=]+(discharge|loading|both)',
-        r'operation\s*type[:\s\-=]+(discharge|loading|both)',
-        r'work\s*type[:\s\-=]+(discharge|loading|both)',
-        r'(discharge|loading|both)\s*operation',
-        r'cargo\s*operation[:\s\-=]+(discharge|loading|both)'
-    ]
-
-    for pattern in operation_patterns:
-        match = re.search(pattern, clean_text, re.IGNORECASE)
-        if match:
-            op_type = match.group(1).lower() if match.groups() else match.group(0).lower()
-            if 'discharge' in op_type and ('loading' in op_type or 'both' in op_type or '+' in op_type):
-                data['operationType'] = 'Discharge + Loading'
-            elif 'discharge' in op_type:
-                data['operationType'] = 'Discharge Only'
-            elif 'loading' in op_type:
-                data['operationType'] = 'Loading Only'
-            elif 'both' in op_type:
-                data['operationType'] = 'Discharge + Loading'
-            break
-
-    # Team assignment patterns
-    # Auto Operations Team
-    auto_lead_patterns = [
-        r'auto\s*operations?\s*team[:\s]*lead\s*supervisor[:\s]+([A-Za-z\s]+)',
-        r'auto\s*operations?[:\s]*lead[:\s]+([A-Za-z\s]+)',
-        r'lead\s*supervisor[:\s]+([A-Za-z\s]+)',
-        r'colby\s+chapman',
-        r'auto.*lead.*([A-Za-z\s]+chapman)',
-        r'auto.*([A-Za-z\s]*colby[A-Za-z\s]*)'
-    ]
-
-    for pattern in auto_lead_patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            if 'colby' in match.group(0).lower():
-                data['autoOperationsLead'] = 'Colby Chapman'
-            elif match.groups():
-                data['autoOperationsLead'] = match.group(1).strip()
-            break
-
-    auto_assistant_patterns = [
-        r'auto\s*operations?\s*team[:\s]*assistant\s*supervisor[:\s]+([A-Za-z\s]+)',
-        r'auto\s*operations?[:\s]*assistant[:\s]+([A-Za-z\s]+)',
-        r'assistant\s*supervisor[:\s]+([A-Za-z\s]+)',
-        r'cole\s+bailey',
-        r'auto.*assistant.*([A-Za-z\s]+bailey)',
-        r'auto.*([A-Za-z\s]*cole[A-Za-z\s]*)'
-    ]
-
-    for pattern in auto_assistant_patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            if 'cole' in match.group(0).lower():
-                data['autoOperationsAssistant'] = 'Cole Bailey'
-            elif match.groups():
-                data['autoOperationsAssistant'] = match.group(1).strip()
-            break
-
-    # High & Heavy Team
-    heavy_lead_patterns = [
-        r'high\s*&?\s*heavy\s*team[:\s]*lead\s*supervisor[:\s]+([A-Za-z\s]+)',
-        r'high\s*&?\s*heavy[:\s]*lead[:\s]+([A-Za-z\s]+)',
-        r'heavy\s*equipment[:\s]*lead[:\s]+([A-Za-z\s]+)',
-        r'spencer\s+wilkins',
-        r'heavy.*lead.*([A-Za-z\s]+wilkins)',
-        r'heavy.*([A-Za-z\s]*spencer[A-Za-z\s]*)'
-    ]
-
-    for pattern in heavy_lead_patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            if 'spencer' in match.group(0).lower():
-                data['heavyHeavyLead'] = 'Spencer Wilkins'
-            elif match.groups():
-                data['heavyHeavyLead'] = match.group(1).strip()
-            break
-
-    heavy_assistant_patterns = [
-        r'high\s*&?\s*heavy\s*team[:\s]*assistant\s*supervisor[:\s]+([A-Za-z\s]+)',
-        r'high\s*&?\s*heavy[:\s]*assistant[:\s]+([A-Za-z\s]+)',
-        r'heavy\s*equipment[:\s]*assistant[:\s]+([A-Za-z\s]+)',
-        r'bruce\s+banner',
-        r'heavy.*assistant.*([A-Za-z\s]+banner)',
-        r'heavy.*([A-Za-z\s]*bruce[A-Za-z\s]*)'
-    ]
-
-    for pattern in heavy_assistant_patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            if 'bruce' in match.group(0).lower():
-                data['heavyHeavyAssistant'] = 'Bruce Banner'
-            elif match.groups():
-                data['heavyHeavyAssistant'] = match.group(1).strip()
-            break
-
-    # Operation Manager
-    manager_patterns = [
-        r'operation\s*manager[:\s]+([A-Za-z\s]+)',
-        r'manager[:\s]+([A-Za-z\s]+)',
-        r'your\s*name[:\s]+([A-Za-z\s]+)',
-        r'john\s+smith',
-        r'supervisor[:\s]+([A-Za-z\s]+)'
-    ]
-
-    for pattern in manager_patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            if 'john' in match.group(0).lower():
-                data['operationManager'] = 'John Smith'
-            elif match.groups():
-                data['operationManager'] = match.group(1).strip()
-            break
-
-    # Enhanced berth location patterns
-    berth_patterns = [
-        r'berth\s*location[:\s\-=]+([A-Za-z0-9\s]+)',
-        r'berth[:\s\-=]+([123456])',
-        r'berth\s*([123456])',
-        r'assigned.*berth[:\s\-=]*([123456])',
-        r'berth\s*assignment[:\s\-=]+([A-Za-z0-9\s]+)',
-        r'dock[:\s\-=]+([123456])',
-        r'pier[:\s\-=]+([123456])',
-        r'terminal\s*berth[:\s\-=]+([123456])',
-        r'vessel.*berth[:\s\-=]+([123456])',
-        r'ship.*berth[:\s\-=]+([123456])',
-        r'mooring[:\s\-=]+([A-Za-z0-9\s]+)',
-        r'wharf[:\s\-=]+([A-Za-z0-9\s]+)',
-        r'(?:at\s+)?berth\s*(\d+)',
-        r'(?:position|location)[:\s\-=]+berth\s*(\d+)'
-    ]
-
-    for pattern in berth_patterns:
-        matches = re.findall(pattern, clean_text, re.IGNORECASE)
-        if matches:
-            for match in matches:
-                berth_identifier = str(match).strip()
-                # Handle single digit berth numbers
-                if berth_identifier in ['1', '2', '3']:
-                    data['berthLocation'] = f'Berth {berth_identifier}'
-                    break
-                # Handle full berth names
-                elif 'berth' in berth_identifier.lower() and any(num in berth_identifier for num in ['1', '2', '3']):
-                    data['berthLocation'] = berth_identifier.title()
-                    break
-                # Handle other dock/pier references
-                elif len(berth_identifier) > 0 and any(num in berth_identifier for num in ['1', '2', '3']):
-                    # Extract the number and format as Berth X
-                    for num in ['1', '2', '3']:
-                        if num in berth_identifier:
-                            data['berthLocation'] = f'Berth {num}'
-                            break
-                    if 'berthLocation' in data:
-                        break
-            if 'berthLocation' in data:
-                break
-
-    # Also set alternative field names for berth
-    if 'berthLocation' in data:
-        data['berth'] = data['berthLocation']
-        data['berthAssignment'] = data['berthLocation']
-
-    # Extract all additional operational parameters
-
-    # Expected Rate patterns
-    rate_patterns = [
-        r'expected\s*rate[:\s]+(\d+(?:\.\d+)?)',
-        r'rate[:\s]+(\d+(?:\.\d+)?)\s*cars?/hour',
-        r'(\d+(?:\.\d+)?)\s*cars?/hour',
-        r'processing\s*rate[:\s]+(\d+(?:\.\d+)?)'
-    ]
-
-    for pattern in rate_patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            data['expectedRate'] = match.group(1).strip()
-            break
-
-    # Total Drivers patterns
-    driver_patterns = [
-        r'total\s*drivers?[:\s]+(\d+)',
-        r'drivers?[:\s]+(\d+)\s*drivers?',
-        r'(\d+)\s*drivers?\s*total'
-    ]
-
-    for pattern in driver_patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            data['totalDrivers'] = match.group(1).strip()
-            break
-
-    # Shift time patterns
-    shift_start_patterns = [
-        r'shift\s*start[:\s]+(\d{1,2}:\d{2}(?:\s*[AP]M)?)',
-        r'start\s*time[:\s]+(\d{1,2}:\d{2}(?:\s*[AP]M)?)',
-        r'(\d{1,2}:\d{2}\s*AM).*shift',
-    ]
-
-    for pattern in shift_start_patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            data['shiftStart'] = match.group(1).strip()
-            break
-
-    shift_end_patterns = [
-        r'shift\s*end[:\s]+(\d{1,2}:\d{2}(?:\s*[AP]M)?)',
-        r'end\s*time[:\s]+(\d{1,2}:\d{2}(?:\s*[AP]M)?)',
-        r'(\d{1,2}:\d{2}\s*PM).*shift',
-    ]
-
-    for pattern in shift_end_patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            data['shiftEnd'] = match.group(1).strip()
-            break
-
-    # Break duration patterns
-    break_patterns = [
-        r'break\s*duration[:\s]+(\d+)',
-        r'break[:\s]+(\d+)\s*minutes?',
-        r'(\d+)\s*minutes?\s*break',
-    ]
-
-    for pattern in break_patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            data['breakDuration'] = match.group(1).strip()
-            break
-
-    # Vehicle ID patterns
-    van_id_patterns = [
-        r'van\s*1\s*id[:\s]+([A-Za-z0-9]+)',
-        r'van\s*2\s*id[:\s]+([A-Za-z0-9]+)',
-        r'van\s*3\s*id[:\s]+([A-Za-z0-9]+)',
-        r'van\s*4\s*id[:\s]+([A-Za-z0-9]+)',
-        r'v(\d+)',
-    ]
-
-    # Extract individual van IDs
-    van_ids = []
-    for i, pattern in enumerate(van_id_patterns[:4]):  # First 4 patterns for specific vans
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            if i == 0:
-                data['van1Id'] = match.group(1).strip()
-            elif i == 1:
-                data['van2Id'] = match.group(1).strip()
-            elif i == 2:
-                data['van3Id'] = match.group(1).strip()
-            elif i == 3:
-                data['van4Id'] = match.group(1).strip()
-
-    # Generic van ID extraction
-    van_id_matches = re.findall(r'v(\d+)', text, re.IGNORECASE)
-    if van_id_matches and len(van_id_matches) >= 4:
-        data['van1Id'] = f'V{van_id_matches[0]}'
-        data['van2Id'] = f'V{van_id_matches[1]}'
-        data['van3Id'] = f'V{van_id_matches[2]}'
-        data['van4Id'] = f'V{van_id_matches[3]}'
-
-    # Zone allocation patterns
-    zone_patterns = [
-        r'zone\s*a[:\s]+(\d+)',
-        r'zone\s*b[:\s]+(\d+)',
-        r'zone\s*c[:\s]+(\d+)',
-    ]
-
-    for i, pattern in enumerate(zone_patterns):
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            if i == 0:
-                data['zoneA'] = match.group(1).strip()
-            elif i == 1:
-                data['zoneB'] = match.group(1).strip()
-            elif i == 2:
-                data['zoneC'] = match.group(1).strip()
-
-    # Loading target patterns - enhanced with more variations
-    brv_patterns = [
-        r'brv\s*terminal[:\s]+(\d+)',
-        r'brv\s*total\s*vehicles?[:\s]+(\d+)',
-        r'brv[:\s]+(\d+)',
-        r'brunswick\s*terminal[:\s]+(\d+)'
-    ]
-
-    for pattern in brv_patterns:
-        matches = re.findall(pattern, clean_text, re.IGNORECASE)
-        if matches:
-            numbers = [int(match) for match in matches if match.isdigit()]
-            if numbers:
-                data['brvTarget'] = max(numbers)
-                break
-
-    zee_patterns = [
-        r'zee\s*compound[:\s]+(\d+)',
-        r'zee\s*total\s*vehicles?[:\s]+(\d+)',
-        r'zee[:\s]+(\d+)',
-        r'zee\s*facility[:\s]+(\d+)'
-    ]
-
-    for pattern in zee_patterns:
-        matches = re.findall(pattern, clean_text, re.IGNORECASE)
-        if matches:
-            numbers = [int(match) for match in matches if match.isdigit()]
-            if numbers:
-                data['zeeTarget'] = max(numbers)
-                break
-
-    sou_patterns = [
-        r'sou\s*facility[:\s]+(\d+)',
-        r'sou\s*total\s*vehicles?[:\s]+(\d+)',
-        r'sou[:\s]+(\d+)',
-        r'southern\s*facility[:\s]+(\d+)'
-    ]
-
-    for pattern in sou_patterns:
-        matches = re.findall(pattern, clean_text, re.IGNORECASE)
-        if matches:
-            numbers = [int(match) for match in matches if match.isdigit()]
-            if numbers:
-                data['souTarget'] = max(numbers)
-                break
-
-    # Vehicle brand patterns (additional brands)
-    brand_patterns = [
-        r'audi[:\s]+(\d+)',
-        r'porsche[:\s]+(\d+)',
-        r'mini[:\s]+(\d+)',
-        r'jaguar[:\s]+(\d+)',
-    ]
-
-    for i, pattern in enumerate(brand_patterns):
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            if i == 0:
-                data['audi'] = match.group(1).strip()
-            elif i == 1:
-                data['porsche'] = match.group(1).strip()
-            elif i == 2:
-                data['mini'] = match.group(1).strip()
-            elif i == 3:
-                data['jaguar'] = match.group(1).strip()
-
-    # Additional cargo fields
-    electric_patterns = [
-        r'electric\s*vehicles?[:\s]+(\d+)',
-        r'ev[:\s]+(\d+)',
-        r'(\d+)\s*electric\s*vehicles?'
-    ]
-
-    for pattern in electric_patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            data['electricVehicles'] = match.group(1).strip()
-            break
-
-    # ZEE Compound specific patterns
-    zee_auto_patterns = [
-        r'zee\s*automobiles?[:\s]+(\d+)',
-        r'zee\s*compound\s*automobiles?[:\s]+(\d+)',
-        r'zee.*automobiles?[:\s]+(\d+)'
-    ]
-
-    for pattern in zee_auto_patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            data['zeeAutomobiles'] = match.group(1).strip()
-            break
-
-    zee_heavy_patterns = [
-        r'zee\s*heavy\s*equipment[:\s]+(\d+)',
-        r'zee\s*compound\s*heavy[:\s]+(\d+)',
-        r'zee.*heavy.*equipment[:\s]+(\d+)'
-    ]
-
-    for pattern in zee_heavy_patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            data['zeeHeavyEquipment'] = match.group(1).strip()
-            break
-
-    zee_electric_patterns = [
-        r'zee\s*electric\s*vehicles?[:\s]+(\d+)',
-        r'zee\s*compound\s*electric[:\s]+(\d+)',
-        r'zee.*electric.*vehicles?[:\s]+(\d+)'
-    ]
-
-    for pattern in zee_electric_patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            data['zeeElectricVehicles'] = match.group(1).strip()
-            break
-
-    zee_static_patterns = [
-        r'zee\s*static\s*cargo[:\s]+(\d+)',
-        r'zee\s*compound\s*static[:\s]+(\d+)',
-        r'zee.*static.*cargo[:\s]+(\d+)'
-    ]
-
-    for pattern in zee_static_patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            data['zeeStaticCargo'] = match.group(1).strip()
-            break
-
-    zee_cargo_type_patterns = [
-        r'zee\s*cargo\s*type[:\s]+([A-Za-z\s\-]+)',
-        r'zee\s*compound\s*cargo[:\s]+([A-Za-z\s\-]+)',
-        r'zee.*cargo.*type[:\s]+([A-Za-z\s\-]+)'
-    ]
-
-    for pattern in zee_cargo_type_patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            data['zeeCargoType'] = match.group(1).strip()
-            break
-
-    zee_value_patterns = [
-        r'zee\s*cargo\s*value[:\s]+(\d+)',
-        r'zee\s*compound\s*value[:\s]+(\d+)',
-        r'zee.*value[:\s]+(\d+)'
-    ]
-
-    for pattern in zee_value_patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            data['zeeCargoValue'] = match.group(1).strip()
-            break
-
-    zee_priority_patterns = [
-        r'zee\s*priority[:\s]+([A-Za-z\s]+)',
-        r'zee\s*compound\s*priority[:\s]+([A-Za-z\s]+)',
-        r'zee.*priority[:\s]+([A-Za-z\s]+)'
-    ]
-
-    for pattern in zee_priority_patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            priority = match.group(1).strip().lower()
-            if 'high' in priority:
-                data['zeePriority'] = 'high'
-            elif 'urgent' in priority:
-                data['zeePriority'] = 'urgent'
-            elif 'express' in priority:
-                data['zeePriority'] = 'express'
-            else:
-                data['zeePriority'] = 'standard'
-            break
-
-    static_cargo_patterns = [
-        r'static\s*cargo[:\s]+(\d+)',
-        r'static\s*cargo\s*units?[:\s]+(\d+)',
-        r'(\d+)\s*static\s*cargo'
-    ]
-
-    for pattern in static_cargo_patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            data['staticCargo'] = match.group(1).strip()
-            break
-
-    cargo_type_patterns = [
-        r'cargo\s*brand[/\s]*type[:\s]+([A-Za-z\s\-]+)',
-        r'cargo\s*type[:\s]+([A-Za-z\s\-]+)',
-        r'brand[/\s]*type[:\s]+([A-Za-z\s\-]+)'
-    ]
-
-    for pattern in cargo_type_patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            data['cargoType'] = match.group(1).strip()
-            break
-
-    # Zone description patterns
-    zone_desc_patterns = [
-        r'zone\s*a[:\s]*description[:\s]+([A-Za-z\s\-]+)',
-        r'zone\s*b[:\s]*description[:\s]+([A-Za-z\s\-]+)',
-        r'zone\s*c[:\s]*description[:\s]+([A-Za-z\s\-]+)',
-    ]
-
-    for i, pattern in enumerate(zone_desc_patterns):
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            if i == 0:
-                data['zoneADescription'] = match.group(1).strip()
-            elif i == 1:
-                data['zoneBDescription'] = match.group(1).strip()
-            elif i == 2:
-                data['zoneCDescription'] = match.group(1).strip()
-
-    # TICO Transportation vehicle counts
-    van_count_patterns = [
-        r'number\s*of\s*vans[:\s]+(\d+)',
-        r'vans?[:\s]+(\d+)',
-        r'(\d+)\s*vans?'
-    ]
-
-    for pattern in van_count_patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            data['numVans'] = match.group(1).strip()
-            break
-
-    wagon_count_patterns = [
-        r'number\s*of\s*station\s*wagons?[:\s]+(\d+)',
-        r'station\s*wagons?[:\s]+(\d+)',
-        r'(\d+)\s*station\s*wagons?'
-    ]
-
-    for pattern in wagon_count_patterns:
-        match = re.search(pattern, text, re.IGNORECASE)
-        if match:
-            data['numStationWagons'] = match.group(1).strip()
-            break
-
-    # Individual vehicle ID extraction (up to 15 vans and 15 wagons)
-    for i in range(1, 16):
-        van_id_pattern = rf'van\s*{i}\s*id[:\s]+([A-Za-z0-9]+)'
-        match = re.search(van_id_pattern, text, re.IGNORECASE)
-        if match:
-            data[f'vanId{i}'] = match.group(1).strip()
-
-    for i in range(1, 16):
-        wagon_id_pattern = rf'(?:station\s*wagon|wagon)\s*{i}\s*id[:\s]+([A-Za-z0-9]+)'
-        match = re.search(wagon_id_pattern, text, re.IGNORECASE)
-        if match:
-            data[f'wagonId{i}'] = match.group(1).strip()
-
-    return data
+    Documents in one of the wizard's known layouts have their labelled
+    fields read line by line (see src/extraction/templates.py). With stats
+    (a dict), per-field timings and pattern statistics are stored in it.
+    """
+    with timer('parse_maritime_data'):
+        return extract_document_fields(text, clean_text=clean_text, stats=stats)
 
 @file_processor_bp.route('/api/upload', methods=['POST'])
 def upload_file():
@@ -843,6 +142,106 @@ def upload_file():
         'file_size': os.path.getsize(file_path)
     })
 
+def pdf_options():
+    """read_pdf keyword arguments from the app config"""
+    return {
+        'workers': current_app.config.get('PDF_WORKERS', 0),
+        'page_timeout': current_app.config.get('PDF_PAGE_TIMEOUT'),
+        'document_timeout': current_app.config.get('PDF_DOCUMENT_TIMEOUT'),
+        'page_cache': page_cache
+    }
+
+def extract_uncached(source, file_extension, options):
+    """Read and parse a file path or binary stream, with read_pdf options for PDFs.
+
+    Returns (result, complete, field_stats): result holds the /api/extract
+    response fields other than success, complete is False when reading
+    failed or the reading or a pattern was cut short by a time budget, so
+    the result should not be cached, and field_stats is the per-field parse statistics.
+    """
+    clean_text = None
+    pdf_pages = None
+    if file_extension == 'pdf':
+        try:
+            with timer('pdf_extraction'):
+                pdf = read_pdf(source, **options)
+            text, clean_text = pdf['text'], pdf['clean_text']
+            pdf_pages = {key: pdf[key] for key in ('pages_read', 'pages_cached', 'total_pages', 'timed_out_pages', 'truncated')}
+        except Exception as e:
+            text = f"Error reading PDF: {str(e)}"
+    elif file_extension == 'csv':
+        text = extract_data_from_csv(source)
+    else:
+        text = decode_text(read_source(source), 'utf-8')
+
+    print(f"Extracted text length: {len(text)}")
+    print(f"First 500 characters: {text[:500]}")
+
+    # Parse maritime-specific data
+    field_stats = {}
+    extracted_data = parse_maritime_data(text, clean_text, field_stats)
+
+    print(f"Extracted data: {extracted_data}")
+
+    # Fields a pattern of which ran out of its time budget: their values depend on how busy the machine was
+    exhausted_fields = sorted(name for name, stats in field_stats.items() if stats['patterns_exhausted'])
+
+    debug_info = {
+        'text_length': len(text),
+        'first_200_chars': text[:200],
+        'patterns_found': len(extracted_data),
+        'exhausted_fields': exhausted_fields
+    }
+    if pdf_pages:
+        debug_info.update(pdf_pages)
+    result = {
+        'extracted_text': text[:1000] + '...' if len(text) > 1000 else text,  # Truncate for preview
+        'parsed_data': extracted_data,
+        'debug_info': debug_info
+    }
+    complete = not exhausted_fields and not (pdf_pages and (pdf_pages['timed_out_pages'] or pdf_pages['truncated']))
+    return result, complete and not text.startswith('Error'), field_stats
+
+def extract_bytes(data, file_extension, options):
+    """extract_uncached for a document's bytes; runs in batch worker processes"""
+    return extract_uncached(io.BytesIO(data), file_extension, options)
+
+def field_stats_requested():
+    """Whether the request asks for per-field statistics in debug_info (?field_stats=1)"""
+    return request.args.get('field_stats', '').lower() in ('1', 'true', 'yes')
+
+def cached_result(cache_key):
+    """A cached extraction result for the response, or None"""
+    cached, cache_source = extract_cache.get(cache_key)
+    if cached:
+        return dict(cached, debug_info=dict(cached['debug_info'], cache=cache_source))
+    return None
+
+def finish_extraction(cache_key, result, complete, field_stats, with_field_stats):
+    """Record a fresh extraction in the field statistics and cache; returns it for the response"""
+    FIELD_STATS.add(field_stats)
+    # Results cut short by a failed read or a time budget are not kept
+    if complete:
+        extract_cache.put(cache_key, result)
+    debug_info = dict(result['debug_info'], cache='miss')
+    if with_field_stats:
+        debug_info['field_stats'] = field_stats
+    return dict(result, debug_info=debug_info)
+
+def extract_document(source, file_extension, digest, with_field_stats=False):
+    """Extract maritime data from a file path or binary stream whose content hash is digest.
+
+    Repeat documents are answered from the cache, unless with_field_stats
+    asks for a fresh parse with per-field statistics in debug_info.
+    Returns the /api/extract response fields other than success.
+    """
+    cache_key = extract_cache.key(digest, file_extension)
+    cached = None if with_field_stats else cached_result(cache_key)
+    if cached:
+        return cached
+    result, complete, field_stats = extract_uncached(source, file_extension, pdf_options())
+    return finish_extraction(cache_key, result, complete, field_stats, with_field_stats)
+
 @file_processor_bp.route('/api/extract', methods=['POST'])
 def extract_data():
     """Extract data from uploaded file"""
@@ -854,44 +253,217 @@ def extract_data():
 
     # Determine file type and extract text
     file_extension = file_path.split('.')[-1].lower()
+    if file_extension not in ALLOWED_EXTENSIONS:
+        return jsonify({'error': 'Unsupported file type. Please use PDF, CSV, or TXT files.'}), 400
 
     try:
-        if file_extension == 'pdf':
-            text = extract_text_from_pdf(file_path)
-        elif file_extension == 'csv':
-            text = extract_data_from_csv(file_path)
-        elif file_extension == 'txt':
-            with open(file_path, 'r', encoding='utf-8') as f:
-                text = f.read()
-        else:
-            return jsonify({'error': 'Unsupported file type. Please use PDF, CSV, or TXT files.'}), 400
-
-        print(f"Extracted text length: {len(text)}")
-        print(f"First 500 characters: {text[:500]}")
-
-        # Parse maritime-specific data
-        extracted_data = parse_maritime_data(text)
-        
-        print(f"Extracted data: {extracted_data}")
+        result = extract_document(file_path, file_extension, file_digest(file_path), field_stats_requested())
 
         # Clean up uploaded file
         os.remove(file_path)
 
-        return jsonify({
-            'success': True,
-            'extracted_text': text[:1000] + '...' if len(text) > 1000 else text,  # Truncate for preview
-            'parsed_data': extracted_data,
-            'debug_info': {
-                'text_length': len(text),
-                'first_200_chars': text[:200],
-                'patterns_found': len(extracted_data)
-            }
-        })
+        return jsonify(dict(result, success=True))
 
     except Exception as e:
         print(f"Extraction error: {str(e)}")
         return jsonify({'error': f'Error processing file: {str(e)}'}), 500
 
+def request_upload():
+    """The request's 'file' upload and an error message (one of them None)"""
+    if 'file' not in request.files:
+        return None, 'No file provided'
+    file = request.files['file']
+    if file.filename == '':
+        return None, 'No file selected'
+    if not allowed_file(file.filename):
+        return None, 'File type not supported'
+    return file, None
+
+@file_processor_bp.route('/api/extract/upload', methods=['POST'])
+def upload_and_extract():
+    """Extract data from a file sent with the request, without saving it to uploads/"""
+    file, error = request_upload()
+    if error:
+        return jsonify({'error': error}), 400
+
+    # The upload is already spooled (in memory, or a temp file when large);
+    # one pass over it both hashes it and checks the size limit
+    digest, file_size = stream_digest(file.stream, MAX_FILE_SIZE)
+    if file_size > MAX_FILE_SIZE:
+        return jsonify({'error': f'File size exceeds {MAX_FILE_SIZE // (1024*1024)}MB limit'}), 400
+
+    try:
+        file_extension = file.filename.rsplit('.', 1)[1].lower()
+        result = extract_document(file.stream, file_extension, digest, field_stats_requested())
+        return jsonify(dict(result, success=True, filename=secure_filename(file.filename), file_size=file_size))
+
+    except Exception as e:
+        print(f"Extraction error: {str(e)}")
+        return jsonify({'error': f'Error processing file: {str(e)}'}), 500
+
+@file_processor_bp.route('/api/extract/jobs', methods=['POST'])
+def submit_extract_job():
+    """Queue an extraction and return its job at once.
+
+    Takes a multipart 'file' like /api/extract/upload, or a JSON file_path
+    from /api/upload like /api/extract. Answers 429 while the job queue is
+    full.
+    """
+    app = current_app._get_current_object()
+    if request.files:
+        file, error = request_upload()
+        if error:
+            return jsonify({'error': error}), 400
+        # The request's upload buffer goes away with the request, so the job gets its own copy
+        buffer = tempfile.SpooledTemporaryFile(max_size=JOB_SPOOL_BYTES)
+        digest, file_size = stream_digest(file.stream, MAX_FILE_SIZE, copy_to=buffer)
+        if file_size > MAX_FILE_SIZE:
+            buffer.close()
+            return jsonify({'error': f'File size exceeds {MAX_FILE_SIZE // (1024*1024)}MB limit'}), 400
+        source, filename, cleanup = buffer, secure_filename(file.filename), buffer.close
+        file_extension = file.filename.rsplit('.', 1)[1].lower()
+    else:
+        data = request.get_json(silent=True) or {}
+        file_path = data.get('file_path')
+        if not file_path or not os.path.exists(file_path):
+            return jsonify({'error': 'File not found'}), 404
+        file_extension = file_path.split('.')[-1].lower()
+        if file_extension not in ALLOWED_EXTENSIONS:
+            return jsonify({'error': 'Unsupported file type. Please use PDF, CSV, or TXT files.'}), 400
+        digest = None
+        source, filename = file_path, os.path.basename(file_path)
+
+        def cleanup():
+            if os.path.exists(file_path):
+                os.remove(file_path)
+
+    with_field_stats = field_stats_requested()
+
+    def work():
+        try:
+            with app.app_context():
+                # Hashing a saved file is left to the job too
+                return extract_document(source, file_extension, digest or file_digest(source), with_field_stats)
+        finally:
+            cleanup()
+
+    job = extract_jobs.submit(work, filename=filename)
+    if job is None:
+        cleanup()
+        response = jsonify({'error': 'Too many extractions in progress, please retry shortly'})
+        response.headers['Retry-After'] = '5'
+        return response, 429
+    response = jsonify({'success': True, 'job': job})
+    response.headers['Location'] = f"/api/extract/jobs/{job['id']}"
+    return response, 202
+
+@file_processor_bp.route('/api/extract/jobs/<job_id>', methods=['GET'])
+def get_extract_job(job_id):
+    """An extraction job's status, with its result once done.
+
+    With ?wait=<seconds> the request is held until the job finishes (at
+    most JOB_MAX_WAIT_SECONDS), saving the client repeated polls.
+    """
+    try:
+        wait = min(float(request.args.get('wait', 0)), JOB_MAX_WAIT_SECONDS)
+    except ValueError:
+        return jsonify({'error': 'wait must be a number of seconds'}), 400
+    job = extract_jobs.wait(job_id, wait) if wait > 0 else extract_jobs.get(job_id)
+    if job is None:
+        return jsonify({'error': 'Job not found'}), 404
+    return jsonify({'success': True, 'job': job})
+
+def merge_parsed_data(files):
+    """One view of the fields found across a batch, in upload order.
+
+    Each field takes its value from the first file that has it; sources
+    names that file, and conflicts lists every file's value for fields the
+    files disagree on.
+    """
+    merged = {}
+    sources = {}
+    conflicts = {}
+    for entry in files:
+        if not entry['success']:
+            continue
+        source = {'index': entry['index'], 'filename': entry['filename']}
+        for field, value in entry['parsed_data'].items():
+            if field not in merged:
+                merged[field] = value
+                sources[field] = source
+            elif value != merged[field]:
+                if field not in conflicts:
+                    conflicts[field] = [dict(sources[field], value=merged[field])]
+                conflicts[field].append(dict(source, value=value))
+    return {'parsed_data': merged, 'sources': sources, 'conflicts': conflicts}
+
+@file_processor_bp.route('/api/extract/batch', methods=['POST'])
+def extract_batch():
+    """Extract several files sent in one multipart request ('files' fields).
+
+    Documents not already cached are extracted concurrently by a pool of
+    worker processes. Returns each file's result (or error) plus a merged
+    view with the file each field came from.
+    """
+    uploads = request.files.getlist('files')
+    if not uploads:
+        return jsonify({'error': 'No files provided'}), 400
+    if len(uploads) > MAX_BATCH_FILES:
+        return jsonify({'error': f'At most {MAX_BATCH_FILES} files per batch'}), 400
+
+    with_field_stats = field_stats_requested()
+    files = []
+    pending = []
+    for index, file in enumerate(uploads):
+        entry = {'index': index, 'filename': secure_filename(file.filename)}
+        files.append(entry)
+        if not allowed_file(file.filename):
+            entry.update(success=False, error='File type not supported')
+            continue
+        data = file.read()
+        if len(data) > MAX_FILE_SIZE:
+            entry.update(success=False, error=f'File size exceeds {MAX_FILE_SIZE // (1024*1024)}MB limit')
+            continue
+        file_extension = file.filename.rsplit('.', 1)[1].lower()
+        cache_key = extract_cache.key(hashlib.sha256(data).hexdigest(), file_extension)
+        cached = None if with_field_stats else cached_result(cache_key)
+        if cached:
+            entry.update(cached, success=True)
+        else:
+            pending.append((entry, cache_key, data, file_extension))
+
+    # Whole documents go to separate processes, so their pages are read serially there
+    options = dict(pdf_options(), workers=0)
+    pool = get_pool('batch') if len(pending) > 1 else None
+    if pool:
+        runs = [pool.submit(extract_bytes, data, file_extension, options) for _, _, data, file_extension in pending]
+    for position, (entry, cache_key, data, file_extension) in enumerate(pending):
+        try:
+            if pool:
+                result, complete, field_stats = runs[position].result()
+            else:
+                result, complete, field_stats = extract_bytes(data, file_extension, options)
+        except Exception as e:
+            if isinstance(e, BrokenProcessPool):
+                discard_pool('batch', pool)
+            print(f"Extraction error in {entry['filename']}: {str(e)}")
+            entry.update(success=False, error=f'Error processing file: {str(e)}')
+            continue
+        entry.update(finish_extraction(cache_key, result, complete, field_stats, with_field_stats), success=True)
+
+    return jsonify({'success': True, 'files': files, 'merged': merge_parsed_data(files)})
+
+@file_processor_bp.route('/api/extract/stats', methods=['GET'])
+def get_field_stats():
+    """Per-field extraction statistics summed over this worker process's extractions, slowest first"""
+    return jsonify(dict(FIELD_STATS.snapshot(), success=True))
+
+@file_processor_bp.route('/api/extract/stats', methods=['DELETE'])
+def reset_field_stats():
+    """Start the per-field statistics over"""
+    FIELD_STATS.reset()
+    return jsonify({'success': True})
+
 @file_processor_bp.route('/api/health', methods=['GET'])
 def health_check():
     """Health check endpoint"""
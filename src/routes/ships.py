@@ -1,80 +1,197 @@
-from flask import Blueprint, request, jsonify
+from flask import Blueprint, Response, current_app, request, jsonify, stream_with_context
+import csv
 import json
+import math
 import os
+import time
 from datetime import datetime, timedelta
+from src.extraction.csv_rows import column_lookup, iter_csv_records
+from src.metrics import timer
+from src.models.ship import SHIP_FIELDS, Ship, column_name
+from src.models.user import db
+from src.models.ship_store import ShipStore, SqlShipStore
 
 ships_bp = Blueprint('ships', __name__)
 
-# In-memory storage for demo (in production, use a proper database)
-ships_data = []
+# Change stream timing: idle comment interval, stream lifetime before the client
+# reconnects (freeing the worker), and the client reconnect delay in milliseconds
+STREAM_KEEPALIVE_SECONDS = 15
+STREAM_MAX_SECONDS = 300
+STREAM_RETRY_MS = 2000
+
+# Largest page GET /api/ships returns when paginating
+MAX_PAGE_SIZE = 500
+# Most ship rows one POST /api/ships/import may create
+MAX_IMPORT_ROWS = 1000
+# Ship fields stored as numbers: request values for them must be numbers (or null), CSV cells are converted
+NUMERIC_FIELDS = {field for field in SHIP_FIELDS
+                  if field != 'id' and isinstance(Ship.__table__.c[column_name(field)].type, (db.Integer, db.Float))}
+# List query parameters that select a subset of ships, and the ship field each filters
+FILTER_PARAMS = {'status': 'status', 'berth': 'berth', 'port': 'port'}
+
+# Ships storage backend: indexed in-memory ships persisted through an append-only
+# journal by default, or the Ship table when SHIPS_BACKEND is 'sqlite'
 ships_file = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(__file__))), 'database', 'ships.json')
+store = ShipStore(ships_file)
 
 def load_ships():
-    """Load ships data from file"""
-    global ships_data
+    """Load ships data from the configured backend"""
     try:
-        if os.path.exists(ships_file):
-            with open(ships_file, 'r') as f:
-                ships_data = json.load(f)
+        with timer('load_ships'):
+            store.load()
     except Exception as e:
         print(f"Error loading ships data: {e}")
-        ships_data = []
 
-def save_ships():
-    """Save ships data to file"""
-    global ships_data
-    try:
-        # Ensure the directory exists
-        db_dir = os.path.dirname(ships_file)
-        os.makedirs(db_dir, exist_ok=True)
-        
-        with open(ships_file, 'w') as f:
-            json.dump(ships_data, f, indent=2)
-    except Exception as e:
-        print(f"Error saving ships data: {e}")
-        # Create empty ships data if save fails
-        ships_data = []
+def init_ships_store(app):
+    """Select the ships backend from the app config and load it (call inside an app context)"""
+    global store
+    if app.config.get('SHIPS_BACKEND') == 'sqlite':
+        # The JSON store is only read to seed an empty table
+        store = SqlShipStore(import_path=ships_file)
+    else:
+        store = ShipStore(ships_file)
+    load_ships()
+
+def versioned_response(build):
+    """Answer a conditional GET with 304 while the ships data version is unchanged.
+
+    Otherwise build() produces the response, tagged with the version as its
+    ETag and in the X-Ships-Version header for delta sync.
+    """
+    version = store.current_version()
+    etag = f'ships-{version}'
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = build()
+    response.set_etag(etag)
+    response.headers['X-Ships-Version'] = str(version)
+    return response
 
-# Load ships data on module import
-load_ships()
+def parse_list_query(args):
+    """Read the filter, pagination and projection parameters of GET /api/ships.
+
+    Returns (page arguments for store.page, fields to keep or None, whether
+    the response is paginated, error message).
+    """
+    criteria = {}
+    for param, field in FILTER_PARAMS.items():
+        if args.get(param):
+            criteria[field] = args.get(param).split(',')
+    
+    page_args = {'criteria': criteria}
+    try:
+        for param, key in (('from', 'start_date'), ('to', 'end_date')):
+            if args.get(param):
+                page_args[key] = datetime.strptime(args.get(param), '%Y-%m-%d').date()
+    except ValueError:
+        return None, None, False, 'from and to must be dates in YYYY-MM-DD format'
+    
+    paginated = 'limit' in args or 'cursor' in args
+    if paginated:
+        try:
+            page_args['limit'] = int(args.get('limit', 100))
+            page_args['after_id'] = int(args.get('cursor', 0))
+        except ValueError:
+            return None, None, False, 'limit and cursor must be integers'
+        if not 1 <= page_args['limit'] <= MAX_PAGE_SIZE:
+            return None, None, False, f'limit must be between 1 and {MAX_PAGE_SIZE}'
+    
+    fields = None
+    if args.get('fields'):
+        fields = args.get('fields').split(',')
+        unknown = [field for field in fields if field not in SHIP_FIELDS]
+        if unknown:
+            return None, None, False, f'Unknown fields: {", ".join(unknown)}'
+    
+    return page_args, fields, paginated, None
 
 @ships_bp.route('/api/ships', methods=['GET'])
 def get_ships():
-    """Get all ships"""
-    return jsonify(ships_data)
+    """Get all ships, or with ?since=<version> only the ships changed or deleted after that version.
+
+    Without since the list can be narrowed with status, berth and port
+    (comma-separated values) and from/to operation dates, paginated with
+    limit and cursor (the previous page's nextCursor), and projected with
+    fields=id,vesselName,...
+    """
+    since = request.args.get('since')
+    if since is None:
+        page_args, fields, paginated, error = parse_list_query(request.args)
+        if error:
+            return jsonify({'error': error}), 400
+        
+        def build_list():
+            ships, next_cursor = store.page(**page_args)
+            if fields:
+                ships = [{field: ship.get(field) for field in fields} for ship in ships]
+            if paginated:
+                return jsonify({'ships': ships, 'nextCursor': next_cursor})
+            return jsonify(ships)
+        
+        return versioned_response(build_list)
+    
+    try:
+        since = int(since)
+    except ValueError:
+        return jsonify({'error': 'since must be an integer version'}), 400
+    
+    def build_delta():
+        version = store.current_version()
+        changes = store.changes_since(since)
+        if changes is None:
+            # Too old to answer as a delta: the client replaces its list
+            return jsonify({'version': version, 'full': True, 'ships': store.all(), 'deleted': []})
+        changed, deleted = changes
+        return jsonify({'version': version, 'full': False, 'ships': changed, 'deleted': deleted})
+    
+    return versioned_response(build_delta)
 
 @ships_bp.route('/api/ships/<int:ship_id>', methods=['GET'])
 def get_ship(ship_id):
     """Get a specific ship"""
-    ship = next((s for s in ships_data if s['id'] == ship_id), None)
-    if ship:
-        return jsonify(ship)
-    return jsonify({'error': 'Ship not found'}), 404
+    def build():
+        ship = store.get(ship_id)
+        if ship:
+            return jsonify(ship)
+        response = jsonify({'error': 'Ship not found'})
+        response.status_code = 404
+        return response
+    
+    return versioned_response(build)
 
-@ships_bp.route('/api/ships', methods=['POST'])
-def create_ship():
-    """Create a new ship operation"""
-    data = request.get_json()
-    
+def number_error(data):
+    """Error message for the first numeric field holding something other than a number or null, or None"""
+    for field, value in data.items():
+        if field not in NUMERIC_FIELDS or value is None:
+            continue
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or not math.isfinite(value):
+            return f'{field} must be a number, got {value!r}'
+    return None
+
+def new_ship_fields(data):
+    """Validate a create request body; returns (ship fields, error message)"""
     if not data:
-        return jsonify({'error': 'No data provided'}), 400
+        return None, 'No data provided'
     
-    # Generate new ID
-    new_id = max([s['id'] for s in ships_data], default=0) + 1
+    error = number_error(data)
+    if error:
+        return None, error
+    # A null number was left blank and gets its default
+    data = {field: value for field, value in data.items() if value is not None or field not in NUMERIC_FIELDS}
     
     # Validate required fields
     vessel_name = data.get('vesselName', '').strip()
     if not vessel_name:
-        return jsonify({'error': 'Vessel name is required'}), 400
+        return None, 'Vessel name is required'
     
     # Set default date if not provided
     operation_date = data.get('operationDate')
     if not operation_date:
         operation_date = datetime.now().strftime('%Y-%m-%d')
     
-    # Create ship record with proper defaults
-    ship = {
-        'id': new_id,
+    # Create ship record with proper defaults; the store assigns the ID
+    return {
         'vesselName': vessel_name,
         'vesselType': data.get('vesselType', 'Auto Only'),
         'shippingLine': data.get('shippingLine', 'Unknown'),
@@ -110,127 +227,279 @@ def create_ship():
         'startTime': data.get('shiftStart', '07:00'),
         'estimatedCompletion': data.get('targetCompletion', data.get('shiftEnd', '15:00')),
         'updatedAt': datetime.now().isoformat()
-    }
+    }, None
+
+def field_changes(ship, data):
+    """Validate an update request body against the ship; returns (changes, error message)"""
+    if not data:
+        return None, 'No data provided'
     
-    ships_data.append(ship)
-    save_ships()
+    error = number_error(data)
+    if error:
+        return None, error
+    
+    # Update ship data (the ID is the index key and cannot be changed)
+    changes = {key: value for key, value in data.items() if key in ship and key != 'id'}
+    changes['updatedAt'] = datetime.now().isoformat()
+    return changes, None
+
+def progress_changes(data):
+    """Validate a progress request body; returns (changes, error message)"""
+    if not data or 'progress' not in data:
+        return None, 'Progress value required'
+    
+    progress = data['progress']
+    if not isinstance(progress, (int, float)) or progress < 0 or progress > 100:
+        return None, 'Progress must be a number between 0 and 100'
+    
+    changes = {'progress': progress}
+    
+    # Update status based on progress
+    if progress >= 100:
+        changes['status'] = 'complete'
+    elif progress > 0:
+        changes['status'] = 'active'
+    
+    changes['updatedAt'] = datetime.now().isoformat()
+    return changes, None
+
+def status_changes(data):
+    """Validate a status request body; returns (changes, error message)"""
+    if not data or 'status' not in data:
+        return None, 'Status value required'
+    
+    valid_statuses = ['active', 'loading', 'discharge', 'complete', 'paused']
+    status = data['status']
+    
+    if status not in valid_statuses:
+        return None, f'Status must be one of: {", ".join(valid_statuses)}'
+    
+    return {'status': status, 'updatedAt': datetime.now().isoformat()}, None
+
+@ships_bp.route('/api/ships', methods=['POST'])
+def create_ship():
+    """Create a new ship operation"""
+    fields, error = new_ship_fields(request.get_json())
+    if error:
+        return jsonify({'error': error}), 400
+    
+    ship = store.create(fields)
     
     return jsonify(ship), 201
 
 @ships_bp.route('/api/ships/<int:ship_id>', methods=['PUT'])
 def update_ship(ship_id):
     """Update a ship operation"""
-    ship = next((s for s in ships_data if s['id'] == ship_id), None)
+    ship = store.get(ship_id)
     if not ship:
         return jsonify({'error': 'Ship not found'}), 404
     
-    data = request.get_json()
-    if not data:
-        return jsonify({'error': 'No data provided'}), 400
-    
-    # Update ship data
-    for key, value in data.items():
-        if key in ship:
-            ship[key] = value
+    changes, error = field_changes(ship, request.get_json())
+    if error:
+        return jsonify({'error': error}), 400
     
-    ship['updatedAt'] = datetime.now().isoformat()
-    save_ships()
+    ship = store.update(ship_id, changes)
     
     return jsonify(ship)
 
 @ships_bp.route('/api/ships/<int:ship_id>/progress', methods=['PUT'])
 def update_ship_progress(ship_id):
     """Update ship operation progress"""
-    ship = next((s for s in ships_data if s['id'] == ship_id), None)
+    ship = store.get(ship_id)
     if not ship:
         return jsonify({'error': 'Ship not found'}), 404
     
-    data = request.get_json()
-    if not data or 'progress' not in data:
-        return jsonify({'error': 'Progress value required'}), 400
-    
-    progress = data['progress']
-    if not isinstance(progress, (int, float)) or progress < 0 or progress > 100:
-        return jsonify({'error': 'Progress must be a number between 0 and 100'}), 400
-    
-    ship['progress'] = progress
-    
-    # Update status based on progress
-    if progress >= 100:
-        ship['status'] = 'complete'
-    elif progress > 0:
-        ship['status'] = 'active'
+    changes, error = progress_changes(request.get_json())
+    if error:
+        return jsonify({'error': error}), 400
     
-    ship['updatedAt'] = datetime.now().isoformat()
-    save_ships()
+    ship = store.update(ship_id, changes, event='progress')
     
     return jsonify(ship)
 
 @ships_bp.route('/api/ships/<int:ship_id>/status', methods=['PUT'])
 def update_ship_status(ship_id):
     """Update ship operation status"""
-    ship = next((s for s in ships_data if s['id'] == ship_id), None)
+    ship = store.get(ship_id)
     if not ship:
         return jsonify({'error': 'Ship not found'}), 404
     
-    data = request.get_json()
-    if not data or 'status' not in data:
-        return jsonify({'error': 'Status value required'}), 400
-    
-    valid_statuses = ['active', 'loading', 'discharge', 'complete', 'paused']
-    status = data['status']
-    
-    if status not in valid_statuses:
-        return jsonify({'error': f'Status must be one of: {", ".join(valid_statuses)}'}), 400
+    changes, error = status_changes(request.get_json())
+    if error:
+        return jsonify({'error': error}), 400
     
-    ship['status'] = status
-    ship['updatedAt'] = datetime.now().isoformat()
-    save_ships()
+    ship = store.update(ship_id, changes, event='status')
     
     return jsonify(ship)
 
 @ships_bp.route('/api/ships/<int:ship_id>', methods=['DELETE'])
 def delete_ship(ship_id):
     """Delete a ship operation"""
-    global ships_data
-    ship = next((s for s in ships_data if s['id'] == ship_id), None)
-    if not ship:
+    if not store.delete(ship_id):
         return jsonify({'error': 'Ship not found'}), 404
     
-    ships_data = [s for s in ships_data if s['id'] != ship_id]
-    save_ships()
-    
     return jsonify({'message': 'Ship operation deleted successfully'})
 
+@ships_bp.route('/api/ships/batch', methods=['POST'])
+def batch_ships():
+    """Apply several ship operations in one request, all or nothing.
+
+    The body is {"operations": [...]} where each operation has an "op" of
+    create, update, progress, status or delete, the target "id" (except for
+    create) and the "data" body the single-ship endpoint would take. They are
+    validated with the same rules, applied in order and written once.
+    """
+    data = request.get_json()
+    operations = data.get('operations') if isinstance(data, dict) else None
+    if not isinstance(operations, list) or not operations:
+        return jsonify({'error': 'A non-empty operations list is required'}), 400
+    
+    planned = []
+    deleted = set()
+    for i, operation in enumerate(operations):
+        op = operation.get('op') if isinstance(operation, dict) else None
+        if op == 'create':
+            fields, error = new_ship_fields(operation.get('data'))
+            if error:
+                return jsonify({'error': error, 'index': i}), 400
+            planned.append({'op': 'create', 'fields': fields})
+            continue
+        if op not in ('update', 'progress', 'status', 'delete'):
+            return jsonify({'error': 'op must be one of: create, update, progress, status, delete', 'index': i}), 400
+        
+        ship_id = operation.get('id')
+        if not isinstance(ship_id, int):
+            return jsonify({'error': 'id must be an integer ship id', 'index': i}), 400
+        ship = store.get(ship_id) if ship_id not in deleted else None
+        if not ship:
+            return jsonify({'error': 'Ship not found', 'index': i}), 404
+        if op == 'delete':
+            deleted.add(ship_id)
+            planned.append({'op': 'delete', 'id': ship_id})
+            continue
+        
+        if op == 'update':
+            changes, error = field_changes(ship, operation.get('data'))
+        elif op == 'progress':
+            changes, error = progress_changes(operation.get('data'))
+        else:
+            changes, error = status_changes(operation.get('data'))
+        if error:
+            return jsonify({'error': error, 'index': i}), 400
+        planned.append({'op': 'update', 'id': ship_id, 'changes': changes, 'event': op})
+    
+    results = store.apply(planned)
+    if results is None:
+        # A target was deleted by another request after validation
+        return jsonify({'error': 'Ship not found'}), 409
+    
+    return jsonify({'version': store.current_version(), 'results': results})
+
+def csv_create_body(record):
+    """A CSV record as a create request body, with numeric fields converted; returns (body, error message)"""
+    body = dict(record)
+    for field, value in record.items():
+        if field in NUMERIC_FIELDS:
+            try:
+                number = float(value.replace(',', ''))
+            except ValueError:
+                return None, f'{field} must be a number, got {value!r}'
+            body[field] = int(number) if number.is_integer() else number
+    return body, None
+
+@ships_bp.route('/api/ships/import', methods=['POST'])
+def import_ships():
+    """Create one ship operation per row of an uploaded CSV, all or nothing.
+
+    The header row names the columns, matched to ship fields through the
+    CSV column aliases (unknown columns are ignored); each row is then
+    validated as a POST /api/ships body and the ships are created in one write.
+    """
+    file = request.files.get('file')
+    if not file or not file.filename.lower().endswith('.csv'):
+        return jsonify({'error': 'A CSV file is required'}), 400
+    
+    lookup = column_lookup(current_app.config.get('CSV_COLUMN_ALIASES'))
+    planned = []
+    try:
+        for line, record in iter_csv_records(file.stream, lookup):
+            if len(planned) == MAX_IMPORT_ROWS:
+                return jsonify({'error': f'At most {MAX_IMPORT_ROWS} rows can be imported at once'}), 400
+            body, error = csv_create_body(record)
+            if not error:
+                fields, error = new_ship_fields(body)
+            if error:
+                return jsonify({'error': error, 'line': line}), 400
+            planned.append({'op': 'create', 'fields': fields})
+    except (ValueError, csv.Error) as e:
+        return jsonify({'error': str(e)}), 400
+    if not planned:
+        return jsonify({'error': 'The CSV has no ship rows'}), 400
+    
+    results = store.apply(planned)
+    
+    return jsonify({'version': store.current_version(), 'results': results}), 201
+
+@ships_bp.route('/api/ships/stream', methods=['GET'])
+def stream_ships():
+    """Stream ship changes as Server-Sent Events.
+
+    Each event's id is the ships data version after it, so a reconnecting
+    EventSource resumes from its Last-Event-ID header (or ?lastEventId=).
+    A 'reset' event tells the client the cursor is too old to replay and it
+    should reload the full list.
+    """
+    cursor = request.headers.get('Last-Event-ID') or request.args.get('lastEventId')
+    if cursor is None:
+        cursor = store.current_version()
+    else:
+        try:
+            cursor = int(cursor)
+        except ValueError:
+            return jsonify({'error': 'Last-Event-ID must be an integer version'}), 400
+    
+    def generate(cursor):
+        yield f'retry: {STREAM_RETRY_MS}\n\n'
+        deadline = time.monotonic() + STREAM_MAX_SECONDS
+        while time.monotonic() < deadline:
+            events = store.events_since(cursor)
+            if events is None:
+                cursor = store.current_version()
+                yield f'id: {cursor}\nevent: reset\ndata: {json.dumps({"version": cursor})}\n\n'
+                continue
+            for event in events:
+                cursor = event['seq']
+                data = event['ship'] if event['ship'] is not None else {'id': event['shipId']}
+                yield f'id: {cursor}\nevent: {event["event"]}\ndata: {json.dumps(data)}\n\n'
+            if not store.wait_for_change(cursor, min(STREAM_KEEPALIVE_SECONDS, deadline - time.monotonic())):
+                yield ': keepalive\n\n'
+    
+    response = Response(stream_with_context(generate(cursor)), mimetype='text/event-stream')
+    response.headers['Cache-Control'] = 'no-cache'
+    # Stop nginx from buffering the stream
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
 @ships_bp.route('/api/ships/berths', methods=['GET'])
 def get_berth_status():
     """Get berth occupancy status"""
     berths = {f'Berth {i}': None for i in range(1, 7)}
     
-    for ship in ships_data:
-        if ship['status'] != 'complete' and ship.get('berth'):
-            berths[ship['berth']] = {
-                'shipId': ship['id'],
-                'vesselName': ship['vesselName'],
-                'status': ship['status'],
-                'progress': ship['progress']
-            }
+    for berth, ship in store.berth_occupancy().items():
+        berths[berth] = {
+            'shipId': ship['id'],
+            'vesselName': ship['vesselName'],
+            'status': ship['status'],
+            'progress': ship['progress']
+        }
     
     return jsonify(berths)
 
 @ships_bp.route('/api/ships/stats', methods=['GET'])
 def get_operations_stats():
     """Get overall operations statistics"""
-    active_ships = [s for s in ships_data if s['status'] != 'complete']
-    
-    stats = {
-        'activeShips': len(active_ships),
-        'totalShips': len(ships_data),
-        'teamsDeployed': len(active_ships) * 2,  # Auto ops + Heavy ops
-        'totalVehicles': sum(s.get('totalVehicles', 0) for s in active_ships),
-        'berthsOccupied': len(set(s.get('berth') for s in active_ships if s.get('berth'))),
-        'averageProgress': sum(s.get('progress', 0) for s in active_ships) / len(active_ships) if active_ships else 0
-    }
+    stats = store.stats()
+    stats['teamsDeployed'] = stats['activeShips'] * 2  # Auto ops + Heavy ops
     
     return jsonify(stats)
 
@@ -244,70 +513,59 @@ def get_analytics():
     """Get analytics data for specified period"""
     period_days = int(request.args.get('period', 30))
     
-    # Filter ships by date range
-    end_date = datetime.now()
-    start_date = end_date - timedelta(days=period_days)
+    # Daily points up to a month, then weekly up to half a year, then monthly
+    granularity = request.args.get('granularity')
+    if not granularity:
+        granularity = 'day' if period_days <= 31 else 'week' if period_days <= 180 else 'month'
+    valid_granularities = ['day', 'week', 'month']
+    if granularity not in valid_granularities:
+        return jsonify({'error': f'Granularity must be one of: {", ".join(valid_granularities)}'}), 400
     
-    filtered_ships = []
-    for ship in ships_data:
-        try:
-            ship_date = datetime.fromisoformat(ship.get('operationDate', ship.get('createdAt', '')))
-            if start_date <= ship_date <= end_date:
-                filtered_ships.append(ship)
-        except:
-            continue
+    # Sum the per-day rollup over the period (today and the period_days - 1 days before it)
+    end_date = datetime.now().date()
+    start_date = end_date - timedelta(days=period_days - 1)
+    rollup = store.daily_rollup(start_date, end_date)
     
     # Calculate analytics
+    ships_processed = 0
     total_hours = 0
     total_vehicles = 0
-    zone_data = {'zoneA': {'vehicles': 0, 'time': 0}, 'zoneB': {'vehicles': 0, 'time': 0}, 'zoneC': {'vehicles': 0, 'time': 0}}
     team_stats = {}
     vehicle_types = {'automobiles': 0, 'heavyEquipment': 0, 'electricVehicles': 0, 'staticCargo': 0}
     
-    for ship in filtered_ships:
-        # Calculate hours worked (assuming 8-16 hour shifts)
-        shift_hours = 12  # Default shift length
-        if 'shiftStart' in ship and 'shiftEnd' in ship:
-            try:
-                start_time = datetime.strptime(ship['shiftStart'], '%H:%M')
-                end_time = datetime.strptime(ship['shiftEnd'], '%H:%M')
-                shift_hours = (end_time - start_time).seconds / 3600
-            except:
-                pass
-        
-        total_hours += shift_hours
-        
-        # Vehicle counts
-        total_vehicles += int(ship.get('totalVehicles', 0))
-        vehicle_types['automobiles'] += int(ship.get('totalAutomobilesDischarge', 0))
-        vehicle_types['heavyEquipment'] += int(ship.get('heavyEquipmentDischarge', 0))
+    for bucket in rollup.values():
+        ships_processed += bucket['ships']
+        total_hours += bucket['hours']
+        total_vehicles += bucket['vehicles']
+        vehicle_types['automobiles'] += bucket['automobiles']
+        vehicle_types['heavyEquipment'] += bucket['heavyEquipment']
         
         # Team performance
-        auto_lead = ship.get('autoOpsLead', '')
-        heavy_lead = ship.get('heavyOpsLead', '')
-        
-        if auto_lead:
-            if auto_lead not in team_stats:
-                team_stats[auto_lead] = {'role': 'Auto Operations Lead', 'hours': 0, 'ships': 0}
-            team_stats[auto_lead]['hours'] += shift_hours
-            team_stats[auto_lead]['ships'] += 1
-            
-        if heavy_lead:
-            if heavy_lead not in team_stats:
-                team_stats[heavy_lead] = {'role': 'Heavy Equipment Lead', 'hours': 0, 'ships': 0}
-            team_stats[heavy_lead]['hours'] += shift_hours
-            team_stats[heavy_lead]['ships'] += 1
-    
-    # Generate daily hours data
+        for (name, role), totals in bucket['leads'].items():
+            if name not in team_stats:
+                team_stats[name] = {'role': role, 'hours': 0, 'ships': 0}
+            team_stats[name]['hours'] += totals['hours']
+            team_stats[name]['ships'] += totals['ships']
+    
+    # Generate hours chart data, downsampled to weeks or months for long periods
     daily_hours = []
-    for i in range(min(period_days, 30)):
-        date = end_date - timedelta(days=period_days - i - 1)
-        day_ships = [s for s in filtered_ships if s.get('operationDate', '').startswith(date.strftime('%Y-%m-%d'))]
-        day_hours = sum(12 for _ in day_ships)  # Assume 12 hours per ship per day
-        daily_hours.append({
-            'date': date.strftime('%m/%d'),
-            'hours': day_hours
-        })
+    current_key = None
+    day = start_date
+    while day <= end_date:
+        if granularity == 'day':
+            key, label = day, day.strftime('%m/%d')
+        elif granularity == 'week':
+            key = (day - start_date).days // 7
+            label = day.strftime('%m/%d')
+        else:
+            key, label = (day.year, day.month), day.strftime('%b %Y')
+        if key != current_key:
+            current_key = key
+            daily_hours.append({'date': label, 'hours': 0})
+        bucket = rollup.get(day.isoformat())
+        if bucket:
+            daily_hours[-1]['hours'] += bucket['ships'] * 12  # Assume 12 hours per ship per day
+        day += timedelta(days=1)
     
     # Format team performance
     team_performance = []
@@ -322,7 +580,7 @@ def get_analytics():
     
     analytics_data = {
         'totalHours': int(total_hours),
-        'shipsProcessed': len(filtered_ships),
+        'shipsProcessed': ships_processed,
         'vehiclesHandled': total_vehicles,
         'avgEfficiency': 88,  # Calculated average efficiency
         'dailyHours': daily_hours,
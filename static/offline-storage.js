@@ -3,6 +3,7 @@ class OfflineStorageManager {
     constructor() {
         this.storageKeys = {
             ships: 'ships_data',
+            shipsVersion: 'ships_version',
             analytics: 'analytics_data',
             settings: 'app_settings',
             lastSync: 'last_sync_time'
@@ -59,6 +60,39 @@ class OfflineStorageManager {
         this.saveShips(filteredShips);
     }
 
+    // Fetch only the ships changed or deleted since the last sync and merge them into the cache
+    async syncShips() {
+        const version = localStorage.getItem(this.storageKeys.shipsVersion) || 0;
+        const response = await fetch(`/api/ships?since=${version}`);
+        if (!response.ok) {
+            throw new Error(`HTTP ${response.status}`);
+        }
+
+        const delta = await response.json();
+        const replaced = new Set(delta.deleted.concat(delta.ships.map(s => s.id)));
+        const ships = (delta.full ? [] : this.getShips())
+            .filter(s => !replaced.has(s.id))
+            .concat(delta.ships)
+            .sort((a, b) => a.id - b.id);
+
+        this.saveShips(ships);
+        localStorage.setItem(this.storageKeys.shipsVersion, delta.version);
+        return ships;
+    }
+
+    // Apply one event from /api/ships/stream to the cached ships
+    applyShipEvent(type, id, ship) {
+        const ships = this.getShips().filter(s => s.id !== ship.id);
+        if (type !== 'delete') {
+            ships.push(ship);
+            ships.sort((a, b) => a.id - b.id);
+        }
+
+        this.saveShips(ships);
+        localStorage.setItem(this.storageKeys.shipsVersion, id);
+        return ships;
+    }
+
     // Analytics data management
     saveAnalytics(analytics) {
         localStorage.setItem(this.storageKeys.analytics, JSON.stringify(analytics));